@@ -0,0 +1,14 @@
+"""
+Benchmarks
+
+Reproducible workloads for the simulator and the assembler, and a runner which reports
+how fast they are as JSON, so that releases can be compared against a stored baseline.
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --baseline baseline.json
+"""
+
+__all__ = [
+    'runner',
+    'workloads'
+]
@@ -0,0 +1,257 @@
+"""
+Runner
+
+Runs the benchmarks and reports the results as JSON:
+    instructions_per_second     for each simulator workload
+    lines_per_second            for assembling each size of generated source,
+                                with parse and with parse_single_pass
+    construction_seconds        the average time taken by M68K()
+    peak_rss_kib                the most memory that the process used
+
+A run can be compared against a baseline (the JSON of an earlier run), the comparison
+fails when any result is worse than the baseline by more than the tolerance.
+"""
+
+from easier68k.assembler import assembler
+from easier68k.simulator.m68k import M68K
+from easier68k.simulator.output_sink import CaptureSink
+from . import workloads
+import argparse
+import json
+import platform
+import sys
+import time
+import typing
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+# how long to keep running each simulator workload for
+DEFAULT_MIN_SECONDS = 2.0
+
+# the sizes of the generated assembler sources, in lines
+DEFAULT_ASSEMBLER_LINES = (10000,)
+FULL_ASSEMBLER_LINES = (10000, 100000)
+QUICK_ASSEMBLER_LINES = (1000,)
+
+# how many simulators to construct when timing M68K()
+DEFAULT_CONSTRUCTIONS = 20
+
+# how much worse than the baseline a result can be before the comparison fails
+DEFAULT_TOLERANCE = 0.1
+
+
+def _assemble(source: str, single_pass: bool = False):
+    """
+    Assembles a workload, which must not have any issues
+    :param source:
+    :param single_pass: whether to use parse_single_pass instead of parse
+    :return: the list file
+    """
+    parse = assembler.parse_single_pass if single_pass else assembler.parse
+    list_file, issues = parse(source)
+    if issues:
+        raise ValueError('The workload did not assemble: {}'.format(issues[0]))
+    return list_file
+
+
+def benchmark_simulator(workload: workloads.Workload, min_seconds: float = DEFAULT_MIN_SECONDS) -> dict:
+    """
+    Runs a workload over and over until min_seconds have passed
+    :param workload:
+    :param min_seconds:
+    :return: the instructions per second, along with the instructions and seconds they came from
+    """
+    m68k = M68K(output=CaptureSink())
+    m68k.load_list_file(_assemble(workload.source))
+    start = m68k.snapshot()
+
+    runs = 0
+    elapsed = 0.0
+    while runs == 0 or elapsed < min_seconds:
+        m68k.restore(start)
+        m68k.output.clear()
+        began = time.perf_counter()
+        m68k.run()
+        elapsed += time.perf_counter() - began
+        runs += 1
+        if not m68k.halted:
+            raise ValueError('The {} workload did not halt'.format(workload.name))
+
+    instructions = runs * workload.instructions
+    return {
+        'instructions': instructions,
+        'seconds': elapsed,
+        'instructions_per_second': instructions / elapsed,
+    }
+
+
+def benchmark_assembler(lines: int, single_pass: bool = False) -> dict:
+    """
+    Assembles a generated source
+    :param lines: the number of lines in the source
+    :param single_pass: whether to use parse_single_pass instead of parse
+    :return: the lines per second, along with the lines and seconds they came from
+    """
+    source = workloads.assembler_source(lines)
+    count = len(source.splitlines())
+
+    began = time.perf_counter()
+    _assemble(source, single_pass)
+    elapsed = time.perf_counter() - began
+
+    return {
+        'lines': count,
+        'seconds': elapsed,
+        'lines_per_second': count / elapsed,
+    }
+
+
+def benchmark_construction(count: int = DEFAULT_CONSTRUCTIONS) -> float:
+    """
+    Times creating new simulators
+    :param count: the number of simulators to create
+    :return: the average seconds taken by M68K()
+    """
+    began = time.perf_counter()
+    for _ in range(count):
+        M68K()
+    return (time.perf_counter() - began) / count
+
+
+def peak_rss_kib() -> typing.Optional[int]:
+    """
+    Gets the most memory that this process has used
+    :return: the peak resident set size in KiB, or None where it can't be measured
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, everything else reports KiB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_benchmarks(min_seconds: float = DEFAULT_MIN_SECONDS,
+                   assembler_lines: typing.Iterable[int] = DEFAULT_ASSEMBLER_LINES,
+                   constructions: int = DEFAULT_CONSTRUCTIONS) -> dict:
+    """
+    Runs every benchmark
+    :param min_seconds: how long to keep running each simulator workload for
+    :param assembler_lines: the sizes of the generated sources to assemble
+    :param constructions: how many simulators to construct when timing M68K()
+    :return: the results
+    """
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'simulator': {},
+        'assembler': {},
+        'assembler_single_pass': {},
+    }
+
+    for workload in workloads.simulator_workloads():
+        results['simulator'][workload.name] = benchmark_simulator(workload, min_seconds)
+
+    for lines in assembler_lines:
+        results['assembler'][str(lines)] = benchmark_assembler(lines)
+        results['assembler_single_pass'][str(lines)] = benchmark_assembler(lines, single_pass=True)
+
+    results['construction_seconds'] = benchmark_construction(constructions)
+    results['peak_rss_kib'] = peak_rss_kib()
+    return results
+
+
+def _metrics(results: dict) -> typing.Dict[str, typing.Tuple[float, bool]]:
+    """
+    Gets each result that is compared against the baseline
+    :param results:
+    :return: (value, whether higher is better) by the name of the result
+    """
+    metrics = {}
+    for name, result in results.get('simulator', {}).items():
+        metrics['simulator.{}.instructions_per_second'.format(name)] = (result['instructions_per_second'], True)
+    for name, result in results.get('assembler', {}).items():
+        metrics['assembler.{}.lines_per_second'.format(name)] = (result['lines_per_second'], True)
+    for name, result in results.get('assembler_single_pass', {}).items():
+        metrics['assembler_single_pass.{}.lines_per_second'.format(name)] = (result['lines_per_second'], True)
+    if results.get('construction_seconds') is not None:
+        metrics['construction_seconds'] = (results['construction_seconds'], False)
+    if results.get('peak_rss_kib') is not None:
+        metrics['peak_rss_kib'] = (results['peak_rss_kib'], False)
+    return metrics
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> typing.List[dict]:
+    """
+    Compares results against a baseline, only the results in both of them are compared
+    :param results: the results of this run
+    :param baseline: the results of an earlier run
+    :param tolerance: how much worse a result can be, as a fraction of the baseline
+    :return: the name, baseline, current value and change of each result, worst first,
+    change is the fraction that the result got better (positive) or worse (negative) by
+    """
+    current = _metrics(results)
+    before = _metrics(baseline)
+
+    comparisons = []
+    for name in sorted(current.keys() & before.keys()):
+        value, higher_is_better = current[name]
+        old = before[name][0]
+        if not old:
+            continue
+        change = (value - old) / old
+        if not higher_is_better:
+            change = -change
+        comparisons.append({
+            'name': name,
+            'baseline': old,
+            'current': value,
+            'change': change,
+            'regression': change < -tolerance,
+        })
+
+    return sorted(comparisons, key=lambda comparison: comparison['change'])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='benchmarks the easier68k simulator and assembler')
+    parser.add_argument('-o', '--output', default=None,
+                        help='file to write the results to, defaults to stdout')
+    parser.add_argument('-b', '--baseline', default=None,
+                        help='results of an earlier run to compare against, fails if any result got worse')
+    parser.add_argument('-t', '--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='how much worse than the baseline a result can be, as a fraction')
+    parser.add_argument('-s', '--seconds', type=float, default=DEFAULT_MIN_SECONDS,
+                        help='how long to run each simulator workload for')
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--quick', action='store_true', help='only assemble small sources, for checking the runner')
+    size.add_argument('--full', action='store_true', help='also assemble a 100k line source')
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        assembler_lines = QUICK_ASSEMBLER_LINES
+    elif args.full:
+        assembler_lines = FULL_ASSEMBLER_LINES
+    else:
+        assembler_lines = DEFAULT_ASSEMBLER_LINES
+
+    results = run_benchmarks(args.seconds, assembler_lines)
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline) as in_file:
+            comparisons = compare(results, json.load(in_file), args.tolerance)
+        results['comparison'] = comparisons
+        failed = any(comparison['regression'] for comparison in comparisons)
+
+    out_file = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        out_file.write(json.dumps(results, indent=4, sort_keys=True) + '\n')
+    finally:
+        if args.output:
+            out_file.close()
+
+    return 1 if failed else 0
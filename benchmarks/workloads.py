@@ -0,0 +1,144 @@
+"""
+Workloads
+
+Generates the assembly programs that are benchmarked.
+Everything is generated from a fixed seed, so every run benchmarks the same programs.
+
+There are no branch instructions yet, so the simulator workloads are long straight-line
+programs, which the runner executes over and over again instead of looping.
+"""
+
+import random
+import typing
+
+# where the generated programs start
+START = 0x1000
+
+# registers that the generated instructions use, A1 and D0 are left for TRAP
+_DATA_REGISTERS = ['D1', 'D2', 'D3', 'D4', 'D5', 'D6', 'D7']
+_ADDRESS_REGISTERS = ['A0', 'A2', 'A3', 'A4']
+_SIZES = ['B', 'W', 'L']
+
+# DC.W values are kept to 4 hex digits, DC can't assemble words with leading zeros yet
+
+
+class Workload:
+    def __init__(self, name: str, source: str, instructions: int):
+        """
+        Constructor
+        :param name: the name that the results are reported under
+        :param source: the assembly source of the program
+        :param instructions: the number of instructions that running the program once executes
+        """
+        self.name = name
+        self.source = source
+        self.instructions = instructions
+
+
+def _program(body: typing.List[str], data: typing.List[str] = ()) -> str:
+    """
+    Wraps the lines of a program with its start and end
+    :param body: the instructions
+    :param data: the DC lines after the SIMHALT
+    :return: the source
+    """
+    lines = ['start   EQU ${:X}'.format(START), '        ORG start']
+    lines += ['        ' + line for line in body]
+    lines.append('        SIMHALT')
+    lines += list(data)
+    lines.append('        END start')
+    return '\n'.join(lines) + '\n'
+
+
+def alu_workload(length: int = 2000, seed: int = 68000) -> Workload:
+    """
+    A run of register to register MOVE, ADD and OR instructions
+    :param length: the number of instructions
+    :param seed:
+    :return:
+    """
+    rand = random.Random(seed)
+    body = []
+    for _ in range(length):
+        opcode = rand.choice(['MOVE', 'ADD', 'OR'])
+        src, dest = rand.sample(_DATA_REGISTERS, 2)
+        body.append('{}.{} {}, {}'.format(opcode, rand.choice(_SIZES), src, dest))
+    return Workload('alu', _program(body), length + 1)
+
+
+def trap_output_workload(strings: int = 200, seed: int = 68001) -> Workload:
+    """
+    Displays many null terminated strings with TRAP #15
+    :param strings: the number of strings to display
+    :param seed:
+    :return:
+    """
+    rand = random.Random(seed)
+    body = []
+    data = []
+    # labels are all the same length, so that none of them starts with another one
+    for index in range(strings):
+        body.append('LEA str{:05d}, A1'.format(index))
+        body.append('MOVE.B #{}, D0'.format(rand.choice([13, 14])))
+        body.append('TRAP #15')
+        text = ''.join(rand.choice('abcdefghijklmnopqrstuvwxyz ') for _ in range(rand.randint(8, 60)))
+        data.append("str{:05d} DC.B '{}', 0".format(index, text))
+    return Workload('trap_output', _program(body, data), len(body) + 1)
+
+
+def lea_workload(length: int = 2000, seed: int = 68002) -> Workload:
+    """
+    Walks address registers through a table with LEA and post increment moves
+    :param length: the number of instructions
+    :param seed:
+    :return:
+    """
+    rand = random.Random(seed)
+    body = []
+    while len(body) < length:
+        register = rand.choice(_ADDRESS_REGISTERS)
+        body.append('LEA table, {}'.format(register))
+        for _ in range(rand.randint(1, 6)):
+            body.append('MOVE.W ({})+, {}'.format(register, rand.choice(_DATA_REGISTERS)))
+    body = body[:length]
+    data = ['table   DC.W ' + ', '.join('${:X}'.format(rand.randint(0x1000, 0xFFFF)) for _ in range(8))]
+    return Workload('lea', _program(body, data), length + 1)
+
+
+def assembler_source(lines: int, seed: int = 68003) -> str:
+    """
+    Generates a source file with a mix of every instruction, labels and data, for the assembler
+    :param lines: roughly the number of lines to generate
+    :param seed:
+    :return:
+    """
+    rand = random.Random(seed)
+    body = []
+    data = []
+    labels = 0
+    while len(body) + len(data) < lines:
+        kind = rand.randrange(6)
+        if kind == 0:
+            body.append('MOVE.{} #{}, {}'.format(rand.choice(_SIZES), rand.randint(1, 127), rand.choice(_DATA_REGISTERS)))
+        elif kind == 1:
+            body.append('ADD.{} {}, {}'.format(rand.choice(_SIZES), *rand.sample(_DATA_REGISTERS, 2)))
+        elif kind == 2:
+            body.append('OR.{} {}, {}'.format(rand.choice(_SIZES), *rand.sample(_DATA_REGISTERS, 2)))
+        elif kind == 3:
+            body.append('LEA label{:06d}, {}'.format(labels, rand.choice(_ADDRESS_REGISTERS)))
+            data.append('label{:06d} DC.W ${:X}'.format(labels, rand.randint(0x1000, 0xFFFF)))
+            labels += 1
+        elif kind == 4:
+            body.append('MOVE.W (A0)+, {}  ; a comment'.format(rand.choice(_DATA_REGISTERS)))
+        else:
+            body.append('MOVE.B #14, D0')
+            body.append('TRAP #15')
+    return _program(body, data)
+
+
+def simulator_workloads() -> typing.List[Workload]:
+    """
+    Gets every simulator workload
+    :return:
+    """
+    return [alu_workload(), trap_output_workload(), lea_workload()]
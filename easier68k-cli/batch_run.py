@@ -0,0 +1,43 @@
+"""
+runs many list files or S-record files at once, using every core,
+and prints one line of JSON for each of them
+"""
+import argparse
+import json
+import sys
+
+from easier68k.simulator.batch import run_batch, DEFAULT_INSTRUCTION_BUDGET, DEFAULT_TIMEOUT
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='runs many easier68k programs in parallel')
+    parser.add_argument('files', nargs='+', help='list files (JSON) or S-record files to run')
+    parser.add_argument('-b', '--budget', type=int, default=DEFAULT_INSTRUCTION_BUDGET,
+                        help='the most instructions each program can execute')
+    parser.add_argument('-t', '--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='the most seconds each program can run for')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='the number of processes to use, defaults to the number of CPUs')
+    parser.add_argument('-i', '--input', default=None,
+                        help='file of lines to give each program as keyboard input, defaults to no input')
+    parser.add_argument('-o', '--output', default=None,
+                        help='file to write the results to, defaults to stdout')
+    args = parser.parse_args(argv)
+
+    input_lines = []
+    if args.input:
+        with open(args.input) as in_file:
+            input_lines = in_file.read().splitlines()
+
+    out_file = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for result in run_batch(args.files, args.budget, args.timeout, args.jobs, input_lines):
+            out_file.write(json.dumps(result, sort_keys=True) + '\n')
+            out_file.flush()
+    finally:
+        if args.output:
+            out_file.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""
+runs the simulation daemon, which serves many simulation sessions
+as JSON-RPC over a Unix domain socket
+"""
+import argparse
+import asyncio
+
+from easier68k.simulator.daemon import SimulationServer
+
+DEFAULT_SOCKET = '/tmp/easier68k.sock'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='serves easier68k simulation sessions over a Unix socket')
+    parser.add_argument('-s', '--socket', default=DEFAULT_SOCKET,
+                        help='the path of the socket to listen on, defaults to ' + DEFAULT_SOCKET)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(SimulationServer().serve_forever(args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -3,16 +3,21 @@ from ..core.util.parsing import strip_comments, has_label, get_label, strip_labe
 import types
 import re
 import binascii
-from ..core import opcodes
 from ..core.models.list_file import ListFile
-
-from ..core.util.find_module import find_opcode_cls
-# This *is* actually a necessary import due to using "reflection" style code further down
-# noinspection PyUnresolvedReferences
-from ..core.opcodes import *
+from ..core.opcodes.registry import find_opcode_cls
 
 MAX_MEMORY_LOCATION = 16777216  # 2^24
 
+# a symbol in the contents of a line, quoted strings are matched too so that they're skipped over
+SYMBOL_REGEX = re.compile(r"'[^']*'|(?<![\w$%.])[A-Za-z_]\w*")
+
+# words that look like symbols but are registers
+REGISTER_NAMES = {'D0', 'D1', 'D2', 'D3', 'D4', 'D5', 'D6', 'D7',
+                  'A0', 'A1', 'A2', 'A3', 'A4', 'A5', 'A6', 'A7', 'SP', 'USP', 'PC', 'SR', 'CCR'}
+
+# what labels are replaced with before their locations are known
+TEMP_LABEL_ADDRESS = '($00000000).L'
+
 
 def for_line_stripped_comments(full_text: str):
     for line_index, line in enumerate(full_text.splitlines()):
@@ -89,6 +94,46 @@ def replace_labels_with_temps(contents: str, labels: dict) -> str:
     return contents
 
 
+def replace_symbols(contents: str, equates: dict, label_addresses: dict, label_format: str = '(${0:08x}).L',
+                    undefined: str = None) -> (str, list):
+    """
+    Replaces the equates and labels in a line with their values, matching whole words only
+
+    >>> replace_symbols('#size, table', {'size': '$10'}, {'table': 0x1000})
+    ('#$10, ($00001000).L', [])
+
+    >>> replace_symbols("later, D0", {}, {}, undefined='($00000000).L')
+    ('($00000000).L, D0', ['later'])
+
+    :param contents: The contents of the line
+    :param equates: The equates, by name
+    :param label_addresses: The locations of the labels, by name
+    :param label_format: What a label is replaced with, formatted with its location
+    :param undefined: What symbols that aren't defined are replaced with, None leaves them as they are
+    :return: The replaced contents, and the names of the symbols that aren't defined
+    """
+    not_found = []
+
+    def replace_label(match) -> str:
+        symbol = match.group(0)
+        if symbol[0] == "'" or symbol.upper() in REGISTER_NAMES:
+            return symbol
+        location = label_addresses.get(symbol)
+        if location is None:
+            not_found.append(symbol)
+            return symbol if undefined is None else undefined
+        return label_format.format(location)
+
+    def replace(match) -> str:
+        equate = equates.get(match.group(0))
+        if equate is None:
+            return replace_label(match)
+        # an equate can be the location of a label
+        return SYMBOL_REGEX.sub(replace_label, equate)
+
+    return SYMBOL_REGEX.sub(replace, contents), not_found
+
+
 def parse(text: str) -> (ListFile, list):
     """
     Parses an assembly file and returns a list file, along with errors/warnings from the parsing process.
@@ -210,3 +255,135 @@ def parse(text: str) -> (ListFile, list):
                 current_memory_location += length * 2
 
     return to_return, issues
+
+
+def parse_single_pass(text: str) -> (ListFile, list):
+    """
+    Parses an assembly file like parse, but only goes through the text once.
+    Instructions which use a label before it is defined have their space filled with zeros,
+    and are assembled once the location of every label is known.
+    Symbols are only replaced as whole words, and equates must be defined before they are used.
+    :param text: The assembly file text to parse
+    :return: The parsed list file, along with errors/warnings from the parsing process
+    """
+    to_return = ListFile()
+    issues = []
+    equates = {}
+    label_addresses = {}
+
+    # (location, opcode, class, contents, length, undefined symbols) of each instruction waiting for labels
+    fixups = []
+    end_contents = None
+    current_memory_location = 0x00000000
+
+    for line_index, stripped in for_line_stripped_comments(text):
+        label = get_label(stripped) if has_label(stripped) else None
+        opcode = get_opcode(stripped)
+        contents = strip_opcode(stripped)
+
+        if label is not None and (label in equates or label in label_addresses):
+            issues.append(('Label {} already declared'.format(label), 'ERROR'))
+            label = None
+
+        if opcode == 'EQU':
+            if label is not None:
+                equates[label] = replace_symbols(contents, equates, {})[0]
+            continue
+
+        if opcode == 'END':  # The starting location can be a label that isn't defined yet, it's set at the end
+            end_contents = contents
+            continue
+
+        if label is not None:
+            label_addresses[label] = current_memory_location
+            to_return.define_symbol(label, current_memory_location)
+
+        if opcode == 'ORG':  # This will shift our current memory location, it's a special case
+            contents, undefined = replace_symbols(contents, equates, label_addresses)
+            if undefined:
+                # the location can't be left until later, everything after it depends on it
+                issues.append(('Symbol {} is used before it is defined'.format(undefined[0]), 'ERROR'))
+                continue
+            try:
+                new_memory_location = parse_literal(contents)
+            except:
+                issues.append(('Error parsing ORG value', 'ERROR'))
+                continue
+            if not (0 <= new_memory_location < MAX_MEMORY_LOCATION):
+                issues.append(('ORG address must be between 0 and 2^24!', 'ERROR'))
+                continue
+            current_memory_location = new_memory_location
+            # Update the label with the new address, if it exists
+            if label is not None:
+                label_addresses[label] = current_memory_location
+                to_return.define_symbol(label, current_memory_location)
+            continue
+
+        op_class = find_opcode_cls(opcode)
+        # We don't know this opcode, there's no module for it
+        if op_class is None:
+            issues.append(('Opcode {} is not known: skipping and continuing'.format(opcode), 'ERROR'))
+            continue
+
+        contents, undefined = replace_symbols(contents, equates, label_addresses)
+
+        if undefined:
+            # size it the same way as parse does, with a temporary address for every label
+            try:
+                length = op_class.get_word_length(opcode,
+                                                  replace_symbols(contents, {}, {}, undefined=TEMP_LABEL_ADDRESS)[0])
+            except (ValueError, AssertionError):
+                # it can't be an address, so it must be an equate that hasn't been defined yet
+                issues.append(('Symbol {} is used before it is defined'.format(undefined[0]), 'ERROR'))
+                continue
+            to_return.insert_data(current_memory_location, '0000' * length)
+            fixups.append((current_memory_location, opcode, op_class, contents, length, undefined))
+        else:
+            length = op_class.get_word_length(opcode, contents)
+            _insert_opcode(to_return, issues, current_memory_location, opcode, op_class, contents)
+
+        current_memory_location += length * 2
+
+    # --- now every label is known, fill in the instructions that were waiting for them ---
+    for location, opcode, op_class, contents, length, undefined in fixups:
+        used_equates = [symbol for symbol in undefined if symbol in equates]
+        if used_equates:
+            issues.append(('Equate {} is used before it is defined'.format(used_equates[0]), 'ERROR'))
+            to_return.clear_location(location)
+            continue
+
+        contents = replace_symbols(contents, equates, label_addresses)[0]
+        if not _insert_opcode(to_return, issues, location, opcode, op_class, contents):
+            to_return.clear_location(location)
+
+    if end_contents is not None:  # This will set our end memory location, it's a special case
+        start_location = parse_literal(replace_symbols(end_contents, equates, label_addresses, '${:x}')[0])
+        if 0 <= start_location < MAX_MEMORY_LOCATION:
+            to_return.set_starting_execution_address(start_location)
+
+    return to_return, issues
+
+
+def _insert_opcode(list_file: ListFile, issues: list, location: int, opcode: str, op_class: type,
+                   contents: str) -> bool:
+    """
+    Assembles an instruction into the list file
+    :param list_file: The list file to put the instruction in
+    :param issues: The list to add the errors/warnings about the instruction to
+    :param location: Where the instruction goes
+    :param opcode: The command, such as 'MOVE.B'
+    :param op_class: The opcode class for the command
+    :param contents: The parameters, with every symbol replaced
+    :return: Whether the instruction was put in the list file
+    """
+    is_valid, line_issues = op_class.is_valid(opcode, contents)
+    issues.extend(line_issues)
+    if not is_valid:
+        return False
+
+    data = op_class.from_str(opcode, contents)
+    if data is None:
+        return False
+
+    list_file.insert_data(location, str(binascii.hexlify(data.assemble()))[2:-1])
+    return True
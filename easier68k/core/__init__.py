@@ -1,7 +1,3 @@
-from .enum import *
-from .models import *
-from .util import *
-
 __all__ = [
     'enum',
     'models',
@@ -1,4 +1,5 @@
-__all__ = ['condition',
+__all__ = ['alu_operation',
+           'condition',
            'condition_status_code',
            'ea_mode',
            'ea_mode_bin',
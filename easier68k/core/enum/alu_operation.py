@@ -0,0 +1,14 @@
+"""
+ALU Operation Enum
+Represents the kinds of ALU operations whose result the condition codes are set from
+"""
+
+from enum import IntEnum
+
+
+class AluOperation(IntEnum):
+    # ADD, sets X N Z V C
+    ADD = 0
+
+    # OR, sets N Z V C and leaves X alone
+    OR = 1
@@ -21,6 +21,6 @@ class SRecordType(Enum):
 
     @staticmethod
     def parse(record_str: str) -> SRecordType:
-        assert record_str[0] is 'S'
+        assert record_str[0] == 'S'
         num = int(record_str[1])
         return SRecordType(num)
\ No newline at end of file
@@ -67,61 +67,61 @@ class AssemblyParameter:
         if self.mode is EAMode.DRD:
             # convert the data into the register value
             assert 0 <= self.data <= 7
-            data_register = Register(self.data)
-            return simulator.get_register_value(data_register)
+            data_register = self.data
+            return simulator.get_register_long(data_register)
 
         if self.mode is EAMode.AddressRegisterDirect:
             # address register direct gets the value of the register
             assert Register.A0 <= self.data + Register.A0 <= Register.A7
             # offset the value to compensate for the enum offset
-            addr_register = Register(self.data + Register.A0)
+            addr_register = Register.A0 + self.data
             # get the value of the register, that's it
-            return simulator.get_register_value(addr_register)
+            return simulator.get_register_long(addr_register)
 
         if self.mode is EAMode.AddressRegisterIndirect:
             # address register indirect gets the value that the register points to
             # check that the register number is valid
             assert Register.A0 <= self.data + Register.A0 <= Register.A7
             # offset the value to compensate for the enum offset
-            addr_register = Register(self.data + Register.A0)
+            addr_register = Register.A0 + self.data
             # this gets the value of the register, which points to a location
             # in memory where the target value is
-            register_value = simulator.get_register_value(addr_register)
+            register_value = simulator.get_register_long(addr_register)
             # now get the value in memory of that register
-            return int.from_bytes(simulator.memory.get(length, register_value), byteorder='big', signed=False)
+            return simulator.memory.read_uint(length, register_value)
 
         if self.mode is EAMode.AddressRegisterIndirectPostIncrement:
             # address register indirect gets the value that the register points to
             # check that the register number is valid
             assert Register.A0 <= self.data + Register.A0 <= Register.A7
             # offset the value to compensate for the enum offset
-            addr_register = Register(self.data + Register.A0)
+            addr_register = Register.A0 + self.data
             # this gets the value of the register, which points to a location
             # in memory where the target value is
-            register_value = simulator.get_register_value(addr_register)
+            register_value = simulator.get_register_long(addr_register)
             # now get the value in memory of that register
-            val = simulator.memory.get(length, register_value)
+            val = simulator.memory.read_uint(length, register_value)
             # do the post increment
             simulator.set_register_value(addr_register, register_value + length)
             # return the value
-            return int.from_bytes(val, byteorder='big', signed=False)
+            return val
 
         if self.mode is EAMode.AddressRegisterIndirectPreDecrement:
             # address register indirect gets the value that the register points to
             # check that the register number is valid
             assert Register.A0 <= self.data + Register.A0 <= Register.A7
             # offset the value to compensate for the enum offset
-            addr_register = Register(self.data + Register.A0)
+            addr_register = Register.A0 + self.data
             # this gets the value of the register, which points to a location
             # in memory where the target value is
-            register_value = simulator.get_register_value(addr_register)
+            register_value = simulator.get_register_long(addr_register)
 
             # do the pre decrement (this does not update the value of register_value)
             simulator.set_register_value(addr_register, register_value - length)
 
             # now get the value in memory of that register
             # and return that value
-            return int.from_bytes(simulator.memory.get(length, register_value - length), byteorder='big', signed=False)
+            return simulator.memory.read_uint(length, register_value - length)
 
         if self.mode in [EAMode.AbsoluteLongAddress, EAMode.AbsoluteWordAddress]:
             # if mode is absolute long or word address
@@ -174,43 +174,43 @@ class AssemblyParameter:
                 value = abs(value)
 
             assert 0 <= value <= 0xFFFFFFFF, 'The value must fit in a long word'
-            data_register = Register(self.data)
+            data_register = self.data
             simulator.set_register_value(data_register, value)
 
         if self.mode is EAMode.AddressRegisterDirect:
             # set the value for the address register
             assert 0 <= self.data <= 7
             assert 0 <= value <= MAX_MEMORY_LOCATION, 'The value must fit in the memory space [0, 2^24]'
-            addr_register = Register(self.data + Register.A0)
+            addr_register = Register.A0 + self.data
             simulator.set_register_value(addr_register, value)
 
         if self.mode is EAMode.AddressRegisterIndirect:
             # sets the value in memory that the address register points to
             assert 0 <= self.data <= 7
             assert 0 <= value <= MAX_MEMORY_LOCATION, 'The value must fit in the memory space [0, 2^24]'
-            addr_register = Register(self.data + Register.A0)
-            location = simulator.get_register_value(addr_register)
-            simulator.memory.set(length, location, value.to_bytes(length, 'big'))
+            addr_register = Register.A0 + self.data
+            location = simulator.get_register_long(addr_register)
+            simulator.memory.write_uint(length, location, value)
 
         if self.mode is EAMode.AddressRegisterIndirectPreDecrement:
             # sets the value in memory that the address register points to
             assert 0 <= self.data <= 7
             assert 0 <= value <= MAX_MEMORY_LOCATION, 'The value must fit in the memory space [0, 2^24]'
-            addr_register = Register(self.data + Register.A0)
-            location = simulator.get_register_value(addr_register)
+            addr_register = Register.A0 + self.data
+            location = simulator.get_register_long(addr_register)
             location -= length
             simulator.set_register_value(addr_register, location)
-            simulator.memory.set(length, location, value.to_bytes(length, 'big'))
+            simulator.memory.write_uint(length, location, value)
 
         if self.mode is EAMode.AddressRegisterIndirectPostIncrement:
             # sets the value in memory that the address register points to
             assert 0 <= self.data <= 7
             assert 0 <= value <= MAX_MEMORY_LOCATION, 'The value must fit in the memory space [0, 2^24]'
 
-            addr_register = Register(self.data + Register.A0)
-            location = simulator.get_register_value(addr_register)
+            addr_register = Register.A0 + self.data
+            location = simulator.get_register_long(addr_register)
 
-            simulator.memory.set(length, location, value.to_bytes(length, 'big'))
+            simulator.memory.write_uint(length, location, value)
 
             location += length
             simulator.set_register_value(addr_register, location)
@@ -226,4 +226,4 @@ class AssemblyParameter:
                 value = to_word(value)
 
             # set the value in memory to that
-            simulator.memory.set(length, self.data, value.to_bytes(length, 'big'))
+            simulator.memory.write_uint(length, self.data, value)
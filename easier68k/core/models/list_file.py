@@ -11,6 +11,81 @@ destination memory they should end up.
 """
 MAX_MEMORY_LOCATION = 16777216  # 2^24
 
+def parse_s_record_line(line: str):
+    """
+    Parses a single line of an S record file
+    This is defined here: http://www.easy68k.com/easy68ksrecord.htm
+
+    >>> parse_s_record_line('S1071000780058469F')
+    (<SRecordType.S1: 1>, 4096, '78005846')
+
+    >>> parse_s_record_line('S804001000EB')
+    (<SRecordType.S8: 8>, 4096, '')
+
+    :param line: {str} a single line of an S record file
+    :return: the record type, the address, and the data as a hex string, or None for a blank line
+    """
+    line = line.replace('\r', '').replace('\n', '')
+    if not line.strip():
+        return None
+
+    # type of record
+    record_type = SRecordType.parse(line[:2])
+    # count of remaining character pairs in the record
+    count = int(line[2:4], 16)
+    # address 2 3 or 4 bytes as hex
+    address_val_len = 0
+
+    if record_type is SRecordType.S0:
+        # address field is unused
+        address_val_len = 4
+    elif record_type is SRecordType.S1:
+        # 2 bytes
+        address_val_len = 4
+    elif record_type is SRecordType.S2:
+        # 3 bytes
+        address_val_len = 6
+    elif record_type is SRecordType.S3:
+        # 4 bytes
+        address_val_len = 8
+    elif record_type is SRecordType.S5:
+        # the address field is interpreted as a 2 byte value
+        # and contains the counts of S1 2 and 3 records prev
+        # transmitted
+        address_val_len = 4
+    elif record_type is SRecordType.S7:
+        # termination record
+        # contains the starting execution address
+        # as 4 bytes
+        address_val_len = 8
+    elif record_type is SRecordType.S8:
+        # termination record
+        # contains the starting execution address
+        # as 3 bytes
+        address_val_len = 6
+    elif record_type is SRecordType.S9:
+        # termination record
+        # contains the starting execution address
+        # as 2 bytes
+        address_val_len = 4
+
+    # get the address for the data
+    address = int(line[4:4+address_val_len], 16)
+
+    # get the data that should be between 0-64 characters
+    data = line[4+address_val_len:-2]
+
+    # the last two characters as a hexadecimal value
+    # with the least significant byte of the ones complement of the sum
+    # of the byte values represented by the pairs of characters
+    # making up the count, address and data pairs
+
+    # for now, I don't care about the checksum
+    checksum = line[-2:]
+
+    return record_type, address, data
+
+
 class ListFile:
     """
     Represents assembled instructions and their locations in memory
@@ -179,60 +254,10 @@ class ListFile:
         :param line: {str} a single line of an S record file
         :return: None
         """
-        line = line.replace('\r', '').replace('\n', '')
-        # type of record
-        record_type = SRecordType.parse(line[:2])
-        # count of remaining character pairs in the record
-        count = int(line[2:4], 16)
-        # address 2 3 or 4 bytes as hex
-        address_val_len = 0
-
-        if record_type is SRecordType.S0:
-            # address field is unused
-            address_val_len = 4
-        elif record_type is SRecordType.S1:
-            # 2 bytes
-            address_val_len = 4
-        elif record_type is SRecordType.S2:
-            # 3 bytes
-            address_val_len = 6
-        elif record_type is SRecordType.S3:
-            # 4 bytes
-            address_val_len = 8
-        elif record_type is SRecordType.S5:
-            # the address field is interpreted as a 2 byte value
-            # and contains the counts of S1 2 and 3 records prev
-            # transmitted
-            address_val_len = 4
-        elif record_type is SRecordType.S7:
-            # termination record
-            # contains the starting execution address
-            # as 4 bytes
-            address_val_len = 8
-        elif record_type is SRecordType.S8:
-            # termination record
-            # contains the starting execution address
-            # as 3 bytes
-            address_val_len = 6
-        elif record_type is SRecordType.S9:
-            # termination record
-            # contains the starting execution address
-            # as 2 bytes
-            address_val_len = 4
-
-        # get the address for the data
-        address = int(line[4:4+address_val_len], 16)
-
-        # get the data that should be between 0-64 characters
-        data = line[4+address_val_len:-2]
-
-        # the last two characters as a hexadecimal value
-        # with the least significant byte of the ones complement of the sum
-        # of the byte values represented by the pairs of characters
-        # making up the count, address and data pairs
-
-        # for now, I don't care about the checksum
-        checksum = line[-2:]
+        record = parse_s_record_line(line)
+        if record is None:
+            return
+        record_type, address, data = record
 
         if record_type in [SRecordType.S1, SRecordType.S2, SRecordType.S3]:
             self.insert_data(address, data)
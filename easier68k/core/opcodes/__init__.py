@@ -6,5 +6,6 @@ __all__ = [
     'trap',
     'opcode',
     'opcode_or',
+    'registry',
     'add'
 ]
\ No newline at end of file
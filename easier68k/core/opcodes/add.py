@@ -4,11 +4,15 @@ from ...core.enum import ea_mode_bin
 from ...core.enum.ea_mode_bin import parse_ea_from_binary
 from ...simulator.m68k import M68K
 from ...core.opcodes.opcode import Opcode
+from ...core.opcodes.registry import register_opcode
 from ...core.util.split_bits import split_bits
 from ...core.util import opcode_util
 from ..util.parsing import parse_assembly_parameter
 from ..models.assembly_parameter import AssemblyParameter
 from ..enum.condition_status_code import ConditionStatusCode
+from ..enum.alu_operation import AluOperation
+from ..util.timing import alu_cycles
+from ..util.condition_codes import SIZE_MASKS
 import binascii
 
 
@@ -16,8 +20,12 @@ class Add(Opcode):  # Forward declaration
     pass
 
 
+@register_opcode('ADD')
 class Add(Opcode):
 
+    # 1101 followed by the register, opmode and EA bits
+    opcode_word_patterns = [(0xF000, 0xD000)]
+
     # Allowed sizes for this opcode
     valid_sizes = [OpSize.BYTE, OpSize.WORD, OpSize.LONG]
 
@@ -82,7 +90,6 @@ class Add(Opcode):
 
         # get the value of src from the simulator
         src_val = self.src.get_value(simulator, val_length)
-        print(src_val)
         # get the value of dest from the simulator
         dest_val = self.dest.get_value(simulator, val_length)
 
@@ -131,52 +138,47 @@ class Add(Opcode):
         raw_total = (src_val + dest_val)
         total = (raw_total & mask) | preserve
 
-        carry_bit = False
+        # the condition codes are worked out from the operands and the unmasked total
+        simulator.set_condition_codes_from_result(AluOperation.ADD, src_val, dest_val, raw_total, val_length)
 
-        # if the total is greater than the maximum size for the operation
-        # then the carry bit will be set
-        if self.size is OpSize.BYTE and raw_total > 0xFF:
-            carry_bit = True
-        if self.size is OpSize.WORD and raw_total > 0xFFFF:
-            carry_bit = True
-        if self.size is OpSize.LONG and raw_total > 0xFFFFFFFF:
-            carry_bit = True
+        # and set the value
+        self.dest.set_value(simulator, total, val_length)
 
-        negative = False
+        # set the program counter value
+        simulator.increment_program_counter(to_increment)
 
-        if self.size is OpSize.BYTE:
-            negative = total & 0x80 > 0
-        elif self.size is OpSize.WORD:
-            negative = total & 0x8000 > 0
-        elif self.size is OpSize.LONG:
-            negative = total & 0x80000000 > 0
 
-        original_negative = False
+    def fold_execute(self):
+        """
+        Gets a function which does what execute does to the registers,
+        for ADDs from Dn or an immediate to Dn
+        :return: the function, or None
+        """
+        source = opcode_util.fold_operand(self.src)
+        if source is None or self.dest.mode is not EAMode.DRD:
+            return None
 
-        if self.size is OpSize.BYTE:
-            original_negative = src_val & 0x80 > 0
-        elif self.size is OpSize.WORD:
-            original_negative = src_val & 0x8000 > 0
-        elif self.size is OpSize.LONG:
-            original_negative = src_val & 0x80000000 > 0
-
-        # set the same as the carry bit
-        simulator.set_condition_status_code(ConditionStatusCode.X, carry_bit)
-        # result is negative
-        simulator.set_condition_status_code(ConditionStatusCode.N, negative)
-        # result is zeor
-        simulator.set_condition_status_code(ConditionStatusCode.Z, (raw_total & mask) == 0)
-        # set if an overflow is generated, cleared otherwise
-        simulator.set_condition_status_code(ConditionStatusCode.V, negative != original_negative)
-        # set if a carry is generated, cleared otherwise
-        simulator.set_condition_status_code(ConditionStatusCode.C, carry_bit)
+        src_register, value = source
+        dest_register = self.dest.data
+        val_length = self.size.get_number_of_bytes()
+        mask = SIZE_MASKS[val_length]
+        inverted_mask = 0xFFFFFFFF ^ mask
 
-        # and set the value
-        self.dest.set_value(simulator, total, val_length)
+        def folded(simulator: M68K, registers):
+            src_val = value if src_register is None else registers[src_register]
+            dest_val = registers[dest_register]
+            raw_total = src_val + dest_val
+            simulator.set_condition_codes_from_result(AluOperation.ADD, src_val, dest_val, raw_total, val_length)
+            registers[dest_register] = (raw_total & mask) | (dest_val & inverted_mask)
 
-        # set the program counter value
-        simulator.increment_program_counter(to_increment)
+        return folded
 
+    def get_cycles(self) -> int:
+        """
+        Gets the number of clock cycles that executing this takes on a 68000
+        :return: The number of clock cycles
+        """
+        return alu_cycles(self.src, self.dest, self.size)
 
     def __str__(self):
         # Makes this a bit easier to read in doctest output
@@ -1,4 +1,5 @@
 from ...core.opcodes.opcode import Opcode
+from ...core.opcodes.registry import register_opcode
 from ...core.enum.op_size import OpSize
 from ...core.util import opcode_util
 from ...simulator.m68k import M68K
@@ -7,6 +8,7 @@ from itertools import zip_longest
 import math
 
 
+@register_opcode('DC')
 class DC(Opcode):
     valid_sizes = [OpSize.BYTE, OpSize.WORD, OpSize.LONG]
     QUOTE_DELIMETER = "'"
@@ -2,20 +2,27 @@ from ...core.enum.ea_mode import EAMode
 from ...core.models.assembly_parameter import AssemblyParameter
 from ...core.enum import ea_mode_bin
 from ...core.enum.ea_mode_bin import parse_ea_from_binary
-from ...simulator.m68k import M68K
+from ...simulator.m68k import M68K, MAX_MEMORY_LOCATION
+from ...core.enum.register import Register
+from ..util.conversions import to_word
 from ...core.opcodes.opcode import Opcode
+from ...core.opcodes.registry import register_opcode
 from ...core.util import opcode_util
 from ...core.enum.op_size import OpSize
 from ..util.parsing import parse_assembly_parameter
 from ..util.split_bits import split_bits
+from ..util.timing import LEA_CYCLES, DEFAULT_CYCLES
 
 
 class Lea(Opcode):
     pass
 
 
+@register_opcode('LEA')
 class Lea(Opcode):
-    
+    # 0100 rrr 111 followed by the EA bits
+    opcode_word_patterns = [(0xF1C0, 0x41C0)]
+
     def __init__(self, params: list):
         assert len(params) == 2
         assert isinstance(params[0], AssemblyParameter)
@@ -75,6 +82,32 @@ class Lea(Opcode):
         simulator.increment_program_counter(to_increment)
 
 
+    def fold_execute(self):
+        """
+        Gets a function which does what execute does to the registers,
+        for LEAs of an absolute address
+        :return: the function, or None
+        """
+        if self.src.mode not in [EAMode.AbsoluteLongAddress, EAMode.AbsoluteWordAddress] or \
+                not 0 <= self.src.data <= MAX_MEMORY_LOCATION:
+            return None
+
+        # the address is the same every time
+        value = to_word(self.src.data) if self.src.mode is EAMode.AbsoluteWordAddress else self.src.data
+        dest_register = int(Register.A0) + self.dest.data
+
+        def folded(simulator: M68K, registers):
+            registers[dest_register] = value
+
+        return folded
+
+    def get_cycles(self) -> int:
+        """
+        Gets the number of clock cycles that executing this takes on a 68000
+        :return: The number of clock cycles
+        """
+        return LEA_CYCLES.get(self.src.mode, DEFAULT_CYCLES)
+
     def __str__(self):
         # Makes this a bit easier to read in doctest output
         return 'LEA command: src {}, dest {}'.format(self.src, self.dest)
@@ -4,18 +4,24 @@ from ...core.enum import ea_mode_bin
 from ...core.enum.ea_mode_bin import parse_ea_from_binary
 from ...simulator.m68k import M68K
 from ...core.opcodes.opcode import Opcode
+from ...core.opcodes.registry import register_opcode
 from ...core.util.split_bits import split_bits
 from ...core.util import opcode_util
 from ..util.parsing import parse_assembly_parameter, from_str_util
 from ..models.assembly_parameter import AssemblyParameter
+from ..util.timing import move_cycles
 
 
 class Move(Opcode):  # Forward declaration
     pass
 
 
+@register_opcode('MOVE')
 class Move(Opcode):
 
+    # 00 followed by a non-zero size (the 00 size is used by other opcodes)
+    opcode_word_patterns = [(0xF000, 0x1000), (0xF000, 0x2000), (0xF000, 0x3000)]
+
     # Allowed sizes for this opcode
     valid_sizes = [OpSize.BYTE, OpSize.WORD, OpSize.LONG]
 
@@ -99,6 +105,35 @@ class Move(Opcode):
         # set the program counter value
         simulator.increment_program_counter(to_increment)
 
+    def fold_execute(self):
+        """
+        Gets a function which does what execute does to the registers,
+        for MOVEs from Dn or an immediate to Dn
+        :return: the function, or None
+        """
+        source = opcode_util.fold_operand(self.src)
+        if source is None or self.dest.mode is not EAMode.DRD:
+            return None
+
+        src_register, value = source
+        dest_register = self.dest.data
+
+        if src_register is None:
+            def folded(simulator: M68K, registers):
+                registers[dest_register] = value
+        else:
+            def folded(simulator: M68K, registers):
+                registers[dest_register] = registers[src_register]
+
+        return folded
+
+    def get_cycles(self) -> int:
+        """
+        Gets the number of clock cycles that executing this takes on a 68000
+        :return: The number of clock cycles
+        """
+        return move_cycles(self.src, self.dest, self.size)
+
     def __str__(self):
         # Makes this a bit easier to read in doctest output
         return 'Move command: Size {}, src {}, dest {}'.format(self.size, self.src, self.dest)
@@ -1,4 +1,6 @@
 from ...simulator.m68k import M68K
+from ..util.timing import DEFAULT_CYCLES
+import typing
 
 
 class Opcode:
@@ -6,6 +8,15 @@ class Opcode:
 
 
 class Opcode:
+    # (mask, value) pairs describing every first instruction word that this
+    # opcode can be disassembled from, a word matches when (word & mask) == value
+    # these are used to build the opcode dispatch table for the simulator
+    opcode_word_patterns = []
+
+    # whether this opcode can change the flow of execution (halting, traps, branches)
+    # and so must be the last instruction in a translated block
+    ends_basic_block = False
+
     def assemble(self) -> bytearray:
         """
         Assembles this opcode into hex to be inserted into memory
@@ -21,6 +32,22 @@ class Opcode:
         """
         pass
 
+    def fold_execute(self) -> typing.Optional[typing.Callable]:
+        """
+        Gets a function which does what execute does, except for moving the program counter,
+        so that translated blocks can run it and move the program counter once for the whole block.
+        Only forms that work on registers alone, and can't fail, have one
+        :return: a function taking the simulator and its registers, or None to use execute
+        """
+        return None
+
+    def get_cycles(self) -> int:
+        """
+        Gets the number of clock cycles that executing this takes on a 68000
+        :return: The number of clock cycles
+        """
+        return DEFAULT_CYCLES
+
     def __str__(self):
         return "Generic command base"
 
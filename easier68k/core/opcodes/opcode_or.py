@@ -6,17 +6,24 @@ from ...simulator.m68k import M68K
 from ...core.enum.condition_status_code import ConditionStatusCode
 from ...core.util.split_bits import split_bits
 from ...core.opcodes.opcode import Opcode
+from ...core.opcodes.registry import register_opcode
 from ...core.util import opcode_util
 from ...core.enum.op_size import OpSize
 from ..util.parsing import parse_assembly_parameter
 from ..enum.condition_status_code import ConditionStatusCode
+from ..enum.alu_operation import AluOperation
+from ..util.timing import alu_cycles
 
 
 class Or(Opcode):  # Forward declaration
     pass
 
 
+@register_opcode('OR')
 class Or(Opcode):
+    # 1000 followed by the register, opmode and EA bits
+    opcode_word_patterns = [(0xF000, 0x8000)]
+
     valid_sizes = [OpSize.BYTE, OpSize.WORD, OpSize.LONG]
 
     def __init__(self, params: list, size: OpSize=OpSize.WORD):
@@ -112,14 +119,7 @@ class Or(Opcode):
         result = src_val | dest_val
 
         # set status codes
-        num_bits = OpSize.LONG.value*8
-        to_shift = num_bits-1 # this is how far to shift to get most significant bit
-        mask = 1 << num_bits
-
-        simulator.set_condition_status_code(ConditionStatusCode.N, mask & result != 0)
-        simulator.set_condition_status_code(ConditionStatusCode.Z, result == 0)
-        simulator.set_condition_status_code(ConditionStatusCode.V, False)
-        simulator.set_condition_status_code(ConditionStatusCode.C, False)
+        simulator.set_condition_codes_from_result(AluOperation.OR, src_val, dest_val, result, val_length)
 
         # and set the value
         self.dest.set_value(simulator, result, val_length)
@@ -128,6 +128,36 @@ class Or(Opcode):
         simulator.increment_program_counter(to_increment)
 
 
+    def fold_execute(self):
+        """
+        Gets a function which does what execute does to the registers,
+        for ORs from Dn or an immediate to Dn
+        :return: the function, or None
+        """
+        source = opcode_util.fold_operand(self.src)
+        if source is None or self.dest.mode is not EAMode.DRD:
+            return None
+
+        src_register, value = source
+        dest_register = self.dest.data
+        val_length = self.size.get_number_of_bytes()
+
+        def folded(simulator: M68K, registers):
+            src_val = value if src_register is None else registers[src_register]
+            dest_val = registers[dest_register]
+            result = src_val | dest_val
+            simulator.set_condition_codes_from_result(AluOperation.OR, src_val, dest_val, result, val_length)
+            registers[dest_register] = result
+
+        return folded
+
+    def get_cycles(self) -> int:
+        """
+        Gets the number of clock cycles that executing this takes on a 68000
+        :return: The number of clock cycles
+        """
+        return alu_cycles(self.src, self.dest, self.size)
+
     def __str__(self):
         return 'Or command: size {}, src {}, dest {}'.format(self.size, self.src, self.dest)
 
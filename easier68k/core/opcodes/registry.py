@@ -0,0 +1,136 @@
+"""
+Opcode Registry
+
+Opcode classes register themselves here by their base mnemonic (the command without
+its size, such as 'MOVE' for 'MOVE.B') when their modules are loaded, so that finding
+the class for a command is a single dictionary lookup. Every module in the opcodes package
+is loaded, so adding an opcode means adding its module and doesn't mean editing a list somewhere else.
+
+    @register_opcode('MOVE')
+    class Move(Opcode):
+        ...
+
+The opcode modules aren't imported until an opcode is first needed, so that importing
+the assembler or the simulator doesn't pay for loading every opcode up front.
+"""
+
+import importlib
+import pkgutil
+import typing
+
+# the registered opcode classes by their base mnemonic, in the order they were registered
+opcode_classes = {}
+
+# modules in the opcodes package which don't hold an opcode class
+_NOT_OPCODE_MODULES = ('opcode', 'registry')
+
+# whether every opcode module has been imported
+_loaded = False
+
+# the table built by get_opcode_dispatch_table, once it has been asked for
+_dispatch_table = None
+
+
+def base_mnemonic(command: str) -> str:
+    """
+    Gets the mnemonic that a command is registered under
+
+    >>> base_mnemonic('move.b')
+    'MOVE'
+
+    >>> base_mnemonic(' LEA ')
+    'LEA'
+
+    :param command: the command, such as 'MOVE.B'
+    :return:
+    """
+    return command.split('.', 1)[0].strip().upper()
+
+
+def register_opcode(mnemonic: str) -> typing.Callable[[type], type]:
+    """
+    Class decorator which registers an opcode class under its base mnemonic
+    :param mnemonic: the command without a size, such as 'MOVE'
+    :return: the decorator
+    """
+    mnemonic = mnemonic.upper()
+
+    def register(cls: type) -> type:
+        registered = opcode_classes.get(mnemonic)
+        if registered is not None and registered.__qualname__ != cls.__qualname__:
+            raise ValueError('{} is already registered to {}'.format(mnemonic, registered.__name__))
+        # reloading a module registers its new class in the place of the old one
+        opcode_classes[mnemonic] = cls
+        return cls
+
+    return register
+
+
+def load_opcodes():
+    """
+    Imports every opcode module, which registers their classes
+    :return:
+    """
+    global _loaded
+    if _loaded:
+        return
+
+    # found from the package's directory, so that new modules don't have to be listed anywhere
+    package = importlib.import_module(__package__)
+    for module in pkgutil.iter_modules(package.__path__):
+        if module.name not in _NOT_OPCODE_MODULES:
+            importlib.import_module('.' + module.name, __package__)
+    _loaded = True
+
+
+def find_opcode_cls(command: str) -> typing.Optional[type]:
+    """
+    Finds the opcode class for a command
+    :param command: the command, such as 'MOVE.B' or 'LEA'
+    :return: the class, or None if no opcode matches the command
+    """
+    cls = opcode_classes.get(base_mnemonic(command))
+    if cls is None and not _loaded:
+        load_opcodes()
+        cls = opcode_classes.get(base_mnemonic(command))
+    if cls is not None and cls.command_matches(command):
+        return cls
+    return None
+
+
+def build_opcode_dispatch_table() -> list:
+    """
+    Builds a table with an entry for every possible first instruction word (2^16 entries)
+    which holds the opcode class that can disassemble it, or None if no opcode can.
+    If more than one opcode matches a word the one registered first is used.
+    :return: The dispatch table, indexed by the first word of an instruction
+    """
+    load_opcodes()
+    table = [None] * 0x10000
+
+    for cls in opcode_classes.values():
+        for mask, value in cls.opcode_word_patterns:
+            # walk through every combination of the bits that aren't fixed by the mask
+            free_bits = ~mask & 0xFFFF
+            bits = 0
+            while True:
+                word = value | bits
+                if table[word] is None:
+                    table[word] = cls
+                if bits == free_bits:
+                    break
+                bits = (bits - free_bits) & free_bits
+
+    return table
+
+
+def get_opcode_dispatch_table() -> list:
+    """
+    Gets the dispatch table that the simulator uses to find the opcode for an instruction,
+    it is built the first time that it is asked for
+    :return: The dispatch table, indexed by the first word of an instruction
+    """
+    global _dispatch_table
+    if _dispatch_table is None:
+        _dispatch_table = build_opcode_dispatch_table()
+    return _dispatch_table
@@ -1,5 +1,6 @@
 from ...simulator.m68k import M68K
 from ...core.opcodes.opcode import Opcode
+from ...core.opcodes.registry import register_opcode
 from ...core.util import opcode_util
 from ..enum.op_size import OpSize
 import binascii
@@ -8,7 +9,14 @@ class Simhalt(Opcode):
     pass
 
 
+@register_opcode('SIMHALT')
 class Simhalt(Opcode):
+    # SIMHALT is FFFFFFFF, the second word is checked when disassembling
+    opcode_word_patterns = [(0xFFFF, 0xFFFF)]
+
+    # stops the simulation
+    ends_basic_block = True
+
     def __init__(self):
         pass  # Nothing to initialize: SIMHALT is parameterless
 
@@ -1,4 +1,5 @@
 from ..opcodes.opcode import Opcode
+from ..opcodes.registry import register_opcode
 from ...simulator.m68k import M68K
 from ..util.parsing import parse_assembly_parameter, from_str_util
 from ..util.split_bits import split_bits
@@ -6,13 +7,28 @@ from ..models.trap_vector import TrapVector
 from ..enum.trap_task import TrapTask
 from ..enum.register import Register
 from ..enum.op_size import OpSize
-from ..util.input import get_input
 from ..enum.trap_vector import TrapVectors
+from ...simulator.input_provider import InputNotReadyError
+from ..util.timing import TRAP_CYCLES
+
+# the most characters that ReadNullTermString stores
+MAX_STRING_INPUT_LENGTH = 80
+
+# the tasks that read from the keyboard
+INPUT_TASKS = frozenset([TrapTask.ReadNullTermString, TrapTask.ReadNumberFromKeyboard,
+                         TrapTask.ReadSingleCharacterFromKeyboard,
+                         TrapTask.DisplayNullTermStringAndReadNumberFromKeyboard])
 
 class Trap(Opcode): # forward declaration
     pass
 
+@register_opcode('TRAP')
 class Trap(Opcode):
+    # 010011100100 followed by the 4 bit vector
+    opcode_word_patterns = [(0xFFF0, 0x4E40)]
+
+    # stops the simulation or hands control to the trap handler
+    ends_basic_block = True
 
     def __init__(self, param: TrapVectors):
         assert isinstance(param, TrapVectors)
@@ -50,49 +66,59 @@ class Trap(Opcode):
 
             task = TrapTask(simulator.get_register_value(Register.D0))
 
-            if task is TrapTask.DisplayNullTermString:
+            if task in INPUT_TASKS and not self.use_debug_input and not simulator.input.ready():
+                # nothing has been done yet, so this can be executed again once the input is there
+                raise InputNotReadyError('Waiting for input')
 
-                # get the value of A1
-                location = simulator.get_register_value(Register.A1)
-                value = int.from_bytes(simulator.memory.get(1, location), byteorder='big', signed=False)
-                while value != 0:
-                    print(chr(value), end='')
-                    location += 1
-                    value = int.from_bytes(simulator.memory.get(1, location), byteorder='big', signed=False)
-
-            if task is TrapTask.DisplayNullTermStringWithCRLF:
-                # get the value of A1
+            if task in [TrapTask.DisplayNullTermString, TrapTask.DisplayNullTermStringWithCRLF,
+                        TrapTask.DisplayNullTermStringAndReadNumberFromKeyboard]:
+                # get the value of A1, which points to the string
                 location = simulator.get_register_value(Register.A1)
-                value = int.from_bytes(simulator.memory.get(1, location), byteorder='big', signed=False)
-                while value != 0:
-                    print(chr(value), end='')
-                    location += 1
-                    value = int.from_bytes(simulator.memory.get(1, location), byteorder='big', signed=False)
-                print('')
-
-            if task is TrapTask.DisplayNullTermStringAndReadNumberFromKeyboard:
-                # get the value of A1
-                location = simulator.get_register_value(Register.A1)
-                value = int.from_bytes(simulator.memory.get(1, location), byteorder='big', signed=False)
-                while value != 0:
-                    print(chr(value), end='')
-                    location += 1
-                    value = int.from_bytes(simulator.memory.get(1, location), byteorder='big', signed=False)
-
-                # read a number from the keyboard
+                # find the terminator and display the whole string at once
+                text = simulator.memory.read_string(location).decode('latin-1')
+
+                if task is TrapTask.DisplayNullTermStringWithCRLF:
+                    text += '\n'
+
+                simulator.output.write(text)
+
+            if task in [TrapTask.ReadNumberFromKeyboard, TrapTask.DisplayNullTermStringAndReadNumberFromKeyboard]:
+                # read a number into D1.L, anything that isn't a number reads as 0
+                try:
+                    value = int(self._read_line(simulator).strip())
+                except ValueError:
+                    value = 0
+                simulator.set_register_value(Register.D1, value & 0xFFFFFFFF)
+
+            if task is TrapTask.ReadNullTermString:
+                # store the string at (A1) with its terminator, and its length in D1.W
+                text = self._read_line(simulator)[:MAX_STRING_INPUT_LENGTH]
+                data = text.encode('latin-1', 'replace')
+                simulator.memory.write_bytes(simulator.get_register_value(Register.A1), data + b'\x00')
+                d1 = simulator.get_register_value(Register.D1)
+                simulator.set_register_value(Register.D1, (d1 & 0xFFFF0000) | len(data))
+
+            if task is TrapTask.ReadSingleCharacterFromKeyboard:
+                # store the character in D1.B
+                if self.use_debug_input:
+                    char = self.debug_input[0] if self.debug_input else '\r'
+                else:
+                    simulator.output.flush()
+                    char = simulator.input.read_char()
+                d1 = simulator.get_register_value(Register.D1)
+                simulator.set_register_value(Register.D1, (d1 & 0xFFFFFF00) | (ord(char) & 0xFF))
 
             if task is TrapTask.DisplaySignedNumber:
                 # get the value of D1.L
-                value = simulator.get_register(Register.D1)
-                int_val = int.from_bytes(value, byteorder='big', signed=True)
-                print(int_val, end='')
+                int_val = simulator.get_register_long(Register.D1)
+                if int_val & 0x80000000:
+                    int_val -= 0x100000000
+                simulator.output.write(str(int_val))
 
             if task is TrapTask.DisplaySingleCharacter:
                 # get the value of D1.B
-                value = simulator.get_register_value(Register.D1)
-                # mask it
-                value = 0xFF & value
-                print(chr(value), end='')
+                value = simulator.get_register_byte(Register.D1)
+                simulator.output.write(chr(value))
 
             if task is TrapTask.Terminate:
                 # same as SIMHALT
@@ -102,6 +128,25 @@ class Trap(Opcode):
         simulator.increment_program_counter(OpSize.WORD.value)
 
 
+    def _read_line(self, simulator: M68K) -> str:
+        """
+        Reads a line of input for the program
+        Anything that has been displayed is flushed first, so that prompts are shown
+        :param simulator:
+        :return:
+        """
+        if self.use_debug_input:
+            return self.debug_input
+        simulator.output.flush()
+        return simulator.input.read_line()
+
+    def get_cycles(self) -> int:
+        """
+        Gets the number of clock cycles that executing this takes on a 68000
+        :return: The number of clock cycles
+        """
+        return TRAP_CYCLES
+
     def __str__(self):
         return 'TRAP {}'.format(self.trpVector)
 
@@ -1,5 +1,6 @@
 __all__ = [
     'conversions',
+    'condition_codes',
     'parsing',
     'opcode_util',
     'find_module',
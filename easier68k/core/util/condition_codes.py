@@ -0,0 +1,116 @@
+"""
+Condition code evaluation
+
+Works out the value of the condition code register after an ALU operation
+from the operation's inputs and result, so that opcodes (and the simulator,
+when it defers this work) share the same rules.
+"""
+
+from ..enum.alu_operation import AluOperation
+from ..enum.condition_status_code import ConditionStatusCode
+
+# all of the bits in the CCR
+ALL_CONDITION_CODES = ConditionStatusCode.X | ConditionStatusCode.N | ConditionStatusCode.Z | \
+                      ConditionStatusCode.V | ConditionStatusCode.C
+
+# masks for each operation size, in bytes
+SIZE_MASKS = {1: 0xFF, 2: 0xFFFF, 4: 0xFFFFFFFF}
+
+# the most significant bit for each operation size, in bytes
+SIZE_SIGN_BITS = {1: 0x80, 2: 0x8000, 4: 0x80000000}
+
+
+def add_condition_codes(ccr: int, src: int, dest: int, raw_total: int, size: int) -> int:
+    """
+    Gets the CCR value after an ADD
+
+    >>> bin(add_condition_codes(0, 0xFF, 0x01, 0x100, 1))
+    '0b10111'
+
+    >>> bin(add_condition_codes(0, 0x01, 0x01, 0x02, 2))
+    '0b0'
+
+    :param ccr: the value of the CCR before the operation
+    :param src: the source value
+    :param dest: the destination value
+    :param raw_total: src + dest, without being masked to the size
+    :param size: the size of the operation in bytes
+    :return: the new value of the CCR
+    """
+    mask = SIZE_MASKS[size]
+    sign_bit = SIZE_SIGN_BITS[size]
+
+    # if the total is greater than the maximum size for the operation
+    # then the carry bit will be set
+    carry = raw_total > mask
+    negative = raw_total & sign_bit > 0
+    original_negative = src & sign_bit > 0
+
+    ccr = 0
+    if carry:
+        # X is set the same as the carry bit
+        ccr |= ConditionStatusCode.X | ConditionStatusCode.C
+    if negative:
+        ccr |= ConditionStatusCode.N
+    if raw_total & mask == 0:
+        ccr |= ConditionStatusCode.Z
+    if negative != original_negative:
+        ccr |= ConditionStatusCode.V
+    return ccr
+
+
+def or_condition_codes(ccr: int, src: int, dest: int, result: int, size: int) -> int:
+    """
+    Gets the CCR value after an OR
+    V and C are always cleared, X is not affected
+
+    >>> bin(or_condition_codes(0b11111, 0x0, 0x0, 0x0, 2))
+    '0b10100'
+
+    :param ccr: the value of the CCR before the operation
+    :param src: the source value
+    :param dest: the destination value
+    :param result: src | dest
+    :param size: the size of the operation in bytes
+    :return: the new value of the CCR
+    """
+    # N is checked with the same mask that OR has always used
+    mask = 1 << 32
+
+    ccr &= ConditionStatusCode.X
+    if mask & result != 0:
+        ccr |= ConditionStatusCode.N
+    if result == 0:
+        ccr |= ConditionStatusCode.Z
+    return ccr
+
+
+# the function that evaluates each operation
+EVALUATORS = {
+    AluOperation.ADD: add_condition_codes,
+    AluOperation.OR: or_condition_codes
+}
+
+# the bits of the CCR that each operation sets, the others are left alone
+AFFECTED_CONDITION_CODES = {
+    AluOperation.ADD: ALL_CONDITION_CODES,
+    AluOperation.OR: ALL_CONDITION_CODES & ~ConditionStatusCode.X
+}
+
+
+def evaluate_condition_codes(operation: AluOperation, ccr: int, src: int, dest: int, result: int, size: int) -> int:
+    """
+    Gets the CCR value after an ALU operation
+
+    >>> bin(evaluate_condition_codes(AluOperation.ADD, 0, 0xFFFF, 0x1, 0x10000, 2))
+    '0b10111'
+
+    :param operation: the kind of operation
+    :param ccr: the value of the CCR before the operation
+    :param src: the source value
+    :param dest: the destination value
+    :param result: the result of the operation, before being masked to the size
+    :param size: the size of the operation in bytes
+    :return: the new value of the CCR
+    """
+    return EVALUATORS[operation](ccr, src, dest, result, size)
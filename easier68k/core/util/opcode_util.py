@@ -1,6 +1,7 @@
 from ..enum.ea_mode import EAMode
 from ..util.parsing import parse_assembly_parameter, from_str_util
 from ..enum.op_size import OpSize
+import typing
 
 
 def command_matches(command: str, template: str) -> bool:
@@ -265,3 +266,26 @@ def n_param_from_str(command: str, parameters: str, opcode_cls, n: int=2, defaul
         return opcode_cls(parsed, size)
     else:
         return opcode_cls(parsed)
+
+
+def fold_operand(param) -> typing.Optional[typing.Tuple[typing.Optional[int], int]]:
+    """
+    Gets where the value of a Dn or immediate source comes from, for the folded version of execute
+
+    >>> fold_operand(parse_assembly_parameter('D3'))
+    (3, 0)
+
+    >>> fold_operand(parse_assembly_parameter('#$42'))
+    (None, 66)
+
+    >>> fold_operand(parse_assembly_parameter('(A0)')) is None
+    True
+
+    :param param: the source AssemblyParameter
+    :return: (register index, 0) for a register, (None, value) for an immediate, or None if it can't be folded
+    """
+    if param.mode is EAMode.DRD:
+        return param.data, 0
+    if param.mode is EAMode.IMM and 0 <= param.data <= 0xFFFFFFFF:
+        return None, param.data
+    return None
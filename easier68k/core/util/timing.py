@@ -0,0 +1,96 @@
+"""
+Timing
+
+The number of clock cycles that instructions take on the 68000,
+from the instruction execution times in the M68000 user's manual.
+These don't include wait states, and TRAP #15 tasks take as long as any other trap.
+
+>>> from easier68k.core.models.assembly_parameter import AssemblyParameter
+>>> effective_address_cycles(AssemblyParameter(EAMode.ARIPD, 0), OpSize.WORD)
+6
+>>> effective_address_cycles(AssemblyParameter(EAMode.ALA, 0x1000), OpSize.LONG)
+16
+"""
+
+from ..enum.ea_mode import EAMode
+from ..enum.op_size import OpSize
+
+# the cycles taken to work out (and read) an effective address, for byte/word and long operations
+_EFFECTIVE_ADDRESS_CYCLES = {
+    EAMode.DRD: (0, 0),
+    EAMode.ARD: (0, 0),
+    EAMode.ARI: (4, 8),
+    EAMode.ARIPI: (4, 8),
+    EAMode.ARIPD: (6, 10),
+    EAMode.AWA: (8, 12),
+    EAMode.ALA: (12, 16),
+    EAMode.IMM: (4, 8),
+}
+
+# the cycles taken to write to the destination of a MOVE, for byte/word and long operations
+# unlike other destinations, -(An) doesn't take longer than (An)
+_MOVE_DESTINATION_CYCLES = {
+    EAMode.DRD: (0, 0),
+    EAMode.ARD: (0, 0),
+    EAMode.ARI: (4, 8),
+    EAMode.ARIPI: (4, 8),
+    EAMode.ARIPD: (4, 8),
+    EAMode.AWA: (8, 12),
+    EAMode.ALA: (12, 16),
+}
+
+# the cycles taken by LEA for each source
+LEA_CYCLES = {
+    EAMode.ARI: 4,
+    EAMode.AWA: 8,
+    EAMode.ALA: 12,
+}
+
+# the cycles taken by TRAP
+TRAP_CYCLES = 34
+
+# the cycles taken by the instructions which don't have a more exact time
+DEFAULT_CYCLES = 4
+
+
+def effective_address_cycles(param, size: OpSize) -> int:
+    """
+    Gets the cycles taken to work out an effective address and read from it
+    :param param: the AssemblyParameter
+    :param size: the size of the operation
+    :return:
+    """
+    return _EFFECTIVE_ADDRESS_CYCLES[param.mode][size is OpSize.LONG]
+
+
+def move_cycles(src, dest, size: OpSize) -> int:
+    """
+    Gets the cycles taken by MOVE
+    :param src: the source AssemblyParameter
+    :param dest: the destination AssemblyParameter
+    :param size: the size of the operation
+    :return:
+    """
+    return 4 + effective_address_cycles(src, size) + _MOVE_DESTINATION_CYCLES[dest.mode][size is OpSize.LONG]
+
+
+def alu_cycles(src, dest, size: OpSize) -> int:
+    """
+    Gets the cycles taken by the ALU instructions such as ADD and OR
+    which have a data register as either their source or their destination
+    :param src: the source AssemblyParameter
+    :param dest: the destination AssemblyParameter
+    :param size: the size of the operation
+    :return:
+    """
+    if dest.mode is EAMode.DRD:
+        # <ea>,Dn
+        if size is OpSize.LONG:
+            # register and immediate sources take 2 more cycles than the others
+            base = 8 if src.mode in (EAMode.DRD, EAMode.ARD, EAMode.IMM) else 6
+        else:
+            base = 4
+        return base + effective_address_cycles(src, size)
+
+    # Dn,<ea> reads and then writes the destination
+    return (12 if size is OpSize.LONG else 8) + effective_address_cycles(dest, size)
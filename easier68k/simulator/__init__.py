@@ -1,5 +1,21 @@
 __all__ = [
+    'batch',
+    'block_translator',
     'clock',
+    'daemon',
+    'dump_format',
+    'input_provider',
+    'instruction_cache',
+    'instrumentation',
+    'journal',
     'm68k',
-    'memory'
-]
\ No newline at end of file
+    'mapped_memory',
+    'memory',
+    'output_sink',
+    'paged_memory',
+    'profiler',
+    'snapshot',
+    'trace'
+]
+
+# lockstep is left out, it needs the optional numpy
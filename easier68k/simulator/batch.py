@@ -0,0 +1,146 @@
+"""
+Batch
+
+Runs many programs, each in its own M68K, spread across a pool of processes.
+Every program is given a limit on the number of instructions it can execute
+and on how long it can run for, so that one bad program can't hold up the rest.
+Programs never read from the terminal, keyboard input comes from a list of lines
+and running out of it stops the program with an error.
+
+Each program produces a result dictionary, which can be written as a line of JSON.
+"""
+
+from ..core.enum.register import Register
+from ..core.models.list_file import ListFile
+from .m68k import M68K
+from .block_translator import MAX_BLOCK_LENGTH
+from .paged_memory import PagedMemory
+from .output_sink import CaptureSink
+from .input_provider import QueueInputProvider
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import os
+import time
+import typing
+
+# the default limits for each program
+DEFAULT_INSTRUCTION_BUDGET = 1000000
+DEFAULT_TIMEOUT = 10.0
+
+# how many instructions are executed between looking at the time
+TIMEOUT_CHECK_INSTRUCTIONS = 1024
+
+# why a program stopped running
+HALT_REASON_HALTED = 'halted'
+HALT_REASON_INSTRUCTION_BUDGET = 'instruction_budget'
+HALT_REASON_TIMEOUT = 'timeout'
+HALT_REASON_UNKNOWN_INSTRUCTION = 'unknown_instruction'
+HALT_REASON_ERROR = 'error'
+
+# file extensions that are loaded as S-records, everything else is loaded as list file JSON
+S_RECORD_EXTENSIONS = ('.s68', '.srec', '.s19', '.s28', '.s37')
+
+
+def load_program(simulator: M68K, path: str):
+    """
+    Loads a program from either a list file (JSON) or an S-record file into a simulator
+    :param simulator: the simulator to load the program into
+    :param path: the path of the file, S-records are recognized by their extension
+    :return:
+    """
+    with open(path) as in_file:
+        if os.path.splitext(path)[1].lower() in S_RECORD_EXTENSIONS:
+            # S-records are loaded straight into memory, without building a list file
+            simulator.load_s_records(in_file)
+        else:
+            list_file = ListFile()
+            list_file.load_from_json(in_file.read())
+            simulator.load_list_file(list_file)
+
+
+def run_program(path: str, instruction_budget: int = DEFAULT_INSTRUCTION_BUDGET,
+                timeout: float = DEFAULT_TIMEOUT, input_lines: typing.Sequence[str] = ()) -> dict:
+    """
+    Loads and runs a single program until it halts or runs out of instructions or time
+    The time is checked every TIMEOUT_CHECK_INSTRUCTIONS instructions
+    :param path: the path of the list file or S-record file
+    :param instruction_budget: the most instructions the program can execute
+    :param timeout: the most seconds the program can run for
+    :param input_lines: the lines of keyboard input to give the program
+    :return: the result, with the file, halt reason, output, registers, cycles and instruction count
+    """
+    result = {
+        'file': path,
+        'halt_reason': None,
+        'output': '',
+        'registers': {},
+        'cycles': 0,
+        'instructions': 0,
+    }
+
+    output = CaptureSink()
+    executed = 0
+    simulator = None
+    try:
+        simulator = M68K(memory=PagedMemory(), output=output, input=QueueInputProvider(input_lines))
+        load_program(simulator, path)
+
+        deadline = time.monotonic() + timeout
+        next_time_check = 0
+        while not simulator.halted:
+            if executed >= instruction_budget:
+                result['halt_reason'] = HALT_REASON_INSTRUCTION_BUDGET
+                break
+            if executed >= next_time_check:
+                if time.monotonic() > deadline:
+                    result['halt_reason'] = HALT_REASON_TIMEOUT
+                    break
+                next_time_check = executed + TIMEOUT_CHECK_INSTRUCTIONS
+
+            # whole blocks are only run when they can't go past the budget or the next time check
+            if min(instruction_budget, next_time_check) - executed >= MAX_BLOCK_LENGTH:
+                count = simulator.block_translator.execute_block(simulator)
+            elif simulator.fetch_instruction(simulator.get_program_counter_value()) is None:
+                count = 0
+            else:
+                simulator.step_instruction()
+                count = 1
+            if count == 0:
+                result['halt_reason'] = HALT_REASON_UNKNOWN_INSTRUCTION
+                break
+            executed += count
+        else:
+            result['halt_reason'] = HALT_REASON_HALTED
+    except Exception as error:
+        result['halt_reason'] = HALT_REASON_ERROR
+        result['error'] = '{}: {}'.format(type(error).__name__, error)
+
+    result['output'] = output.getvalue()
+    result['instructions'] = executed
+    if simulator is not None:
+        result['registers'] = {register.name: simulator.get_register_value(register) for register in Register}
+        result['cycles'] = simulator.get_cycles()
+
+    return result
+
+
+def run_batch(paths: typing.Iterable[str], instruction_budget: int = DEFAULT_INSTRUCTION_BUDGET,
+              timeout: float = DEFAULT_TIMEOUT, workers: int = None,
+              input_lines: typing.Sequence[str] = ()) -> typing.Iterator[dict]:
+    """
+    Runs many programs across a pool of processes
+    :param paths: the paths of the list files or S-record files to run
+    :param instruction_budget: the most instructions each program can execute
+    :param timeout: the most seconds each program can run for
+    :param workers: the number of processes to use, defaults to the number of CPUs
+    :param input_lines: the lines of keyboard input to give each program
+    :return: the result of each program from run_program, in the same order as paths
+    """
+    paths = list(paths)
+    run = functools.partial(run_program, instruction_budget=instruction_budget, timeout=timeout,
+                            input_lines=list(input_lines))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # hand out programs in chunks so that short programs aren't dominated by the cost of sending them
+        chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+        yield from executor.map(run, paths, chunksize=chunksize)
@@ -0,0 +1,191 @@
+"""
+Block Translator
+
+Turns straight-line runs of instructions (basic blocks) into a single
+Python callable, so that M68K.run can execute a whole block without
+fetching, checking and dispatching every instruction on its own.
+
+A block is built the first time execution reaches its starting location,
+by executing its instructions one at a time and recording them.
+It ends at any instruction that can change the flow of execution
+(SIMHALT, TRAP, or any opcode with ends_basic_block set).
+The next time execution reaches that location, the compiled block is used.
+Instructions which only change registers (see Opcode.fold_execute) are run as
+specialised functions, with the program counter set once after each run of them.
+
+Blocks are dropped when the memory they were built from is written to.
+A block that is running stops as soon as a write drops a block, or an instruction
+doesn't leave the program counter where it did when the block was built,
+so that self-modifying code still behaves correctly.
+"""
+
+from .instruction_cache import InstructionCache, MAX_INSTRUCTION_LENGTH
+from ..core.enum.register import Register
+import typing
+import weakref
+
+_PC = int(Register.ProgramCounter)
+
+# the most instructions that are put in a single block
+MAX_BLOCK_LENGTH = 64
+
+# every BlockTranslator, so that their blocks can be dropped when the opcode classes change
+_translators = weakref.WeakSet()
+
+
+def compile_block(ops: list, next_locations: list, translator: 'BlockTranslator') -> typing.Callable:
+    """
+    Compiles a list of opcodes into a single function which executes all of them
+    :param ops: the opcodes in the block, in the order they are executed
+    :param next_locations: the program counter after each of the opcodes, when the block was built
+    :param translator: the translator the block belongs to, which counts the blocks that were dropped
+    :return: a function which takes the simulator, executes the block on it and
+    returns the number of instructions executed
+    """
+    # runs of opcodes that can be folded only change registers, and can't fail,
+    # so each run is a series of folded functions and the program counter is set once at the end of it,
+    # anything else is executed as it is, and checked afterwards
+    # each step is (folded functions or None, execute, cycles, instructions, next location)
+    steps = []
+    for op, next_location in zip(ops, next_locations):
+        folded = op.fold_execute()
+        if folded is None:
+            steps.append((None, op.execute, op.get_cycles(), 1, next_location))
+        elif steps and steps[-1][0] is not None:
+            functions, _, cycles, count, _ = steps[-1]
+            steps[-1] = (functions + (folded,), None, cycles + op.get_cycles(), count + 1, next_location)
+        else:
+            steps.append(((folded,), None, op.get_cycles(), 1, next_location))
+    steps = tuple(steps)
+
+    def run_block(simulator):
+        registers = simulator.registers
+        invalidated = translator.invalidated
+        executed = 0
+        # the cycles are added as each step finishes, in case an instruction raises
+        try:
+            for functions, execute, cycles, count, next_location in steps:
+                if functions is not None:
+                    for folded in functions:
+                        folded(simulator, registers)
+                    registers[_PC] = next_location
+                    simulator._clock_cycles += cycles
+                    executed += count
+                    continue
+
+                execute(simulator)
+                simulator._clock_cycles += cycles
+                executed += 1
+                # stop if the rest of the block could have been written over, or execution went somewhere else
+                if translator.invalidated != invalidated or registers[_PC] != next_location:
+                    break
+        finally:
+            translator.executed = executed
+        return executed
+
+    return run_block
+
+
+class BlockTranslator:
+    def __init__(self, simulator):
+        """
+        Constructor
+        :param simulator: the M68K that blocks are built for
+        """
+        # compiled blocks, by their starting location
+        self.blocks = InstructionCache()
+
+        # counts the writes which dropped blocks, so that a running block can tell it may be out of date
+        self.invalidated = 0
+
+        # the number of instructions that the last block executed, which is still set if one of them raised
+        self.executed = 0
+
+        # (location, size) of the writes made by the instruction that is being built into a block
+        self._building_writes = None
+
+        simulator.memory.add_write_listener(self._invalidate)
+        _translators.add(self)
+
+    def execute_block(self, simulator):
+        """
+        Executes the block starting at the current program counter,
+        building it first if it has not been executed before
+        :param simulator: the simulator to execute on
+        :return: the number of instructions executed
+        """
+        start = simulator.get_program_counter_value()
+
+        block = self.blocks.get(start)
+        if block is not None:
+            return block(simulator)
+
+        # build the block by executing it one instruction at a time
+        ops = []
+        next_locations = []
+        location = start
+        stale = False
+        self._building_writes = []
+        try:
+            while True:
+                op = simulator.fetch_instruction(location)
+                if op is None:
+                    break
+
+                op.execute(simulator)
+                simulator._clock_cycles += op.get_cycles()
+                ops.append(op)
+                next_locations.append(simulator.get_program_counter_value())
+
+                # a block that wrote over its own instructions isn't kept, they may not be the ones that ran,
+                # writes further on are fine as those instructions haven't been fetched yet
+                end = location + MAX_INSTRUCTION_LENGTH if op.ends_basic_block else next_locations[-1]
+                stale = any(written < end and start < written + size for written, size in self._building_writes)
+                self._building_writes.clear()
+
+                if op.ends_basic_block or simulator.halted or len(ops) == MAX_BLOCK_LENGTH or stale:
+                    break
+
+                location = simulator.get_program_counter_value()
+        finally:
+            self._building_writes = None
+            self.executed = len(ops)
+
+        if ops and not stale:
+            # the block covers everything up to the end of the last instruction
+            self.blocks.put(start, compile_block(ops, next_locations, self), location - start + MAX_INSTRUCTION_LENGTH)
+
+        return len(ops)
+
+    def clear(self):
+        """
+        Drops all of the compiled blocks
+        :return:
+        """
+        self.blocks.clear()
+        self.invalidated += 1
+
+    def _invalidate(self, location: int, size: int):
+        """
+        Memory write listener which drops the blocks built from the memory that was written to
+        :param location:
+        :param size:
+        :return:
+        """
+        if self._building_writes is not None:
+            self._building_writes.append((location, size))
+
+        count = len(self.blocks.entries)
+        self.blocks.invalidate(location, size)
+        if len(self.blocks.entries) != count:
+            self.invalidated += 1
+
+
+def clear_all_blocks():
+    """
+    Drops the compiled blocks of every simulator, which hold on to the execute methods
+    that they were compiled with
+    :return:
+    """
+    for translator in list(_translators):
+        translator.clear()
@@ -0,0 +1,384 @@
+"""
+Daemon
+
+A long-lived process which serves many simulation sessions over a Unix domain socket,
+so that each action doesn't pay for importing easier68k and setting up a simulator.
+
+Requests and responses are JSON-RPC 2.0, one JSON object per line.
+Each session is an M68K with PagedMemory, so an idle session costs very little,
+and requests are handled as their own tasks, so a session can be given input
+while a run on it is waiting for that input.
+
+    {"jsonrpc": "2.0", "id": 1, "method": "create_session"}
+    {"jsonrpc": "2.0", "id": 1, "result": "1"}
+    {"jsonrpc": "2.0", "id": 2, "method": "run", "params": {"session": "1", "max_instructions": 1000}}
+"""
+
+from ..core.enum.register import Register
+from ..core.models.list_file import ListFile
+from .m68k import M68K, DEFAULT_SLICE
+from .paged_memory import PagedMemory
+from .output_sink import CaptureSink
+from .input_provider import AsyncQueueInputProvider
+import asyncio
+import inspect
+import itertools
+import json
+import os
+import socket
+import stat
+import typing
+
+# the standard JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+# the simulator raised an exception while handling the request
+SIMULATOR_ERROR = -32000
+# the session already has MAX_SNAPSHOTS snapshots
+TOO_MANY_SNAPSHOTS = -32001
+
+# the most instructions that one run request executes, so that a program which never halts can't run forever
+DEFAULT_MAX_INSTRUCTIONS = 1000000
+
+# the most snapshots that a session keeps, each one holds on to a copy of the memory that was used
+MAX_SNAPSHOTS = 64
+
+# the biggest request (one line of JSON) that is accepted
+MAX_REQUEST_SIZE = 64 * 1024 * 1024
+
+
+class DaemonError(Exception):
+    def __init__(self, code: int, message: str):
+        """
+        Constructor
+        :param code: the JSON-RPC error code
+        :param message:
+        """
+        super().__init__(message)
+        self.code = code
+
+
+class Session:
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.output = CaptureSink()
+        self.input = AsyncQueueInputProvider()
+        self.simulator = M68K(memory=PagedMemory(), output=self.output, input=self.input)
+
+        # snapshots of the simulator, by their id
+        self.snapshots = {}
+        self._snapshot_ids = itertools.count(1)
+
+        # only one request can use the simulator at a time
+        self.lock = asyncio.Lock()
+
+    def add_snapshot(self) -> str:
+        """
+        Takes a snapshot of the simulator and keeps it
+        :return: the id of the snapshot
+        """
+        if len(self.snapshots) >= MAX_SNAPSHOTS:
+            raise DaemonError(TOO_MANY_SNAPSHOTS, 'Sessions can only keep {} snapshots, drop one first'.format(
+                MAX_SNAPSHOTS))
+        snapshot_id = str(next(self._snapshot_ids))
+        self.snapshots[snapshot_id] = self.simulator.snapshot()
+        return snapshot_id
+
+
+class SimulationServer:
+    def __init__(self):
+        """
+        Constructor
+        """
+        # the open sessions, by their id
+        self.sessions = {}
+        self._session_ids = itertools.count(1)
+
+        self._server = None
+
+    async def start(self, path: str):
+        """
+        Starts listening on a Unix domain socket, replacing a stale socket file if there is one
+        :param path: the path of the socket, which must not be anything other than a socket
+        :return:
+        """
+        if os.path.exists(path):
+            if not stat.S_ISSOCK(os.stat(path).st_mode):
+                raise FileExistsError('{} already exists and is not a socket'.format(path))
+            os.unlink(path)
+        self._server = await asyncio.start_unix_server(self._handle_connection, path, limit=MAX_REQUEST_SIZE)
+
+    async def serve_forever(self, path: str):
+        """
+        Serves requests on a Unix domain socket until cancelled
+        :param path: the path of the socket
+        :return:
+        """
+        await self.start(path)
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        """
+        Stops listening for connections
+        :return:
+        """
+        if self._server is not None:
+            self._server.close()
+
+    async def handle_request(self, request: dict) -> dict:
+        """
+        Handles a single JSON-RPC request
+        :param request: the decoded request
+        :return: the response, or None for a notification (a request without an id)
+        """
+        request_id = request.get('id') if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+                raise DaemonError(INVALID_REQUEST, 'Invalid request')
+
+            handler = getattr(self, 'rpc_' + request['method'], None)
+            if handler is None:
+                raise DaemonError(METHOD_NOT_FOUND, 'Unknown method {}'.format(request['method']))
+
+            params = request.get('params', {})
+            if not isinstance(params, dict):
+                raise DaemonError(INVALID_PARAMS, 'params must be an object')
+            try:
+                inspect.signature(handler).bind(**params)
+            except TypeError as error:
+                raise DaemonError(INVALID_PARAMS, str(error)) from error
+            result = await handler(**params)
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        except DaemonError as error:
+            response = {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': error.code, 'message': str(error)}}
+        except Exception as error:
+            response = {'jsonrpc': '2.0', 'id': request_id,
+                        'error': {'code': SIMULATOR_ERROR, 'message': '{}: {}'.format(type(error).__name__, error)}}
+
+        if isinstance(request, dict) and 'id' not in request:
+            return None
+        return response
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Reads requests from a connection, one per line, handling each as its own task
+        Responses are written as they finish, so they can be out of order
+        :param reader:
+        :param writer:
+        :return:
+        """
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.ensure_future(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter):
+        """
+        Handles one line of a connection and writes the response
+        :param line:
+        :param writer:
+        :return:
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            response = {'jsonrpc': '2.0', 'id': None, 'error': {'code': PARSE_ERROR, 'message': 'Parse error'}}
+        else:
+            response = await self.handle_request(request)
+
+        if response is not None:
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+
+    def _get_session(self, session: str) -> Session:
+        """
+        Gets an open session
+        :param session: the id of the session
+        :return:
+        """
+        try:
+            return self.sessions[session]
+        except KeyError:
+            raise DaemonError(INVALID_PARAMS, 'Unknown session {}'.format(session))
+
+    @staticmethod
+    def _status(session: Session) -> dict:
+        """
+        Describes the state of a session after it has been run
+        :param session:
+        :return:
+        """
+        simulator = session.simulator
+        return {
+            'halted': simulator.halted,
+            'pc': simulator.get_program_counter_value(),
+            'cycles': simulator.get_cycles(),
+        }
+
+    # the methods that can be requested, each is rpc_ followed by the name of the method
+
+    async def rpc_create_session(self) -> str:
+        session_id = str(next(self._session_ids))
+        self.sessions[session_id] = Session()
+        return session_id
+
+    async def rpc_close_session(self, session: str) -> bool:
+        closing = self._get_session(session)
+        # anything waiting for input gets EndOfInputError instead of waiting forever
+        closing.input.close()
+        del self.sessions[session]
+        return True
+
+    async def rpc_list_sessions(self) -> typing.List[str]:
+        return list(self.sessions)
+
+    async def rpc_load_list_file(self, session: str, list_file: typing.Union[str, dict]) -> dict:
+        current = self._get_session(session)
+        loaded = ListFile()
+        loaded.load_from_json(list_file if isinstance(list_file, str) else json.dumps(list_file))
+        async with current.lock:
+            current.simulator.load_list_file(loaded)
+        return self._status(current)
+
+    async def rpc_step(self, session: str, count: int = 1) -> dict:
+        current = self._get_session(session)
+        async with current.lock:
+            simulator = current.simulator
+            auto_cycle = simulator.clock_auto_cycle
+            simulator.clock_auto_cycle = False
+            try:
+                for stepped in range(count):
+                    if simulator.halted:
+                        break
+                    # a single step only waits when there's no input, so let other tasks run now and then
+                    if stepped and stepped % DEFAULT_SLICE == 0:
+                        await asyncio.sleep(0)
+                    await simulator.run_async()
+            finally:
+                simulator.clock_auto_cycle = auto_cycle and not simulator.halted
+        return self._status(current)
+
+    async def rpc_run(self, session: str, max_instructions: int = DEFAULT_MAX_INSTRUCTIONS) -> dict:
+        current = self._get_session(session)
+        async with current.lock:
+            simulator = current.simulator
+            if not simulator.halted:
+                simulator.clock_auto_cycle = True
+            executed = await simulator.run_async(max_instructions=max_instructions)
+        status = self._status(current)
+        status['instructions'] = executed
+        return status
+
+    async def rpc_send_input(self, session: str, line: str) -> bool:
+        # doesn't take the lock, a run may be waiting for this
+        self._get_session(session).input.add(line)
+        return True
+
+    async def rpc_read_output(self, session: str) -> str:
+        current = self._get_session(session)
+        text = current.output.getvalue()
+        current.output.clear()
+        return text
+
+    async def rpc_get_registers(self, session: str) -> dict:
+        simulator = self._get_session(session).simulator
+        return {register.name: simulator.get_register_value(register) for register in Register}
+
+    async def rpc_set_register(self, session: str, register: str, value: int) -> bool:
+        current = self._get_session(session)
+        try:
+            to_set = Register[register]
+        except KeyError:
+            raise DaemonError(INVALID_PARAMS, 'Unknown register {}'.format(register))
+        async with current.lock:
+            current.simulator.set_register_value(to_set, value)
+        return True
+
+    async def rpc_read_memory(self, session: str, location: int, length: int) -> str:
+        memory = self._get_session(session).simulator.memory
+        if location < 0 or length < 0 or location + length > len(memory):
+            raise DaemonError(INVALID_PARAMS, 'Memory range is out of bounds')
+        return bytes(memory.read_bytes(location, length)).hex()
+
+    async def rpc_write_memory(self, session: str, location: int, data: str) -> bool:
+        current = self._get_session(session)
+        async with current.lock:
+            current.simulator.memory.write_bytes(location, bytes.fromhex(data))
+        return True
+
+    async def rpc_snapshot(self, session: str) -> str:
+        current = self._get_session(session)
+        async with current.lock:
+            return current.add_snapshot()
+
+    async def rpc_restore(self, session: str, snapshot: str) -> dict:
+        current = self._get_session(session)
+        async with current.lock:
+            # checked once it has the lock, so that it can't be dropped in between
+            if snapshot not in current.snapshots:
+                raise DaemonError(INVALID_PARAMS, 'Unknown snapshot {}'.format(snapshot))
+            current.simulator.restore(current.snapshots[snapshot])
+        return self._status(current)
+
+    async def rpc_drop_snapshot(self, session: str, snapshot: str) -> bool:
+        current = self._get_session(session)
+        async with current.lock:
+            if current.snapshots.pop(snapshot, None) is None:
+                raise DaemonError(INVALID_PARAMS, 'Unknown snapshot {}'.format(snapshot))
+        return True
+
+
+class DaemonClient:
+    def __init__(self, path: str):
+        """
+        Constructor, connects to a running daemon
+        :param path: the path of the daemon's socket
+        """
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(path)
+        self._file = self._socket.makefile('rwb')
+        self._ids = itertools.count(1)
+
+    def call(self, method: str, **params):
+        """
+        Makes a request and waits for its response
+        :param method: the name of the method
+        :param params: the parameters of the method
+        :return: the result
+        """
+        request_id = next(self._ids)
+        request = {'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}
+        self._file.write(json.dumps(request).encode() + b'\n')
+        self._file.flush()
+
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError('The daemon closed the connection')
+        response = json.loads(line)
+        if 'error' in response:
+            raise DaemonError(response['error']['code'], response['error']['message'])
+        return response['result']
+
+    def close(self):
+        """
+        Closes the connection
+        :return:
+        """
+        self._file.close()
+        self._socket.close()
@@ -0,0 +1,147 @@
+"""
+Dump Format
+
+A compact format for saving the state of the simulator, which only
+stores the parts of memory that are not zeros, along with the registers.
+This is much smaller than the raw 16 MiB that Memory.save_memory writes.
+
+The file starts with a header:
+    4 bytes     magic, b'E68D'
+    1 byte      version
+    1 byte      flags, bit 0 is set when the rest of the file is compressed with zlib
+    4 bytes     the size of memory in bytes
+
+followed by (possibly compressed):
+    1 byte      the number of registers
+    4 bytes     for each register, in the order of the Register enum
+    then for each run of non-zero memory until the end of the file:
+        4 bytes     the location of the run
+        4 bytes     the length of the run
+        the bytes of the run
+
+All values are big endian.
+"""
+
+from .memory import Memory, PAGE_SIZE
+import struct
+import typing
+import zlib
+
+MAGIC = b'E68D'
+VERSION = 1
+
+# set in the flags when the body is compressed with zlib
+FLAG_COMPRESSED = 1
+
+_HEADER = struct.Struct('>4sBBI')
+_RUN = struct.Struct('>II')
+
+_ZERO_PAGE = bytes(PAGE_SIZE)
+
+
+class InvalidDumpError(Exception):
+    pass
+
+
+def find_runs(memory: Memory) -> typing.Iterator[typing.Tuple[int, bytes]]:
+    """
+    Finds the runs of memory which are not zeros
+    Whole pages of zeros split runs, zeros within a page are kept in the run
+
+    >>> memory = Memory()
+    >>> memory.set(Memory.Word, 0x1002, b'\\x12\\x34')
+    >>> memory.set(Memory.Byte, 0x1005, b'\\x56')
+    >>> memory.set(Memory.Byte, 0x8000, b'\\x78')
+    >>> list(find_runs(memory))
+    [(4098, b'\\x124\\x00V'), (32768, b'x')]
+
+    :param memory: the memory to search
+    :return: the location and bytes of each run
+    """
+    size = len(memory)
+    start = None
+    for location in range(0, size + PAGE_SIZE, PAGE_SIZE):
+        page = memory.read_bytes(location, PAGE_SIZE) if location < size else b''
+        if page and page != _ZERO_PAGE[:len(page)]:
+            if start is None:
+                start = location
+        elif start is not None:
+            # the run covers whole pages, so trim the zeros off of both ends
+            data = memory.read_bytes(start, location - start)
+            trimmed = data.lstrip(b'\x00')
+            yield start + len(data) - len(trimmed), bytes(trimmed.rstrip(b'\x00'))
+            start = None
+
+
+def write_dump(file: typing.BinaryIO, memory: Memory, registers: typing.Sequence[int], compress: bool = True):
+    """
+    Writes a dump of the memory and registers
+    NOTE: file must be opened as binary or this won't work
+    :param file: the file to write to
+    :param memory: the memory to dump
+    :param registers: the value of each register, in the order of the Register enum
+    :param compress: whether to compress the dump with zlib
+    :return:
+    """
+    body = bytearray(struct.pack('>B{}I'.format(len(registers)), len(registers), *registers))
+    for location, data in find_runs(memory):
+        body += _RUN.pack(location, len(data))
+        body += data
+
+    flags = 0
+    if compress:
+        body = zlib.compress(body)
+        flags |= FLAG_COMPRESSED
+
+    file.write(_HEADER.pack(MAGIC, VERSION, flags, len(memory)))
+    file.write(body)
+
+
+def read_dump(file: typing.BinaryIO, memory: Memory) -> typing.List[int]:
+    """
+    Reads a dump, replacing everything in the memory with what is in it
+    NOTE: file must be opened as binary or this won't work
+    :param file: the file to read from
+    :param memory: the memory to load the dump into
+    :return: the value of each register, in the order of the Register enum
+    """
+    header = file.read(_HEADER.size)
+    if len(header) != _HEADER.size:
+        raise InvalidDumpError('The dump is too short')
+    magic, version, flags, size = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise InvalidDumpError('The file is not a dump')
+    if version != VERSION:
+        raise InvalidDumpError('Unsupported dump version {}'.format(version))
+
+    body = file.read()
+    if flags & FLAG_COMPRESSED:
+        try:
+            body = zlib.decompress(body)
+        except zlib.error as error:
+            raise InvalidDumpError('The dump is corrupt') from error
+
+    # every run is checked before the memory is touched, so a bad dump leaves it as it was
+    runs = []
+    try:
+        count = body[0]
+        registers = list(struct.unpack_from('>{}I'.format(count), body, 1))
+        offset = 1 + count * 4
+
+        while offset < len(body):
+            location, length = _RUN.unpack_from(body, offset)
+            offset += _RUN.size
+            if offset + length > len(body):
+                raise InvalidDumpError('The dump is truncated')
+            if location + length > size:
+                raise InvalidDumpError('A run goes past the end of memory')
+            runs.append((location, offset, length))
+            offset += length
+    except (IndexError, struct.error) as error:
+        raise InvalidDumpError('The dump is truncated') from error
+
+    memory.clear(size)
+    for location, offset, length in runs:
+        memory.write_bytes(location, body[offset:offset + length])
+
+    return registers
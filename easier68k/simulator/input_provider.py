@@ -0,0 +1,156 @@
+"""
+Input Provider
+
+Where the text that a program reads from the keyboard (using TRAP #15) comes from.
+Giving the simulator a queue or a file of input lets programs run without a terminal.
+"""
+
+from ..core.util.input import get_input
+from collections import deque
+import typing
+
+
+class EndOfInputError(Exception):
+    pass
+
+
+class InputNotReadyError(Exception):
+    """
+    Raised by TRAP before it reads from a provider which has no input yet,
+    M68K.run_async waits for the input and then executes the TRAP again
+    """
+    pass
+
+
+class InputProvider:
+    def ready(self) -> bool:
+        """
+        Checks whether reading can be done without waiting
+        Providers that block until there is input (or there is never going to be) are always ready
+        :return:
+        """
+        return True
+
+    async def wait_for_input(self):
+        """
+        Waits until ready() is True
+        :return:
+        """
+        pass
+
+    def read_line(self) -> str:
+        """
+        Reads the next line of input, without the line ending
+        :return:
+        """
+        raise EndOfInputError('There is no more input')
+
+    def read_char(self) -> str:
+        """
+        Reads a single character
+        By default this is the first character of the next line, or a carriage return
+        for an empty line, the same as pressing enter
+        :return:
+        """
+        line = self.read_line()
+        return line[0] if line else '\r'
+
+
+class ConsoleInputProvider(InputProvider):
+    def read_line(self) -> str:
+        """
+        Reads a line typed into the terminal
+        :return:
+        """
+        try:
+            return get_input()
+        except EOFError as error:
+            raise EndOfInputError('There is no more input') from error
+
+
+class QueueInputProvider(InputProvider):
+    def __init__(self, lines: typing.Iterable[str] = ()):
+        """
+        Constructor
+        :param lines: the lines of input to start with
+        """
+        self.lines = deque(lines)
+
+    def add(self, line: str):
+        """
+        Adds a line to the end of the input
+        :param line:
+        :return:
+        """
+        self.lines.append(line)
+
+    def read_line(self) -> str:
+        if not self.lines:
+            raise EndOfInputError('There is no more input')
+        return self.lines.popleft()
+
+
+class AsyncQueueInputProvider(QueueInputProvider):
+    def __init__(self, lines: typing.Iterable[str] = ()):
+        """
+        Constructor
+        :param lines: the lines of input to start with
+        """
+        super().__init__(lines)
+        self.closed = False
+
+        # made by the first wait_for_input, an Event made now would belong to whichever
+        # event loop was current, which on Python 3.7 to 3.9 may not be the one that waits on it
+        self._added = None
+
+    def add(self, line: str):
+        super().add(line)
+        if self._added is not None:
+            self._added.set()
+
+    def close(self):
+        """
+        Marks the end of the input, reading after the last line raises EndOfInputError
+        instead of waiting
+        :return:
+        """
+        self.closed = True
+        if self._added is not None:
+            self._added.set()
+
+    def ready(self) -> bool:
+        return bool(self.lines) or self.closed
+
+    async def wait_for_input(self):
+        if self._added is None:
+            # asyncio is slow to import, so it is only imported by the providers that need it
+            import asyncio
+            self._added = asyncio.Event()
+
+        while not self.ready():
+            self._added.clear()
+            await self._added.wait()
+
+
+class FileInputProvider(InputProvider):
+    def __init__(self, file: typing.Union[str, typing.TextIO]):
+        """
+        Constructor
+        :param file: the path of a file, or an open file or pipe to read lines from
+        """
+        self._owns_file = isinstance(file, str)
+        self.file = open(file) if self._owns_file else file
+
+    def read_line(self) -> str:
+        line = self.file.readline()
+        if not line:
+            raise EndOfInputError('There is no more input')
+        return line.rstrip('\r\n')
+
+    def close(self):
+        """
+        Closes the file if it was opened from a path
+        :return:
+        """
+        if self._owns_file:
+            self.file.close()
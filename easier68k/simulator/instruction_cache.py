@@ -0,0 +1,120 @@
+"""
+Instruction Cache
+
+Holds on to values decoded from memory (such as disassembled opcodes)
+keyed by the location they were decoded from, so that instructions
+that are executed over and over don't have to be decoded each time.
+
+Entries are dropped whenever memory that they were decoded from is written to,
+so that self-modifying code still behaves correctly.
+"""
+
+# the maximum number of bytes that an instruction can use
+# 2 bytes for the op and max 2 longs which are each 4 bytes
+MAX_INSTRUCTION_LENGTH = 10
+
+# entries are grouped into lines of 2^LINE_SHIFT bytes so that
+# a write only has to check the entries close to it
+LINE_SHIFT = 4
+
+
+class InstructionCache:
+    def __init__(self):
+        """
+        Constructor
+        """
+        # location -> cached value
+        self.entries = {}
+
+        # location -> the number of bytes the cached value was decoded from
+        self._lengths = {}
+
+        # line number -> set of the locations of entries which overlap that line
+        self._lines = {}
+
+        # counters for how effective the cache is
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, location: int):
+        """
+        Gets the value cached for the given location
+        :param location: the location in memory the value was decoded from
+        :return: the cached value, or None if there is nothing cached
+        """
+        value = self.entries.get(location)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, location: int, value, length: int = MAX_INSTRUCTION_LENGTH):
+        """
+        Caches a value decoded from memory
+        :param location: the location in memory the value was decoded from
+        :param value: the value to cache
+        :param length: the number of bytes the value was decoded from
+        :return:
+        """
+        if location in self.entries:
+            self._remove(location)
+
+        self.entries[location] = value
+        self._lengths[location] = length
+
+        for line in range(location >> LINE_SHIFT, ((location + length - 1) >> LINE_SHIFT) + 1):
+            self._lines.setdefault(line, set()).add(location)
+
+    def invalidate(self, location: int, size: int):
+        """
+        Drops every entry which was decoded from memory in the range [location, location + size)
+        This has the same signature as a memory write listener
+        :param location: the start of the range that was written to
+        :param size: the number of bytes that were written
+        :return:
+        """
+        if not self.entries or size <= 0:
+            return
+
+        first_line = location >> LINE_SHIFT
+        last_line = (location + size - 1) >> LINE_SHIFT
+
+        # for large writes it's cheaper to look at the lines that are in use
+        if last_line - first_line >= len(self._lines):
+            lines = [line for line in self._lines if first_line <= line <= last_line]
+        else:
+            lines = range(first_line, last_line + 1)
+
+        end = location + size
+        for line in lines:
+            locations = self._lines.get(line)
+            if not locations:
+                continue
+            for cached in list(locations):
+                if cached < end and location < cached + self._lengths[cached]:
+                    self._remove(cached)
+
+    def clear(self):
+        """
+        Drops all of the cached entries, the counters are kept
+        :return:
+        """
+        self.entries.clear()
+        self._lengths.clear()
+        self._lines.clear()
+
+    def _remove(self, location: int):
+        """
+        Removes a single entry
+        :param location:
+        :return:
+        """
+        length = self._lengths.pop(location)
+        del self.entries[location]
+
+        for line in range(location >> LINE_SHIFT, ((location + length - 1) >> LINE_SHIFT) + 1):
+            locations = self._lines[line]
+            locations.discard(location)
+            if not locations:
+                del self._lines[line]
@@ -0,0 +1,203 @@
+"""
+Instrumentation
+
+Measures the time spent in execute and disassemble_instruction for each opcode class,
+to find which of the Python paths a program spends its time in.
+
+While enabled, the methods of the opcode classes are swapped for versions that time them,
+and they are put back when it is disabled, so that nothing is timed (or slowed down)
+the rest of the time. The methods belong to the classes, so this measures every
+simulator in the process, and only one Instrumentation can be enabled at a time.
+Simulators share it through attach and detach, it stays enabled until the last one detaches.
+"""
+
+from ..core.opcodes.registry import opcode_classes, load_opcodes
+from .block_translator import clear_all_blocks
+from time import perf_counter_ns
+import typing
+
+# the Instrumentation that is enabled, if any
+_enabled = None
+
+# the number of simulators that have attached to the enabled Instrumentation,
+# and whether attaching is what enabled it
+_attached = 0
+_enabled_by_attach = False
+
+
+def _opcode_classes() -> typing.List[type]:
+    """
+    Gets the opcode classes that the simulator can execute
+    :return:
+    """
+    load_opcodes()
+    return list(opcode_classes.values())
+
+
+class Instrumentation:
+    def __init__(self):
+        """
+        Constructor
+        """
+        # [count, nanoseconds] of execute and of disassemble_instruction, by opcode class name
+        self.execute = {}
+        self.decode = {}
+
+        # (class, method name, what was in the class's __dict__) for each swapped method
+        self._originals = []
+
+    @property
+    def enabled(self) -> bool:
+        return _enabled is self
+
+    def enable(self):
+        """
+        Swaps in the timed methods
+        :return:
+        """
+        global _enabled
+        if _enabled is self:
+            return
+        if _enabled is not None:
+            raise RuntimeError('Another Instrumentation is already enabled')
+
+        for cls in _opcode_classes():
+            name = cls.__name__
+            execute_totals = self.execute.setdefault(name, [0, 0])
+            decode_totals = self.decode.setdefault(name, [0, 0])
+
+            self._swap(cls, 'execute', _timed_execute(cls.execute, execute_totals))
+            self._swap(cls, 'disassemble_instruction',
+                       classmethod(_timed_decode(cls.disassemble_instruction, decode_totals)))
+            # folded instructions don't go through execute, so nothing is folded while timing
+            self._swap(cls, 'fold_execute', _unfolded)
+
+        _enabled = self
+        # blocks hold on to the execute methods that they were compiled with
+        clear_all_blocks()
+
+    def disable(self):
+        """
+        Puts the original methods back
+        :return:
+        """
+        global _enabled, _attached, _enabled_by_attach
+        if _enabled is not self:
+            return
+
+        for cls, name, original in reversed(self._originals):
+            if original is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+        self._originals.clear()
+
+        _enabled = None
+        _attached = 0
+        _enabled_by_attach = False
+        clear_all_blocks()
+
+    def report(self) -> typing.Dict[str, typing.Dict[str, int]]:
+        """
+        Gets what has been measured so far
+        :return: the execute and decode count and total nanoseconds, by opcode class name
+        """
+        return {
+            name: {
+                'execute_count': self.execute[name][0],
+                'execute_ns': self.execute[name][1],
+                'decode_count': self.decode[name][0],
+                'decode_ns': self.decode[name][1],
+            }
+            for name in self.execute
+        }
+
+    def clear(self):
+        """
+        Resets everything that has been measured
+        :return:
+        """
+        for totals in list(self.execute.values()) + list(self.decode.values()):
+            totals[0] = 0
+            totals[1] = 0
+
+    def _swap(self, cls: type, name: str, replacement):
+        """
+        Replaces a method of a class, remembering the original
+        :return:
+        """
+        self._originals.append((cls, name, cls.__dict__.get(name)))
+        setattr(cls, name, replacement)
+
+
+def attach() -> Instrumentation:
+    """
+    Starts using the enabled Instrumentation for a simulator, enabling one if there isn't one
+    :return: the enabled Instrumentation
+    """
+    global _attached, _enabled_by_attach
+    if _enabled is None:
+        Instrumentation().enable()
+        _enabled_by_attach = True
+    _attached += 1
+    return _enabled
+
+
+def detach(instrumentation: Instrumentation):
+    """
+    Stops using an Instrumentation for a simulator,
+    it is disabled once no simulators are using it, if attaching enabled it
+    :param instrumentation: what attach returned
+    :return:
+    """
+    global _attached
+    if instrumentation is not _enabled or _attached == 0:
+        return
+    _attached -= 1
+    if _attached == 0 and _enabled_by_attach:
+        instrumentation.disable()
+
+
+def _timed_execute(execute: typing.Callable, totals: list) -> typing.Callable:
+    """
+    Wraps an execute method so that it adds to the count and time
+    :param execute: the original method
+    :param totals: [count, nanoseconds]
+    :return:
+    """
+    def timed(op, simulator):
+        start = perf_counter_ns()
+        try:
+            return execute(op, simulator)
+        finally:
+            totals[0] += 1
+            totals[1] += perf_counter_ns() - start
+
+    return timed
+
+
+def _unfolded(op):
+    """
+    Stands in for fold_execute, so that blocks call the timed execute methods
+    :param op:
+    :return: None
+    """
+    return None
+
+
+def _timed_decode(disassemble_instruction: typing.Callable, totals: list) -> typing.Callable:
+    """
+    Wraps a disassemble_instruction class method so that it adds to the count and time
+    :param disassemble_instruction: the original method, bound to its class
+    :param totals: [count, nanoseconds]
+    :return:
+    """
+    def timed(cls, data):
+        start = perf_counter_ns()
+        try:
+            return disassemble_instruction(data)
+        finally:
+            totals[0] += 1
+            totals[1] += perf_counter_ns() - start
+
+    return timed
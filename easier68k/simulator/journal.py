@@ -0,0 +1,166 @@
+"""
+Journal
+
+Records what each executed instruction overwrote, the registers that it changed
+and the bytes of memory that it wrote over, so that the simulator can step
+backwards through a program without running it again from the start.
+
+Entries are kept in a ring buffer, once the journal is using more than its
+byte limit the oldest instructions are forgotten.
+"""
+
+from collections import deque
+from array import array
+import struct
+
+# the default limit on the size of the journal, in bytes
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+
+# a changed register: its index and its value before the instruction
+_REGISTER_RECORD = struct.Struct('>BI')
+
+# a memory write: its location and size, followed by the bytes that were overwritten
+_WRITE_RECORD = struct.Struct('>II')
+
+# the bytes counted for the cycle count and flags kept with every entry
+_ENTRY_HEADER_SIZE = 6
+
+# flags for the state that is not held in the registers
+_HALTED = 1
+_CLOCK_AUTO_CYCLE = 2
+
+
+class Journal:
+    def __init__(self, simulator, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Constructor
+        :param simulator: the M68K to record
+        :param max_bytes: roughly how many bytes of entries to keep before the oldest are dropped
+        """
+        self.max_bytes = max_bytes
+
+        # (changed registers, overwritten memory, clock cycles, flags) for each instruction, oldest first
+        self.entries = deque()
+        self.size = 0
+
+        # the state from before the instruction that is being executed, None when not recording
+        self._registers = None
+        self._writes = None
+        self._clock_cycles = 0
+        self._flags = 0
+
+        self._memory = simulator.memory
+        self._memory.add_write_listener(self._record_write)
+
+    def __len__(self) -> int:
+        """
+        The number of instructions that can be stepped back over
+        """
+        return len(self.entries)
+
+    def begin(self, simulator):
+        """
+        Starts recording an instruction, call before it is executed
+        :param simulator: the simulator that is about to execute
+        :return:
+        """
+        simulator.resolve_condition_codes()
+        self._registers = array('I', simulator.registers)
+        self._writes = bytearray()
+        self._clock_cycles = simulator.get_cycles()
+        self._flags = (_HALTED if simulator.halted else 0) | (_CLOCK_AUTO_CYCLE if simulator.clock_auto_cycle else 0)
+
+    def end(self, simulator):
+        """
+        Finishes recording an instruction, call after it is executed
+        :param simulator: the simulator that executed the instruction
+        :return:
+        """
+        simulator.resolve_condition_codes()
+
+        changed = bytearray()
+        for index, (old, new) in enumerate(zip(self._registers, simulator.registers)):
+            if old != new:
+                changed += _REGISTER_RECORD.pack(index, old)
+
+        entry = (bytes(changed), bytes(self._writes), self._clock_cycles, self._flags)
+        self.entries.append(entry)
+        self.size += len(entry[0]) + len(entry[1]) + _ENTRY_HEADER_SIZE
+
+        self._registers = None
+        self._writes = None
+
+        # drop the oldest entries once over the limit, always keeping the latest
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            oldest = self.entries.popleft()
+            self.size -= len(oldest[0]) + len(oldest[1]) + _ENTRY_HEADER_SIZE
+
+    def cancel(self):
+        """
+        Stops recording an instruction that was not executed
+        :return:
+        """
+        self._registers = None
+        self._writes = None
+
+    def step_back(self, simulator, count: int = 1) -> int:
+        """
+        Undoes the last count recorded instructions
+        :param simulator: the simulator to undo them on
+        :param count: the number of instructions to undo
+        :return: the number of instructions that were undone, fewer than count if the journal ran out
+        """
+        undone = 0
+        while undone < count and self.entries:
+            changed, writes, clock_cycles, flags = self.entries.pop()
+            self.size -= len(changed) + len(writes) + _ENTRY_HEADER_SIZE
+
+            # put the memory back, latest write first
+            records = []
+            offset = 0
+            while offset < len(writes):
+                location, size = _WRITE_RECORD.unpack_from(writes, offset)
+                offset += _WRITE_RECORD.size
+                records.append((location, size, writes[offset:offset + size]))
+                offset += size
+            for location, size, old in reversed(records):
+                # written back as bytes, the write could have been unaligned or any length
+                simulator.memory.write_bytes(location, old)
+
+            for index, old in _REGISTER_RECORD.iter_unpack(changed):
+                simulator.registers[index] = old
+
+            simulator._pending_condition_codes = None
+            simulator._clock_cycles = clock_cycles
+            simulator.halted = bool(flags & _HALTED)
+            simulator.clock_auto_cycle = bool(flags & _CLOCK_AUTO_CYCLE)
+            undone += 1
+
+        return undone
+
+    def clear(self):
+        """
+        Forgets all of the recorded instructions
+        :return:
+        """
+        self.entries.clear()
+        self.size = 0
+
+    def detach(self):
+        """
+        Stops listening to the simulator's memory
+        :return:
+        """
+        self._memory.remove_write_listener(self._record_write)
+
+    def _record_write(self, location: int, size: int):
+        """
+        Memory write listener which saves the bytes that are about to be overwritten
+        Writes made outside of an instruction are not recorded
+        :param location:
+        :param size:
+        :return:
+        """
+        if self._writes is not None:
+            self._writes += _WRITE_RECORD.pack(location, size)
+            self._writes += self._memory.read_bytes(location, size)
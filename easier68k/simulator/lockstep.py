@@ -0,0 +1,535 @@
+"""
+Lockstep
+
+Simulates many copies of the 68k (lanes) running the same program at once,
+each with its own registers and memory, held together in NumPy arrays.
+This is meant for running one program over lots of different inputs.
+
+Every step decodes the instruction at the program counter once and then executes
+it for all of the lanes that are at that location together. Lanes that have halted
+are left alone. Instructions are executed the same way that M68K executes them,
+but a lane that would have raised an error (such as an out of bounds memory access)
+is halted instead, and the error is kept in faults.
+
+Only the opcodes that are implemented (MOVE, ADD, OR, LEA, TRAP and SIMHALT)
+can be executed. A lane that reaches any other instruction is halted with a fault.
+Lanes don't have any input, so the TRAP tasks that read input fault the lane too.
+
+This needs NumPy, which is only imported when a LockstepM68K is made.
+"""
+
+from ..core.enum.ea_mode import EAMode
+from ..core.enum.register import Register
+from ..core.enum.op_size import OpSize
+from ..core.enum.condition_status_code import ConditionStatusCode
+from ..core.enum.trap_task import TrapTask
+from ..core.enum.trap_vector import TrapVectors
+from ..core.util.condition_codes import SIZE_MASKS, SIZE_SIGN_BITS
+from ..core.opcodes.registry import get_opcode_dispatch_table
+from ..core.models.list_file import ListFile
+from ..core.opcodes.move import Move
+from ..core.opcodes.add import Add
+from ..core.opcodes.opcode_or import Or
+from ..core.opcodes.lea import Lea
+from ..core.opcodes.trap import Trap, INPUT_TASKS
+from ..core.opcodes.simhalt import Simhalt
+from .m68k import MAX_MEMORY_LOCATION, REGISTER_COUNT
+from .instruction_cache import MAX_INSTRUCTION_LENGTH
+import typing
+
+# numpy is only needed for this module, so it is imported when it's first used
+np = None
+
+# the default number of bytes of memory for each lane
+# much smaller than the 16 MiB of M68K, since every lane has its own copy
+DEFAULT_MEMORY_SIZE = 65536
+
+_PC = int(Register.ProgramCounter)
+_CCR = int(Register.ConditionCodeRegister)
+_A0 = int(Register.A0)
+_D0 = int(Register.D0)
+_D1 = int(Register.D1)
+_A1 = int(Register.A1)
+
+
+def _require_numpy():
+    """
+    Imports numpy the first time that it is needed
+    :return:
+    """
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError as error:
+            raise ImportError('LockstepM68K requires numpy, install it with "pip install numpy"') from error
+        np = numpy
+
+
+class LockstepM68K:
+    def __init__(self, lanes: int, memory_size: int = DEFAULT_MEMORY_SIZE):
+        """
+        Constructor
+        :param lanes: the number of machines to simulate
+        :param memory_size: the number of bytes of memory that each machine has
+        """
+        _require_numpy()
+        assert lanes > 0, 'There must be at least one lane!'
+
+        self.lanes = lanes
+        self.memory_size = memory_size
+
+        # every lane's registers, indexed by [lane, Register]
+        self.registers = np.zeros((lanes, REGISTER_COUNT), dtype=np.uint32)
+
+        # every lane's memory, indexed by [lane, location]
+        self.memory = np.zeros((lanes, memory_size), dtype=np.uint8)
+
+        # which lanes have stopped, either by halting or from a fault
+        self.halted = np.zeros(lanes, dtype=bool)
+
+        # lane -> description of the error that stopped it
+        self.faults = {}
+
+        # what each lane has printed using TRAP
+        self._output = [[] for _ in range(lanes)]
+
+        # raw instruction bytes -> decoded opcode, shared by all of the lanes
+        self._decoded = {}
+
+    def load_list_file(self, list_file: ListFile):
+        """
+        Loads a list file into the memory of every lane,
+        and sets every lane's program counter to its starting execution address
+        :param list_file:
+        :return:
+        """
+        for key, value in list_file.data.items():
+            location = int(key)
+            values = np.frombuffer(bytes.fromhex(value), dtype=np.uint8)
+            assert location + len(values) <= self.memory_size, 'The list file does not fit in memory!'
+            self.memory[:, location:location + len(values)] = values
+
+        self.registers[:, _PC] = int(list_file.starting_execution_address)
+
+    def get_register_values(self, register: Register):
+        """
+        Gets the value of a register in every lane
+        :param register:
+        :return: an array with the value for each lane
+        """
+        return self.registers[:, register].copy()
+
+    def set_register_values(self, register: Register, values):
+        """
+        Sets the value of a register in every lane
+        :param register:
+        :param values: a single value for all of the lanes, or an array with a value for each lane
+        :return:
+        """
+        values = np.asarray(values, dtype=np.int64)
+        limit = 0xFF if register == _CCR else 0xFFFFFFFF
+        assert ((values >= 0) & (values <= limit)).all(), 'The values do not fit in the register!'
+        self.registers[:, register] = values
+
+    def get_memory_values(self, size: int, location: int):
+        """
+        Gets a value from memory in every lane
+        :param size: the number of bytes of the value, 1 2 or 4
+        :param location: the location of the value
+        :return: an array with the unsigned value for each lane
+        """
+        assert size in [1, 2, 4] and location % size == 0 and 0 <= location <= self.memory_size - size
+        values = np.zeros(self.lanes, dtype=np.int64)
+        for i in range(size):
+            values = (values << 8) | self.memory[:, location + i]
+        return values
+
+    def set_memory_values(self, size: int, location: int, values):
+        """
+        Sets a value in memory in every lane
+        :param size: the number of bytes of the value, 1 2 or 4
+        :param location: the location of the value
+        :param values: a single value for all of the lanes, or an array with a value for each lane
+        :return:
+        """
+        assert size in [1, 2, 4] and location % size == 0 and 0 <= location <= self.memory_size - size
+        values = np.broadcast_to(np.asarray(values, dtype=np.int64), (self.lanes,))
+        for i in range(size):
+            self.memory[:, location + i] = (values >> (8 * (size - 1 - i))) & 0xFF
+
+    def get_output(self, lane: int) -> str:
+        """
+        Gets everything that a lane has printed
+        :param lane:
+        :return:
+        """
+        return ''.join(self._output[lane])
+
+    def step(self) -> int:
+        """
+        Executes one instruction in every lane that hasn't halted
+        :return: the number of lanes that executed an instruction
+        """
+        active = np.flatnonzero(~self.halted)
+        if len(active) == 0:
+            return 0
+
+        pcs = self.registers[active, _PC]
+        first_pc = pcs[0]
+        if (pcs == first_pc).all():
+            groups = [(int(first_pc), active)]
+        else:
+            groups = [(int(pc), active[pcs == pc]) for pc in np.unique(pcs)]
+
+        for pc, lanes in groups:
+            end = min(pc + MAX_INSTRUCTION_LENGTH, self.memory_size)
+            words = self.memory[lanes, pc:end]
+
+            # lanes at the same location almost always have the same code there,
+            # unless some of them have changed it
+            if (words == words[0]).all():
+                self._execute(bytes(words[0]), lanes)
+            else:
+                rows, inverse = np.unique(words, axis=0, return_inverse=True)
+                inverse = inverse.reshape(-1)
+                for index, row in enumerate(rows):
+                    self._execute(bytes(row), lanes[inverse == index])
+
+        return len(active)
+
+    def run(self, max_steps: int = None) -> int:
+        """
+        Steps until every lane has halted
+        :param max_steps: the most steps to take, or None for no limit
+        :return: the number of steps that were taken
+        """
+        steps = 0
+        while max_steps is None or steps < max_steps:
+            if self.step() == 0:
+                break
+            steps += 1
+        return steps
+
+    def _execute(self, data: bytes, lanes):
+        """
+        Executes the instruction decoded from data in the given lanes
+        :param data: the bytes at the program counter
+        :param lanes: the indices of the lanes to execute in
+        :return:
+        """
+        if data in self._decoded:
+            op = self._decoded[data]
+        else:
+            op = None
+            if len(data) >= 2:
+                op_class = get_opcode_dispatch_table()[int.from_bytes(data[0:2], 'big')]
+                if op_class is not None:
+                    try:
+                        op = op_class.disassemble_instruction(data)
+                    except (ValueError, AssertionError):
+                        op = None
+            self._decoded[data] = op
+
+        if isinstance(op, Move):
+            self._execute_move(op, lanes)
+        elif isinstance(op, Add):
+            self._execute_add(op, lanes)
+        elif isinstance(op, Or):
+            self._execute_or(op, lanes)
+        elif isinstance(op, Lea):
+            self._execute_lea(op, lanes)
+        elif isinstance(op, Trap):
+            self._execute_trap(op, lanes)
+        elif isinstance(op, Simhalt):
+            self.halted[lanes] = True
+            self._increment_program_counter(lanes, OpSize.LONG.value)
+        else:
+            self._fault(lanes, 'Unknown instruction')
+
+    def _execute_move(self, op: Move, lanes):
+        length = op.size.get_number_of_bytes()
+        lanes, src_val = self._get_value(op.src, lanes, length)
+        lanes = self._set_value(op.dest, lanes, src_val, length)
+        self._increment_program_counter(lanes, self._alu_increment(op))
+
+    def _execute_add(self, op: Add, lanes):
+        length = op.size.get_number_of_bytes()
+        lanes, src_val = self._get_value(op.src, lanes, length)
+        lanes, dest_val, src_val = self._get_value(op.dest, lanes, length, src_val)
+
+        mask = SIZE_MASKS[length]
+        sign_bit = SIZE_SIGN_BITS[length]
+        raw_total = src_val + dest_val
+        total = (raw_total & mask) | (dest_val & (0xFFFFFFFF ^ mask))
+
+        # same as add_condition_codes
+        negative = (raw_total & sign_bit) > 0
+        ccr = np.where(raw_total > mask, ConditionStatusCode.X | ConditionStatusCode.C, 0)
+        ccr |= np.where(negative, ConditionStatusCode.N, 0)
+        ccr |= np.where((raw_total & mask) == 0, ConditionStatusCode.Z, 0)
+        ccr |= np.where(negative != ((src_val & sign_bit) > 0), ConditionStatusCode.V, 0)
+        self.registers[lanes, _CCR] = ccr
+
+        lanes = self._set_value(op.dest, lanes, total, length)
+        self._increment_program_counter(lanes, self._alu_increment(op))
+
+    def _execute_or(self, op: Or, lanes):
+        length = op.size.get_number_of_bytes()
+        lanes, src_val = self._get_value(op.src, lanes, length)
+        lanes, dest_val, src_val = self._get_value(op.dest, lanes, length, src_val)
+        result = src_val | dest_val
+
+        # same as or_condition_codes
+        ccr = self.registers[lanes, _CCR].astype(np.int64) & ConditionStatusCode.X
+        ccr |= np.where(((1 << 32) & result) != 0, ConditionStatusCode.N, 0)
+        ccr |= np.where(result == 0, ConditionStatusCode.Z, 0)
+        self.registers[lanes, _CCR] = ccr
+
+        lanes = self._set_value(op.dest, lanes, result, length)
+        self._increment_program_counter(lanes, self._alu_increment(op))
+
+    def _execute_lea(self, op: Lea, lanes):
+        length = OpSize.LONG.get_number_of_bytes()
+        lanes, src_val = self._get_value(op.src, lanes, length)
+        lanes = self._set_value(op.dest, lanes, src_val, length)
+
+        to_increment = 2
+        if op.src.mode in [EAMode.AddressRegisterIndirect, EAMode.AbsoluteWordAddress, EAMode.AbsoluteLongAddress]:
+            to_increment += OpSize.LONG.value
+        self._increment_program_counter(lanes, to_increment)
+
+    def _execute_trap(self, op: Trap, lanes):
+        if op.trpVector.value == TrapVectors.IO:
+            # tasks depend on each lane's registers, so they are done one lane at a time
+            ok = np.ones(len(lanes), dtype=bool)
+            for i, lane in enumerate(lanes):
+                ok[i] = self._trap_task(int(lane))
+            lanes = lanes[ok]
+
+        self._increment_program_counter(lanes, OpSize.WORD.value)
+
+    def _trap_task(self, lane: int) -> bool:
+        """
+        Does the TRAP #15 task for a single lane
+        :param lane:
+        :return: False if the lane faulted
+        """
+        try:
+            task = TrapTask(int(self.registers[lane, _D0]))
+        except ValueError as error:
+            self._fault([lane], 'ValueError: {}'.format(error))
+            return False
+
+        if task in INPUT_TASKS:
+            # lanes don't have any input, so a lane that reads would go on with the wrong registers
+            self._fault([lane], 'Unsupported TRAP task {}'.format(task.name))
+            return False
+
+        output = self._output[lane]
+        if task in [TrapTask.DisplayNullTermString, TrapTask.DisplayNullTermStringWithCRLF]:
+            location = int(self.registers[lane, _A1])
+            terminators = np.flatnonzero(self.memory[lane, location:] == 0)
+            if len(terminators) == 0:
+                self._fault([lane], 'OutOfBoundsMemoryError')
+                return False
+            output.append(bytes(self.memory[lane, location:location + terminators[0]]).decode('latin-1'))
+            if task is TrapTask.DisplayNullTermStringWithCRLF:
+                output.append('\n')
+
+        if task is TrapTask.DisplaySignedNumber:
+            output.append(str(int(self.registers[lane, _D1].astype(np.int32))))
+
+        if task is TrapTask.DisplaySingleCharacter:
+            output.append(chr(int(self.registers[lane, _D1]) & 0xFF))
+
+        if task is TrapTask.Terminate:
+            self.halted[lane] = True
+
+        return True
+
+    @staticmethod
+    def _alu_increment(op) -> int:
+        """
+        Gets how far MOVE, ADD and OR move the program counter
+        :param op:
+        :return:
+        """
+        to_increment = OpSize.WORD.value
+        if op.src.mode is EAMode.Immediate:
+            to_increment += OpSize.WORD.value if op.size is OpSize.BYTE else op.size.value
+        for param in [op.src, op.dest]:
+            if param.mode is EAMode.AbsoluteLongAddress:
+                to_increment += OpSize.LONG.value
+            if param.mode is EAMode.AbsoluteWordAddress:
+                to_increment += OpSize.WORD.value
+        return to_increment
+
+    def _increment_program_counter(self, lanes, inc: int):
+        values = self.registers[lanes, _PC].astype(np.int64) + inc
+        self._set_address_register(lanes, _PC, values)
+
+    def _fault(self, lanes, message: str):
+        """
+        Halts lanes because of an error
+        :param lanes:
+        :param message: a description of the error
+        :return:
+        """
+        for lane in lanes:
+            self.faults[int(lane)] = message
+        self.halted[lanes] = True
+
+    def _keep(self, ok, message: str, lanes, *values):
+        """
+        Faults the lanes which are not ok, and drops them from lanes and values
+        :return: the lanes and values that are ok
+        """
+        if ok.all():
+            return (lanes,) + values
+        self._fault(lanes[~ok], message)
+        return (lanes[ok],) + tuple(value[ok] for value in values)
+
+    def _set_address_register(self, lanes, register: int, values, *carried):
+        """
+        Sets an address register or the PC, which have to stay in the bounds of memory
+        :return: the lanes that were set, and the carried values for those lanes
+        """
+        ok = (values >= 0) & (values <= MAX_MEMORY_LOCATION)
+        lanes, values, *carried = self._keep(ok, 'AssertionError: The value of address registers must be in the '
+                                                 'range [0, 2^24]', lanes, values, *carried)
+        self.registers[lanes, register] = values
+        return (lanes,) + tuple(carried)
+
+    def _read(self, lanes, locations, length: int, *carried):
+        """
+        Reads big endian values from each lane's memory
+        :return: the lanes that could be read, their values, and the carried values for those lanes
+        """
+        aligned = locations % length == 0
+        lanes, locations, *carried = self._keep(aligned, 'UnalignedMemoryAccessError', lanes, locations, *carried)
+        in_bounds = (locations >= 0) & (locations + length <= self.memory_size)
+        lanes, locations, *carried = self._keep(in_bounds, 'OutOfBoundsMemoryError', lanes, locations, *carried)
+
+        values = np.zeros(len(lanes), dtype=np.int64)
+        for i in range(length):
+            values = (values << 8) | self.memory[lanes, locations + i]
+        return (lanes, values) + tuple(carried)
+
+    def _write(self, lanes, locations, values, length: int):
+        """
+        Writes big endian values to each lane's memory
+        :return: the lanes that were written to
+        """
+        aligned = locations % length == 0
+        lanes, locations, values = self._keep(aligned, 'UnalignedMemoryAccessError', lanes, locations, values)
+        in_bounds = (locations >= 0) & (locations + length <= self.memory_size)
+        lanes, locations, values = self._keep(in_bounds, 'OutOfBoundsMemoryError', lanes, locations, values)
+        fits = (values >= 0) & (values < (1 << (8 * length)))
+        lanes, locations, values = self._keep(fits, 'OverflowError: int too big to convert', lanes, locations, values)
+
+        for i in range(length):
+            self.memory[lanes, locations + i] = (values >> (8 * (length - 1 - i))) & 0xFF
+        return lanes
+
+    def _get_value(self, param, lanes, length: int, *carried):
+        """
+        The same as AssemblyParameter.get_value, for many lanes
+        :param param: the AssemblyParameter
+        :param lanes: the lanes to get the value in
+        :param length: the length in bytes of the operation
+        :param carried: arrays of values for each lane, which are dropped along with lanes that fault
+        :return: the lanes that didn't fault, their values, and the carried values for those lanes
+        """
+        mode = param.mode
+        count = len(lanes)
+
+        if mode is EAMode.IMM:
+            return (lanes, np.full(count, param.data, dtype=np.int64)) + tuple(carried)
+
+        if mode is EAMode.DRD:
+            return (lanes, self.registers[lanes, _D0 + param.data].astype(np.int64)) + tuple(carried)
+
+        register = _A0 + param.data
+        if mode is EAMode.AddressRegisterDirect:
+            return (lanes, self.registers[lanes, register].astype(np.int64)) + tuple(carried)
+
+        if mode is EAMode.AddressRegisterIndirect:
+            locations = self.registers[lanes, register].astype(np.int64)
+            return self._read(lanes, locations, length, *carried)
+
+        if mode is EAMode.AddressRegisterIndirectPostIncrement:
+            locations = self.registers[lanes, register].astype(np.int64)
+            lanes, values, locations, *carried = self._read(lanes, locations, length, locations, *carried)
+            return self._set_address_register(lanes, register, locations + length, values, *carried)
+
+        if mode is EAMode.AddressRegisterIndirectPreDecrement:
+            locations = self.registers[lanes, register].astype(np.int64) - length
+            lanes, locations, *carried = self._set_address_register(lanes, register, locations, locations, *carried)
+            return self._read(lanes, locations, length, *carried)
+
+        if mode is EAMode.AbsoluteLongAddress:
+            return (lanes, np.full(count, param.data, dtype=np.int64)) + tuple(carried)
+
+        if mode is EAMode.AbsoluteWordAddress:
+            return (lanes, np.full(count, param.data & 0xFFFF, dtype=np.int64)) + tuple(carried)
+
+        assert False, 'Invalid effective addressing mode!'
+
+    def _set_value(self, param, lanes, values, length: int):
+        """
+        The same as AssemblyParameter.set_value, for many lanes
+        :param param: the AssemblyParameter
+        :param lanes: the lanes to set the value in
+        :param values: the value for each lane
+        :param length: the length in bytes of the operation
+        :return: the lanes that didn't fault
+        """
+        mode = param.mode
+
+        if mode is EAMode.Immediate:
+            self._fault(lanes, 'AssertionError: Cannot set the value of an immediate.')
+            return lanes[:0]
+
+        if mode is EAMode.DRD:
+            # negative values are converted to twos complement
+            values = np.where(values < 0, np.abs((values ^ SIZE_MASKS[length]) + 1), values)
+            fits = values <= 0xFFFFFFFF
+            lanes, values = self._keep(fits, 'AssertionError: The value must fit in a long word', lanes, values)
+            self.registers[lanes, _D0 + param.data] = values
+            return lanes
+
+        if mode in [EAMode.AbsoluteLongAddress, EAMode.AbsoluteWordAddress]:
+            fits = (values >= 0) & (values <= 0xFFFFFFFF)
+            lanes, values = self._keep(fits, 'AssertionError: The value must fit inside of a long word!', lanes, values)
+            if mode is EAMode.AbsoluteWordAddress:
+                values = values & 0xFFFF
+            return self._write(lanes, np.full(len(lanes), param.data, dtype=np.int64), values, length)
+
+        # every address register mode requires the value to fit in memory
+        fits = (values >= 0) & (values <= MAX_MEMORY_LOCATION)
+        lanes, values = self._keep(fits, 'AssertionError: The value must fit in the memory space [0, 2^24]',
+                                   lanes, values)
+        register = _A0 + param.data
+
+        if mode is EAMode.AddressRegisterDirect:
+            lanes, = self._set_address_register(lanes, register, values)
+            return lanes
+
+        locations = self.registers[lanes, register].astype(np.int64)
+
+        if mode is EAMode.AddressRegisterIndirect:
+            return self._write(lanes, locations, values, length)
+
+        if mode is EAMode.AddressRegisterIndirectPreDecrement:
+            lanes, locations, values = self._set_address_register(lanes, register, locations - length,
+                                                                  locations - length, values)
+            return self._write(lanes, locations, values, length)
+
+        if mode is EAMode.AddressRegisterIndirectPostIncrement:
+            written = np.isin(lanes, self._write(lanes, locations, values, length))
+            lanes, locations = lanes[written], locations[written]
+            lanes, = self._set_address_register(lanes, register, locations + length)
+            return lanes
+
+        assert False, 'Invalid effective addressing mode!'
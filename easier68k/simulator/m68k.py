@@ -3,20 +3,76 @@ Motorola 68k chip definition
 """
 
 from .memory import Memory
-from ..core.enum.register import Register, FULL_SIZE_REGISTERS, MEMORY_LIMITED_ADDRESS_REGISTERS
+from .instruction_cache import InstructionCache
+from .block_translator import BlockTranslator, MAX_BLOCK_LENGTH
+from .snapshot import Snapshot
+from .journal import Journal, DEFAULT_MAX_BYTES
+from .profiler import Profiler
+from .trace import Tracer, DEFAULT_CAPACITY
+from .instrumentation import Instrumentation, attach as attach_instrumentation, detach as detach_instrumentation
+from .dump_format import write_dump, read_dump
+from .output_sink import OutputSink, StdoutSink
+from .input_provider import InputProvider, ConsoleInputProvider, InputNotReadyError
+from ..core.enum.register import Register, MEMORY_LIMITED_ADDRESS_REGISTERS
 from ..core.enum.condition_status_code import ConditionStatusCode
+from ..core.enum.alu_operation import AluOperation
+from ..core.util.condition_codes import evaluate_condition_codes, AFFECTED_CONDITION_CODES, ALL_CONDITION_CODES
 from ..core.models.list_file import ListFile
+from ..core.opcodes.registry import get_opcode_dispatch_table
+from array import array
 import typing
 import binascii
 
 MAX_MEMORY_LOCATION = 16777216  # 2^24
 
+# how many instructions run_async executes before letting other tasks run
+DEFAULT_SLICE = 10000
+
+# the number of distinct registers, D0-D7, A0-A7, PC and CCR
+REGISTER_COUNT = len(Register)
+
+# plain int versions of the register indices used on the hot path
+_PC = int(Register.ProgramCounter)
+_CCR = int(Register.ConditionCodeRegister)
+_MEMORY_LIMITED_ADDRESS_REGISTERS = frozenset(int(r) for r in MEMORY_LIMITED_ADDRESS_REGISTERS)
+
 class M68K:
-    def __init__(self):
+    def __init__(self, memory: Memory = None, output: OutputSink = None, input: InputProvider = None):
         """
         Constructor
+        :param memory: the memory to use, such as a PagedMemory, defaults to a new Memory
+        :param output: where text displayed by the program goes, defaults to stdout
+        :param input: where text read by the program comes from, defaults to the terminal
         """
-        self.memory = Memory()
+        self.memory = memory if memory is not None else Memory()
+
+        # where TRAP #15 writes text that the program displays
+        self.output = output if output is not None else StdoutSink()
+
+        # where TRAP #15 reads keyboard input from
+        self.input = input if input is not None else ConsoleInputProvider()
+
+        # opcodes that have already been disassembled, by their location in memory
+        # writes to memory drop the opcodes that were decoded from it
+        self.instruction_cache = InstructionCache()
+        self.memory.add_write_listener(self.instruction_cache.invalidate)
+
+        # when automatically running, execute straight-line blocks of
+        # instructions at a time instead of stepping through each one
+        self.translate_blocks = True
+        self.block_translator = BlockTranslator(self)
+
+        # records what each instruction overwrites so that it can be undone, None when disabled
+        self.journal = None
+
+        # counts where the program spends its time, None when disabled
+        self.profiler = None
+
+        # records every instruction that is executed, None when disabled
+        self.tracer = None
+
+        # times the execute and decode of each opcode class, None when disabled
+        self.instrumentation = None
 
         # has the simulation been halted using SIMHALT or .halt()
         self.halted = False
@@ -30,30 +86,28 @@ class M68K:
         # and watches for value changes
 
         # set up the registers to their default values
-        self.registers = {}
-        self.__init_registers()
+        # every register is a 32-bit unsigned int, indexed by the Register enum
+        self.registers = array('I', [0] * REGISTER_COUNT)
 
-    def __init_registers(self):
-        """
-        Set the registers to their default values
-        :return:
-        """
+        # when set, ALU operations only record their result, and the condition codes
+        # are worked out from it the next time that the CCR is read
+        self.lazy_condition_codes = False
 
-        # loop through all of the full size registers which are just 32 bits / 4 bytes long
-        for register in FULL_SIZE_REGISTERS:
-            self.registers[register] = bytearray(4)
-
-        # set up all of the odd registers (in this case, just the Condition Code Register)
-        # which just uses 5 bits out of the lowermost byte (do we want to allocate it an entire word instead?)
-        self.registers[Register.ConditionCodeRegister] = bytearray(1)
+        # the (operation, src, dest, result, size) that the CCR has not been updated from yet
+        self._pending_condition_codes = None
 
     def get_register(self, register: Register) -> bytearray:
         """
-        Gets the entire value of a register
+        Gets the entire value of a register as big endian bytes
+        The CCR is a single byte, all other registers are 4 bytes
+        This is a copy, changing it does not change the register
         :param register:
         :return:
         """
-        return self.registers[register]
+        if register == _CCR:
+            self.resolve_condition_codes()
+            return bytearray(self.registers[register].to_bytes(1, 'big'))
+        return bytearray(self.registers[register].to_bytes(4, 'big'))
 
     def get_register_value(self, register: Register) -> int:
         """
@@ -61,9 +115,34 @@ class M68K:
         :param register:
         :return:
         """
-        # convert the contents of the byte array to hex, and then convert
-        # that into an int
-        return int(self.get_register(register).hex(), 16)
+        if register == _CCR:
+            self.resolve_condition_codes()
+        return self.registers[register]
+
+    def get_register_long(self, register: int) -> int:
+        """
+        Gets the 32-bit unsigned value of a register
+        This doesn't work out lazily evaluated condition codes, use get_register_value for the CCR
+        :param register: the Register, or its index
+        :return:
+        """
+        return self.registers[register]
+
+    def get_register_word(self, register: int) -> int:
+        """
+        Gets the lower 16 bits of a register as an unsigned value
+        :param register: the Register, or its index
+        :return:
+        """
+        return self.registers[register] & 0xFFFF
+
+    def get_register_byte(self, register: int) -> int:
+        """
+        Gets the lower 8 bits of a register as an unsigned value
+        :param register: the Register, or its index
+        :return:
+        """
+        return self.registers[register] & 0xFF
 
     def set_register_value(self, register: Register, val: int):
         """
@@ -74,12 +153,12 @@ class M68K:
         """
         # if the register is the CCR, use that method to handle setting it
         # because of its different size
-        if register == Register.ConditionCodeRegister:
+        if register == _CCR:
             self._set_condition_code_register_value(val)
             return
 
         # if the register is an address register that is limited to fit in the bounds of memory
-        if register in MEMORY_LIMITED_ADDRESS_REGISTERS:
+        if register in _MEMORY_LIMITED_ADDRESS_REGISTERS:
             self.set_address_register_value(register, val)
             return
 
@@ -89,7 +168,7 @@ class M68K:
         assert 0 <= val <= 0xFFFFFFFF, 'The value for registers must fit into 4 bytes!'
 
         # set the value
-        self.registers[register] = bytearray(val.to_bytes(4, 'big'))
+        self.registers[register] = val
 
     def _set_condition_code_register_value(self, val: int):
         """
@@ -101,8 +180,9 @@ class M68K:
         # since the CCR is just a single byte
         assert 0 <= val <= 0xFF, 'The value for the CCR must fit in a single byte!'
 
-        # now set the value
-        self.registers[Register.ConditionCodeRegister] = bytearray(val.to_bytes(1, 'big'))
+        # now set the value, this replaces any condition codes that haven't been worked out yet
+        self._pending_condition_codes = None
+        self.registers[_CCR] = val
 
 
     def get_program_counter_value(self) -> int:
@@ -110,7 +190,7 @@ class M68K:
         Gets the 32-bit integer value for the program counter value
         :return:
         """
-        return self.get_register_value(Register.ProgramCounter)
+        return self.registers[_PC]
 
 
     def set_address_register_value(self, reg: Register, new_value: int):
@@ -121,10 +201,10 @@ class M68K:
         :return:
         """
         assert 0 <= new_value <= MAX_MEMORY_LOCATION, 'The value of address registers must be in the range [0, 2^24]'
-        assert reg in MEMORY_LIMITED_ADDRESS_REGISTERS, 'The register given is not an address register!'
+        assert reg in _MEMORY_LIMITED_ADDRESS_REGISTERS, 'The register given is not an address register!'
 
         # now set the value of the register
-        self.registers[reg] = bytearray(new_value.to_bytes(4, 'big'))
+        self.registers[reg] = new_value
 
 
     def set_program_counter_value(self, new_value: int):
@@ -134,7 +214,8 @@ class M68K:
         :param new_value:
         :return:
         """
-        self.set_address_register_value(Register.ProgramCounter, new_value)
+        assert 0 <= new_value <= MAX_MEMORY_LOCATION, 'The value of address registers must be in the range [0, 2^24]'
+        self.registers[_PC] = new_value
 
     def increment_program_counter(self, inc: int):
         """
@@ -142,8 +223,7 @@ class M68K:
         :param inc:
         :return:
         """
-        self.set_program_counter_value(
-            self.get_program_counter_value() + inc)
+        self.set_program_counter_value(self.registers[_PC] + inc)
 
     def get_condition_status_code(self, code: ConditionStatusCode) -> bool:
         """
@@ -151,9 +231,9 @@ class M68K:
         :param code:
         :return:
         """
-        ccr = self.get_register(Register.CCR)
+        self.resolve_condition_codes()
         # ccr is only 1 byte, bit mask away the bit being looked for
-        return (ccr[0] & code) > 0
+        return (self.registers[_CCR] & code) > 0
 
     def set_condition_status_code(self, code: ConditionStatusCode, value: bool):
         """
@@ -161,14 +241,46 @@ class M68K:
         :param code:
         :return:
         """
-        ccr = self.get_register(Register.CCR)
-        
+        self.resolve_condition_codes()
+
         if(value):
             # set bit to 1
-            self._set_condition_code_register_value(ccr[0] | code)
+            self.registers[_CCR] |= code
         else:
             # set bit to 0
-            self._set_condition_code_register_value(ccr[0] & ~code)
+            self.registers[_CCR] &= ~code & 0xFF
+
+    def set_condition_codes_from_result(self, operation: AluOperation, src: int, dest: int, result: int, size: int):
+        """
+        Updates the Condition Code Register from the result of an ALU operation
+        When lazy_condition_codes is set this only records the operation,
+        and the CCR is worked out when it is next read
+        :param operation: the kind of operation
+        :param src: the source value
+        :param dest: the destination value
+        :param result: the result of the operation, before being masked to the size
+        :param size: the size of the operation in bytes
+        :return:
+        """
+        if self.lazy_condition_codes:
+            # an operation that doesn't set every bit needs the ones before it
+            if self._pending_condition_codes is not None and \
+                    AFFECTED_CONDITION_CODES[operation] != ALL_CONDITION_CODES:
+                self.resolve_condition_codes()
+            self._pending_condition_codes = (operation, src, dest, result, size)
+        else:
+            self.registers[_CCR] = evaluate_condition_codes(operation, self.registers[_CCR], src, dest, result, size)
+
+    def resolve_condition_codes(self):
+        """
+        Works out the Condition Code Register from the last recorded ALU operation, if there is one
+        Anything reading self.registers directly should call this first
+        :return:
+        """
+        pending = self._pending_condition_codes
+        if pending is not None:
+            self._pending_condition_codes = None
+            self.registers[_CCR] = evaluate_condition_codes(pending[0], self.registers[_CCR], *pending[1:])
 
 
     def run(self):
@@ -176,13 +288,94 @@ class M68K:
         Starts the automatic execution
         :return:
         """
-        if not self.halted:
-            if not self.clock_auto_cycle:
-                # run a single instruction
-                self.step_instruction()
-            else:
-                while self.clock_auto_cycle:
+        try:
+            if not self.halted:
+                if not self.clock_auto_cycle:
+                    # run a single instruction
                     self.step_instruction()
+                elif self._use_blocks():
+                    while self.clock_auto_cycle:
+                        # stepping handles (and skips over) unknown instructions the same way as without blocks
+                        if self.block_translator.execute_block(self) == 0:
+                            self.step_instruction()
+                else:
+                    while self.clock_auto_cycle:
+                        self.step_instruction()
+        finally:
+            # anything that the program displayed should be seen once it stops
+            self.output.flush()
+
+    async def run_async(self, slice: int = DEFAULT_SLICE, max_instructions: int = None) -> int:
+        """
+        Starts the automatic execution as a coroutine, so that many simulators can share an event loop
+        Other tasks get to run after every slice of instructions, and while the program waits for input
+        :param slice: the most instructions to execute before letting other tasks run
+        :param max_instructions: the most instructions to execute in total, defaults to running until halted
+        :return: the number of instructions executed
+        """
+        # asyncio is slow to import and only needed here, so it isn't imported with the simulator
+        import asyncio
+
+        executed = 0
+        try:
+            if not self.halted:
+                if not self.clock_auto_cycle:
+                    # run a single instruction
+                    executed = await self._execute_async(1)
+                else:
+                    while self.clock_auto_cycle:
+                        if max_instructions is None:
+                            executed += await self._execute_async(slice)
+                        elif executed < max_instructions:
+                            executed += await self._execute_async(min(slice, max_instructions - executed))
+                        else:
+                            break
+                        await asyncio.sleep(0)
+        finally:
+            self.output.flush()
+        return executed
+
+    async def _execute_async(self, count: int) -> int:
+        """
+        Executes up to count instructions, waiting for the input that TRAP needs
+        :param count:
+        :return: the number of instructions executed
+        """
+        use_blocks = self._use_blocks()
+        executed = 0
+        while executed < count and not self.halted:
+            in_block = False
+            try:
+                # blocks are only used when the whole of one fits in what is left of the slice
+                done = 0
+                if use_blocks and count - executed >= MAX_BLOCK_LENGTH:
+                    in_block = True
+                    done = self.block_translator.execute_block(self)
+                    in_block = False
+                if done == 0:
+                    self.step_instruction()
+                    done = 1
+            except InputNotReadyError:
+                # the instructions in the block before the TRAP have still been executed
+                if in_block:
+                    executed += self.block_translator.executed
+                # the TRAP is still at the program counter, and runs again once the input is there
+                self.output.flush()
+                await self.input.wait_for_input()
+                continue
+
+            executed += done
+            if not self.clock_auto_cycle:
+                break
+        return executed
+
+    def _use_blocks(self) -> bool:
+        """
+        Checks whether run can execute translated blocks, which it can't while
+        anything needs to see each instruction on its own
+        :return:
+        """
+        return self.translate_blocks and self.journal is None and self.profiler is None and self.tracer is None
 
     def halt(self):
         """
@@ -191,6 +384,8 @@ class M68K:
         """
         self.clock_auto_cycle = False
         self.halted = True
+        # nothing else is going to be displayed, even if the instructions are being stepped through
+        self.output.flush()
 
     def step_instruction(self):
         """
@@ -199,27 +394,179 @@ class M68K:
         :return:
         """
         if not self.halted:
-            # must be here or we get circular dependency issues
-            from ..core.util.find_module import find_opcode_cls, valid_opcodes
-
-            for op_str in valid_opcodes:
-                op_class = find_opcode_cls(op_str)
-
-                # We don't know this opcode, there's no module for it
-                if op_class is None:
-                    print('Opcode {} is not known: skipping and continuing'.format(op_str))
-                    assert False
-                    continue
-
-                # 10 comes from 2 bytes for the op and max 2 longs which are each 4 bytes
-                # note: this currently has the edge case that it will fail unintelligibly
-                # if encountered at the end of memory
-                pc_val = self.get_program_counter_value()
-                op = op_class.disassemble_instruction(self.memory.memory[pc_val:pc_val+10])
-                if op is not None:
+            location = self.get_program_counter_value()
+            op = self.fetch_instruction(location)
+
+            # no opcode is known for this instruction
+            if op is not None:
+                journal = self.journal
+                tracer = self.tracer
+                if journal is not None:
+                    journal.begin(self)
+                if tracer is not None:
+                    tracer.begin(self, location)
+                try:
                     op.execute(self)
-                    # done exeucting after doing an operation
-                    return
+                except InputNotReadyError:
+                    # nothing was changed, the instruction runs again once there is input
+                    if journal is not None:
+                        journal.cancel()
+                    if tracer is not None:
+                        tracer.cancel()
+                    raise
+                except BaseException:
+                    if journal is not None:
+                        journal.end(self)
+                    if tracer is not None:
+                        tracer.cancel()
+                    raise
+
+                if journal is not None:
+                    journal.end(self)
+
+                cycles = op.get_cycles()
+                self._clock_cycles += cycles
+                if self.profiler is not None:
+                    self.profiler.record(location, op, cycles)
+                if tracer is not None:
+                    tracer.end(self, cycles)
+
+    def fetch_instruction(self, location: int):
+        """
+        Gets the opcode for the instruction at the given location in memory,
+        reusing the already disassembled opcode if there is one
+        :param location: the location of the first word of the instruction
+        :return: the Opcode instance, or None if the instruction is not known
+        """
+        op = self.instruction_cache.get(location)
+        if op is None:
+            op = self.decode_instruction(location)
+            if op is not None:
+                self.instruction_cache.put(location, op)
+        return op
+
+    def decode_instruction(self, location: int):
+        """
+        Disassembles the instruction at the given location in memory
+        :param location: the location of the first word of the instruction
+        :return: the Opcode instance, or None if the instruction is not known
+        """
+        # 10 comes from 2 bytes for the op and max 2 longs which are each 4 bytes
+        # note: this currently has the edge case that it will fail unintelligibly
+        # if encountered at the end of memory
+        data = self.memory.read_bytes(location, 10)
+
+        # look up the opcode for the first word of the instruction
+        op_class = get_opcode_dispatch_table()[int.from_bytes(data[0:2], 'big')]
+
+        if op_class is None:
+            return None
+
+        return op_class.disassemble_instruction(data)
+
+    def enable_journal(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Starts recording what each instruction overwrites, so that they can be undone with step_back
+        While recording, run executes one instruction at a time instead of in blocks
+        :param max_bytes: roughly how much memory the journal can use before the oldest instructions are forgotten
+        :return:
+        """
+        self.disable_journal()
+        self.journal = Journal(self, max_bytes)
+
+    def disable_journal(self):
+        """
+        Stops recording instructions and forgets the ones that were recorded
+        :return:
+        """
+        if self.journal is not None:
+            self.journal.detach()
+            self.journal = None
+
+    def enable_profiler(self) -> Profiler:
+        """
+        Starts counting the executions and cycles of each instruction
+        While profiling, run executes one instruction at a time instead of in blocks
+        :return: the profiler, which keeps counting until disable_profiler is called
+        """
+        if self.profiler is None:
+            self.profiler = Profiler()
+        return self.profiler
+
+    def disable_profiler(self) -> Profiler:
+        """
+        Stops counting the executions and cycles of each instruction
+        :return: the profiler with what was counted, or None if it wasn't enabled
+        """
+        profiler = self.profiler
+        self.profiler = None
+        return profiler
+
+    def enable_trace(self, capacity: int = DEFAULT_CAPACITY, file: typing.BinaryIO = None) -> Tracer:
+        """
+        Starts recording every instruction that is executed, see trace.py
+        While tracing, run executes one instruction at a time instead of in blocks
+        :param capacity: the number of records that the ring buffer holds
+        :param file: the file to write the trace to, if there isn't one only the latest records are kept
+        NOTE: file must be opened as binary or this won't work
+        :return: the tracer
+        """
+        self.disable_trace()
+        self.tracer = Tracer(self, capacity, file)
+        return self.tracer
+
+    def disable_trace(self) -> Tracer:
+        """
+        Stops recording instructions, writing what is left in the buffer to the trace file
+        :return: the tracer, or None if tracing wasn't enabled
+        """
+        tracer = self.tracer
+        if tracer is not None:
+            tracer.detach()
+            self.tracer = None
+        return tracer
+
+    def enable_instrumentation(self) -> Instrumentation:
+        """
+        Starts timing the execute and decode methods of each opcode class, see instrumentation.py
+        The timing is shared by every simulator which has it enabled
+        :return: the instrumentation
+        """
+        if self.instrumentation is None:
+            self.instrumentation = attach_instrumentation()
+        return self.instrumentation
+
+    def disable_instrumentation(self) -> Instrumentation:
+        """
+        Stops timing the opcode classes, putting their original methods back once no simulator is using them
+        :return: the instrumentation with what was measured, or None if it wasn't enabled
+        """
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            detach_instrumentation(instrumentation)
+            self.instrumentation = None
+        return instrumentation
+
+    def get_instrumentation_report(self) -> typing.Dict[str, typing.Dict[str, int]]:
+        """
+        Gets the count and total nanoseconds spent in execute and decode for each opcode class
+        since instrumentation was enabled
+        :return: the report from Instrumentation.report, or an empty dict if it isn't enabled
+        """
+        if self.instrumentation is None:
+            return {}
+        return self.instrumentation.report()
+
+    def step_back(self, count: int = 1) -> int:
+        """
+        Undoes the last instructions that were executed while the journal was enabled
+        Changes made to the registers or memory outside of an instruction are not undone
+        :param count: the number of instructions to undo
+        :return: the number of instructions that were undone
+        """
+        if self.journal is None:
+            return 0
+        return self.journal.step_back(self, count)
 
     def reload_execution(self):
         """
@@ -237,6 +584,35 @@ class M68K:
 
         # run until hits that PC value
 
+    def snapshot(self) -> Snapshot:
+        """
+        Saves the registers, clock cycles and memory so that they can be put back with restore
+        Taking a snapshot right after loading a program and restoring it
+        is much cheaper than making a new M68K and loading the program again
+        :return: the snapshot
+        """
+        self.resolve_condition_codes()
+        return Snapshot(array('I', self.registers), self._clock_cycles, self.halted,
+                        self.clock_auto_cycle, self.memory.snapshot())
+
+    def restore(self, snapshot: Snapshot):
+        """
+        Puts the registers, clock cycles and memory back to the way they were when the snapshot was taken
+        :param snapshot: a snapshot from this M68K's snapshot
+        :return:
+        """
+        # any cached instructions in memory that changed are dropped by the write listeners
+        self.memory.restore(snapshot.memory)
+        self.registers[:] = snapshot.registers
+        self._pending_condition_codes = None
+        self._clock_cycles = snapshot.clock_cycles
+        self.halted = snapshot.halted
+        self.clock_auto_cycle = snapshot.clock_auto_cycle
+
+        # the recorded instructions no longer lead up to this state
+        if self.journal is not None:
+            self.journal.clear()
+
     def get_cycles(self):
         """
         Returns how many clock cycles have been performed
@@ -244,6 +620,20 @@ class M68K:
         """
         return self._clock_cycles
 
+    def get_instruction_cache_hits(self) -> int:
+        """
+        Returns how many instructions were executed without having to be disassembled again
+        :return:
+        """
+        return self.instruction_cache.hits
+
+    def get_instruction_cache_misses(self) -> int:
+        """
+        Returns how many instructions had to be disassembled before being executed
+        :return:
+        """
+        return self.instruction_cache.misses
+
     def clear_cycles(self):
         """
         Resets the count of clock cycles
@@ -263,12 +653,50 @@ class M68K:
         self.memory.load_list_file(list_file)
         self.set_program_counter_value(int(list_file.starting_execution_address))
 
+    def load_s_records(self, lines: typing.Iterable[str]):
+        """
+        Load S Records
+
+        load the data of an S record file straight into memory, without
+        building a ListFile, and start execution at its starting address
+        :param lines: the lines of the S record, such as an open file
+        :return:
+        """
+        starting_execution_address = self.memory.load_s_records(lines)
+        if starting_execution_address is not None:
+            self.set_program_counter_value(starting_execution_address)
+
     def load_memory(self, file : typing.BinaryIO):
         """
         saves the raw memory into the designated file
         NOTE: file must be opened as binary or this won't work
         """
         self.memory.load_memory(file)
+        if self.journal is not None:
+            self.journal.clear()
+
+    def save_dump(self, file: typing.BinaryIO, compress: bool = True):
+        """
+        Saves the registers and the parts of memory that are not zeros into the designated file,
+        which is much smaller than save_memory
+        NOTE: file must be opened as binary or this won't work
+        :param file:
+        :param compress: whether to compress the dump with zlib
+        :return:
+        """
+        self.resolve_condition_codes()
+        write_dump(file, self.memory, self.registers, compress)
+
+    def load_dump(self, file: typing.BinaryIO):
+        """
+        Loads the registers and memory from a dump made with save_dump
+        NOTE: file must be opened as binary or this won't work
+        """
+        registers = read_dump(file, self.memory)[:REGISTER_COUNT]
+        self.registers[:len(registers)] = array('I', registers)
+        self._pending_condition_codes = None
+        if self.journal is not None:
+            self.journal.clear()
 
     def save_memory(self, file : typing.BinaryIO):
         """
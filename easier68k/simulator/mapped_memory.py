@@ -0,0 +1,154 @@
+"""
+Mapped Memory
+
+Memory for the 68k which is backed by an image file mapped with mmap,
+in the same raw format that Memory.save_memory writes.
+Opening an image doesn't read it, the operating system pages it in as it is used,
+and saving only flushes the pages that were written to since the last save.
+"""
+
+from .memory import Memory, PAGE_SHIFT
+import mmap
+import os
+import typing
+
+# the default size of a new image, the 2^24 bytes easy68K uses
+DEFAULT_IMAGE_SIZE = 16777216
+
+
+class MappedMemory(Memory):
+    def __init__(self, path: str, size: int = None):
+        """
+        Constructor
+        :param path: the image file, which is created (filled with zeros) if it doesn't exist
+        :param size: the size to make a new image, or to grow or shrink an existing one to
+        """
+        # Memory.__init__ is not called, the image replaces its bytearray
+
+        # functions that are called with (location, size) before memory is written to
+        self._write_listeners = []
+
+        # the snapshot that memory was last taken or restored from,
+        # and the pages that have been written to since then
+        self._snapshot_base = None
+        self._dirty_pages = None
+
+        if not os.path.exists(path):
+            open(path, 'wb').close()
+        if size is None and os.path.getsize(path) == 0:
+            # an empty file can't be mapped, so it is made into a new image
+            size = DEFAULT_IMAGE_SIZE
+
+        self.path = path
+        self._file = open(path, 'r+b')
+        if size is not None and os.path.getsize(path) != size:
+            # the new space is a hole in the file, so this doesn't write the zeros
+            self._file.truncate(size)
+
+        # mmap supports the same slicing as the bytearray that Memory uses
+        self.memory = mmap.mmap(self._file.fileno(), 0)
+
+        # page numbers of the pages written to since the last save
+        self.unsaved_pages = set()
+        self.add_write_listener(self._mark_unsaved)
+
+    def get(self, size: int, location: int) -> bytearray:
+        """
+        gets the memory at the given location index of size
+        """
+        return bytearray(super().get(size, location))
+
+    def read_bytes(self, location: int, length: int) -> bytearray:
+        """
+        gets up to length bytes starting at the given location, without checking alignment
+        reads going past the end of memory are cut short, like slicing
+        this is used for fetching instructions
+        """
+        return bytearray(self.memory[location:location+length])
+
+    def load_memory(self, file: typing.BinaryIO):
+        """
+        Loads the raw memory from the designated file into the image,
+        which is resized to match
+        NOTE: file must be opened as binary or this won't work
+        """
+        loaded = file.read()
+        for listener in self._write_listeners:
+            listener(0, max(len(self.memory), len(loaded)))
+        if len(loaded) != len(self.memory):
+            self.memory.resize(len(loaded))
+        self.memory[:] = loaded
+        self._snapshot_base = None
+        self._dirty_pages = None
+
+    def clear(self, size: int = None):
+        """
+        Sets all of the memory in the image to zeros
+        :param size: the new number of bytes of memory, defaults to keeping the current size
+        :return:
+        """
+        size = len(self.memory) if size is None else size
+        for listener in self._write_listeners:
+            listener(0, max(len(self.memory), size))
+        if size != len(self.memory):
+            self.memory.resize(size)
+        self.memory[:] = bytes(size)
+        self._snapshot_base = None
+        self._dirty_pages = None
+
+    def restore(self, snapshot):
+        """
+        Puts the memory back to the way it was when the snapshot was taken,
+        the image is resized to match instead of being replaced so that memory stays backed by it
+        :param snapshot: a snapshot from this memory's snapshot
+        :return:
+        """
+        if len(snapshot) != len(self.memory):
+            for listener in self._write_listeners:
+                listener(0, max(len(self.memory), len(snapshot)))
+            self.memory.resize(len(snapshot))
+            self._snapshot_base = None
+        super().restore(snapshot)
+
+    def save(self):
+        """
+        Writes the pages that have changed since the last save back to the image file
+        :return:
+        """
+        # flush runs of neighbouring pages together
+        pages = sorted(self.unsaved_pages)
+        start = 0
+        while start < len(pages):
+            end = start
+            while end + 1 < len(pages) and pages[end + 1] == pages[end] + 1:
+                end += 1
+
+            # flushing has to start on one of the operating system's pages
+            location = pages[start] << PAGE_SHIFT
+            location -= location % mmap.PAGESIZE
+            length = min((pages[end] + 1) << PAGE_SHIFT, len(self.memory)) - location
+            # pages past the end are left over from before the memory shrank
+            if length > 0:
+                self.memory.flush(location, length)
+            start = end + 1
+
+        self.unsaved_pages.clear()
+
+    def close(self):
+        """
+        Saves the image and closes it, the memory can't be used afterwards
+        :return:
+        """
+        self.save()
+        self.memory.close()
+        self._file.close()
+
+    def _mark_unsaved(self, location: int, size: int):
+        """
+        Write listener which records the pages that need to be saved
+        :param location:
+        :param size:
+        :return:
+        """
+        # not limited to the current size, the memory is told about writes before it grows
+        self.unsaved_pages.update(range(location >> PAGE_SHIFT, ((location + size - 1) >> PAGE_SHIFT) + 1))
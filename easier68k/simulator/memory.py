@@ -8,9 +8,27 @@ from ..core.enum.register import Register
 from ..core.enum.condition import Condition
 from ..core.enum.condition_status_code import ConditionStatusCode
 from ..core.enum.system_status_code import SystemStatusCode
-from ..core.models.list_file import ListFile
+from ..core.models.list_file import ListFile, parse_s_record_line
+from ..core.enum.srecordtype import SRecordType
+import struct
 import typing
 
+# memory is tracked in pages of 2^PAGE_SHIFT bytes (4 KiB)
+# for snapshots and by PagedMemory
+PAGE_SHIFT = 12
+PAGE_SIZE = 1 << PAGE_SHIFT
+PAGE_MASK = PAGE_SIZE - 1
+
+# precompiled big endian formats for the typed accessors, by size in bytes
+_U8 = struct.Struct('>B')
+_U16 = struct.Struct('>H')
+_U32 = struct.Struct('>I')
+_S8 = struct.Struct('>b')
+_S16 = struct.Struct('>h')
+_S32 = struct.Struct('>i')
+_UNSIGNED = {1: _U8, 2: _U16, 4: _U32}
+_SIGNED = {1: _S8, 2: _S16, 4: _S32}
+
 class UnalignedMemoryAccessError(Exception):
     pass
 
@@ -25,14 +43,18 @@ class Memory:
     Word = 2
     Long = 4
 
-    def __validateLocation(self, size: int, location: int):
+    # when set, the typed accessors (read_u8, write_u32 and so on) don't check
+    # alignment or bounds, for callers which have already checked them
+    trusted = False
+
+    def _validate_location(self, size: int, location: int):
         """
         Helper function which throws an error if the location is either
         not aligned or out of bounds
         """
         if(location % size != 0):
             raise UnalignedMemoryAccessError
-        if(location < 0 or location+size > len(self.memory)):
+        if(location < 0 or location+size > len(self)):
             raise OutOfBoundsMemoryError
 
     def __init__(self):
@@ -45,6 +67,33 @@ class Memory:
         # it is the number of bytes easy68K uses.
         self.memory = bytearray(16777216)
 
+        # functions that are called with (location, size) before memory is written to
+        self._write_listeners = []
+
+        # the snapshot that memory was last taken or restored from,
+        # and the pages that have been written to since then
+        self._snapshot_base = None
+        self._dirty_pages = None
+
+    def add_write_listener(self, listener: typing.Callable[[int, int], None]):
+        """
+        Adds a function that is called with the location and size of
+        every write, before the memory is changed
+        """
+        self._write_listeners.append(listener)
+
+    def remove_write_listener(self, listener: typing.Callable[[int, int], None]):
+        """
+        Removes a function previously added with add_write_listener
+        """
+        self._write_listeners.remove(listener)
+
+    def __len__(self) -> int:
+        """
+        The number of bytes of memory
+        """
+        return len(self.memory)
+
     def save_memory(self, file : typing.BinaryIO):
         """
         saves the raw memory into the designated file
@@ -58,7 +107,60 @@ class Memory:
         This includes programs
         NOTE: file must be opened as binary or this won't work
         """
-        self.memory = bytearray(file.read())
+        loaded = bytearray(file.read())
+        for listener in self._write_listeners:
+            listener(0, max(len(self.memory), len(loaded)))
+        self.memory = loaded
+        self._snapshot_base = None
+        self._dirty_pages = None
+
+    def clear(self, size: int = None):
+        """
+        Sets all of the memory to zeros
+        :param size: the new number of bytes of memory, defaults to keeping the current size
+        :return:
+        """
+        size = len(self.memory) if size is None else size
+        for listener in self._write_listeners:
+            listener(0, max(len(self.memory), size))
+        self.memory = bytearray(size)
+        self._snapshot_base = None
+        self._dirty_pages = None
+
+    def snapshot(self):
+        """
+        Takes a copy of the memory which can be given to restore
+        Restoring the latest snapshot only copies back the pages that were written
+        since it was taken, so resetting to it over and over is cheap
+        :return: the snapshot
+        """
+        snapshot = bytes(self.memory)
+        self._snapshot_base = snapshot
+        self._dirty_pages = set()
+        return snapshot
+
+    def restore(self, snapshot):
+        """
+        Puts the memory back to the way it was when the snapshot was taken
+        :param snapshot: a snapshot from this memory's snapshot
+        :return:
+        """
+        if snapshot is self._snapshot_base and len(snapshot) == len(self.memory):
+            for index in self._dirty_pages:
+                start = index << PAGE_SHIFT
+                for listener in self._write_listeners:
+                    listener(start, PAGE_SIZE)
+                self.memory[start:start + PAGE_SIZE] = snapshot[start:start + PAGE_SIZE]
+        else:
+            for listener in self._write_listeners:
+                listener(0, max(len(self.memory), len(snapshot)))
+            if len(snapshot) == len(self.memory):
+                self.memory[:] = snapshot
+            else:
+                self.memory = bytearray(snapshot)
+
+        self._snapshot_base = snapshot
+        self._dirty_pages = set()
 
 
     def load_list_file(self, list_file: ListFile):
@@ -77,29 +179,225 @@ class Memory:
         for key, value in list_file.data.items():
             # internally stored as a string for json compatibility
             # so convert back into an integer to represent the index
-            location = int(key)
+            self.write_bytes(int(key), bytes.fromhex(value))
+
+    def load_s_records(self, lines: typing.Iterable[str]) -> typing.Optional[int]:
+        """
+        Loads the data from the lines of an S record file straight into memory,
+        without building a ListFile first
+        :param lines: the lines of the S record, such as an open file
+        :return: the starting execution address, or None if there wasn't one
+        """
+        starting_execution_address = None
+        for line in lines:
+            record = parse_s_record_line(line)
+            if record is None:
+                continue
+            record_type, address, data = record
 
-            # decode the data into a ByteArray
-            # and then set it
-            values = bytearray.fromhex(value)
+            if record_type in [SRecordType.S1, SRecordType.S2, SRecordType.S3]:
+                self.write_bytes(address, bytes.fromhex(data))
 
-            for i in range(0, len(values), 1):
-                # set one byte at a time
-                self.set(1, location + i, values[i:i+1])
+            if record_type in [SRecordType.S7, SRecordType.S8, SRecordType.S9]:
+                starting_execution_address = address
 
+        return starting_execution_address
+
+    def write_bytes(self, location: int, data: bytes):
+        """
+        sets a run of bytes starting at the given location, without checking alignment
+        the whole range is checked once and copied at once, so this is used for loading programs
+        """
+        end = location + len(data)
+        if(location < 0 or end > len(self)):
+            raise OutOfBoundsMemoryError
+        if not data:
+            return
+        for listener in self._write_listeners:
+            listener(location, len(data))
+        if self._dirty_pages is not None:
+            self._mark_dirty(location, len(data))
+        self.memory[location:end] = data
+
+    def read_bytes(self, location: int, length: int) -> bytearray:
+        """
+        gets up to length bytes starting at the given location, without checking alignment
+        reads going past the end of memory are cut short, like slicing
+        this is used for fetching instructions
+        """
+        return self.memory[location:location+length]
+
+    def read_string(self, location: int) -> bytearray:
+        """
+        gets the bytes from the given location up to, but not including, the next NUL (zero) byte
+        raises OutOfBoundsMemoryError if memory ends before a NUL is found
+        """
+        if(location < 0 or location >= len(self)):
+            raise OutOfBoundsMemoryError
+        end = self.memory.find(b'\x00', location)
+        if end == -1:
+            raise OutOfBoundsMemoryError
+        return bytearray(self.memory[location:end])
 
     def get(self, size: int, location: int) -> bytearray:
         """
         gets the memory at the given location index of size
         """
-        self.__validateLocation(size, location)
+        self._validate_location(size, location)
         return self.memory[location:location+size]
 
     def set(self, size: int, location: int, value: bytearray):
         """
         sets the memory at the given location index of size
         """
-        self.__validateLocation(size, location)
+        self._validate_location(size, location)
         if(len(value) != size):
             raise AssignWrongMemorySizeError
+        for listener in self._write_listeners:
+            listener(location, size)
+        if self._dirty_pages is not None:
+            self._mark_dirty(location, size)
         self.memory[location:location+size] = value
+
+    def _mark_dirty(self, location: int, size: int):
+        """
+        Records that the pages covering [location, location + size) have been
+        written to since the last snapshot
+        """
+        first = location >> PAGE_SHIFT
+        last = (location + size - 1) >> PAGE_SHIFT
+        self._dirty_pages.add(first)
+        if last != first:
+            self._dirty_pages.update(range(first + 1, last + 1))
+
+    def read_u8(self, location: int) -> int:
+        """
+        gets the unsigned byte at the given location
+        """
+        if not self.trusted:
+            self._validate_location(1, location)
+        return self._unpack(_U8, location)
+
+    def read_u16(self, location: int) -> int:
+        """
+        gets the unsigned word at the given location
+        """
+        if not self.trusted:
+            self._validate_location(2, location)
+        return self._unpack(_U16, location)
+
+    def read_u32(self, location: int) -> int:
+        """
+        gets the unsigned long at the given location
+        """
+        if not self.trusted:
+            self._validate_location(4, location)
+        return self._unpack(_U32, location)
+
+    def read_s8(self, location: int) -> int:
+        """
+        gets the signed byte at the given location
+        """
+        if not self.trusted:
+            self._validate_location(1, location)
+        return self._unpack(_S8, location)
+
+    def read_s16(self, location: int) -> int:
+        """
+        gets the signed word at the given location
+        """
+        if not self.trusted:
+            self._validate_location(2, location)
+        return self._unpack(_S16, location)
+
+    def read_s32(self, location: int) -> int:
+        """
+        gets the signed long at the given location
+        """
+        if not self.trusted:
+            self._validate_location(4, location)
+        return self._unpack(_S32, location)
+
+    def read_uint(self, size: int, location: int) -> int:
+        """
+        gets the unsigned value of size bytes (1, 2 or 4) at the given location
+        """
+        if not self.trusted:
+            self._validate_location(size, location)
+        return self._unpack(_UNSIGNED[size], location)
+
+    def write_u8(self, location: int, value: int):
+        """
+        sets the unsigned byte at the given location
+        """
+        if not self.trusted:
+            self._validate_location(1, location)
+        self._pack(_U8, location, value)
+
+    def write_u16(self, location: int, value: int):
+        """
+        sets the unsigned word at the given location
+        """
+        if not self.trusted:
+            self._validate_location(2, location)
+        self._pack(_U16, location, value)
+
+    def write_u32(self, location: int, value: int):
+        """
+        sets the unsigned long at the given location
+        """
+        if not self.trusted:
+            self._validate_location(4, location)
+        self._pack(_U32, location, value)
+
+    def write_s8(self, location: int, value: int):
+        """
+        sets the signed byte at the given location
+        """
+        if not self.trusted:
+            self._validate_location(1, location)
+        self._pack(_S8, location, value)
+
+    def write_s16(self, location: int, value: int):
+        """
+        sets the signed word at the given location
+        """
+        if not self.trusted:
+            self._validate_location(2, location)
+        self._pack(_S16, location, value)
+
+    def write_s32(self, location: int, value: int):
+        """
+        sets the signed long at the given location
+        """
+        if not self.trusted:
+            self._validate_location(4, location)
+        self._pack(_S32, location, value)
+
+    def write_uint(self, size: int, location: int, value: int):
+        """
+        sets the unsigned value of size bytes (1, 2 or 4) at the given location
+        """
+        if not self.trusted:
+            self._validate_location(size, location)
+        self._pack(_UNSIGNED[size], location, value)
+
+    def _unpack(self, fmt: struct.Struct, location: int) -> int:
+        """
+        Reads a value straight out of memory, the location has already been checked
+        """
+        return fmt.unpack_from(self.memory, location)[0]
+
+    def _pack(self, fmt: struct.Struct, location: int, value: int):
+        """
+        Writes a value straight into memory, the location has already been checked
+        raises OverflowError if the value doesn't fit
+        """
+        for listener in self._write_listeners:
+            listener(location, fmt.size)
+        if self._dirty_pages is not None:
+            self._mark_dirty(location, fmt.size)
+        try:
+            fmt.pack_into(self.memory, location, value)
+        except struct.error as error:
+            raise OverflowError(str(error)) from error
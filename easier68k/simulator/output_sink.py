@@ -0,0 +1,111 @@
+"""
+Output Sink
+
+Where the text that a program displays (using TRAP #15) goes.
+The simulator writes whole strings to its sink, rather than printing a character at a time.
+"""
+
+import sys
+import typing
+
+# how many characters StdoutSink holds on to by default before writing them
+DEFAULT_BUFFER_SIZE = 4096
+
+
+class OutputSink:
+    def write(self, text: str):
+        """
+        Writes text that the program displayed
+        :param text:
+        :return:
+        """
+        pass
+
+    def flush(self):
+        """
+        Makes sure that everything written so far has been output
+        The simulator calls this whenever it stops running
+        :return:
+        """
+        pass
+
+
+class StdoutSink(OutputSink):
+    def __init__(self, stream: typing.TextIO = None, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        Constructor
+        :param stream: the stream to write to, defaults to whatever sys.stdout is when writing
+        :param buffer_size: how many characters to hold on to before writing them,
+        0 writes every string straight away. Whatever is held on to is written when the simulator
+        stops running, halts, or waits for input
+        """
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._buffered = 0
+
+    def write(self, text: str):
+        if self.buffer_size <= 0:
+            (self.stream or sys.stdout).write(text)
+            return
+
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        stream = self.stream or sys.stdout
+        if self._buffer:
+            stream.write(''.join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+        stream.flush()
+
+
+class CaptureSink(OutputSink):
+    def __init__(self):
+        """
+        Constructor
+        """
+        self._parts = []
+
+    def write(self, text: str):
+        self._parts.append(text)
+
+    def getvalue(self) -> str:
+        """
+        Gets everything that has been written
+        :return:
+        """
+        return ''.join(self._parts)
+
+    def clear(self):
+        """
+        Forgets everything that has been written
+        :return:
+        """
+        self._parts.clear()
+
+
+class FileSink(OutputSink):
+    def __init__(self, path: str, append: bool = False):
+        """
+        Constructor
+        :param path: the file to write to
+        :param append: whether to add to the end of the file instead of replacing it
+        """
+        self.file = open(path, 'a' if append else 'w')
+
+    def write(self, text: str):
+        self.file.write(text)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        """
+        Closes the file
+        :return:
+        """
+        self.file.close()
@@ -0,0 +1,292 @@
+"""
+Paged Memory
+
+Memory for the 68k which is split up into fixed size pages that are
+only allocated the first time they are written to.
+Pages that have never been written to read as zeros.
+
+Most programs only touch a handful of locations, so this saves
+allocating and copying the whole 16 MiB address space for every simulator.
+
+Snapshots share pages with the memory, and a shared page is only copied
+the first time that it is written to afterwards (copy-on-write).
+"""
+
+from .memory import Memory, AssignWrongMemorySizeError, OutOfBoundsMemoryError, PAGE_SHIFT, PAGE_SIZE, PAGE_MASK
+import struct
+import typing
+
+# what an untouched page reads as
+_ZERO_PAGE = bytes(PAGE_SIZE)
+
+
+class PagedMemory(Memory):
+    def __init__(self, size: int = 16777216):
+        """
+        Constructor
+        :param size: the number of bytes of memory, defaults to the 2^24 bytes easy68K uses
+        """
+        # the bytearray that Memory allocates is exactly what this avoids,
+        # so Memory.__init__ is not called
+        self._size = size
+
+        # page number -> bytearray of PAGE_SIZE bytes
+        self.pages = {}
+
+        # page numbers of pages that are shared with a snapshot,
+        # which have to be copied before they are written to
+        self._shared = set()
+
+        # functions that are called with (location, size) before memory is written to
+        self._write_listeners = []
+
+        # the snapshot that memory was last taken or restored from,
+        # and the pages that have been written to since then
+        self._snapshot_base = None
+        self._dirty_pages = None
+
+    def __len__(self) -> int:
+        """
+        The number of bytes of memory
+        """
+        return self._size
+
+    def get_allocated_page_count(self) -> int:
+        """
+        Gets the number of pages which have been written to
+        """
+        return len(self.pages)
+
+    def save_memory(self, file: typing.BinaryIO):
+        """
+        saves the raw memory into the designated file, including all of the untouched pages,
+        so that the file is the same as one saved from a Memory
+        NOTE: file must be opened as binary or this won't work
+        """
+        for index in range((self._size + PAGE_MASK) >> PAGE_SHIFT):
+            page = self.pages.get(index, _ZERO_PAGE)
+            file.write(page[:self._size - (index << PAGE_SHIFT)])
+
+    def load_memory(self, file: typing.BinaryIO):
+        """
+        Loads the raw memory from the designated file
+        This includes programs
+        Only the pages which are not all zeros are allocated
+        NOTE: file must be opened as binary or this won't work
+        """
+        loaded = file.read()
+        for listener in self._write_listeners:
+            listener(0, max(self._size, len(loaded)))
+
+        self.pages = {}
+        self._size = len(loaded)
+        for start in range(0, len(loaded), PAGE_SIZE):
+            chunk = loaded[start:start + PAGE_SIZE]
+            if chunk != _ZERO_PAGE[:len(chunk)]:
+                page = bytearray(PAGE_SIZE)
+                page[:len(chunk)] = chunk
+                self.pages[start >> PAGE_SHIFT] = page
+        self._shared = set()
+        self._snapshot_base = None
+        self._dirty_pages = None
+
+    def clear(self, size: int = None):
+        """
+        Sets all of the memory to zeros, which frees all of the pages
+        :param size: the new number of bytes of memory, defaults to keeping the current size
+        :return:
+        """
+        size = self._size if size is None else size
+        for listener in self._write_listeners:
+            listener(0, max(self._size, size))
+        self.pages = {}
+        self._size = size
+        self._shared = set()
+        self._snapshot_base = None
+        self._dirty_pages = None
+
+    def snapshot(self):
+        """
+        Takes a snapshot of the memory which can be given to restore
+        No memory is copied, the pages are shared until they are next written to
+        :return: the snapshot
+        """
+        pages = dict(self.pages)
+        snapshot = (self._size, pages)
+        self._shared = set(pages)
+        self._snapshot_base = snapshot
+        self._dirty_pages = set()
+        return snapshot
+
+    def restore(self, snapshot):
+        """
+        Puts the memory back to the way it was when the snapshot was taken
+        Restoring the latest snapshot only touches the pages that were written since
+        :param snapshot: a snapshot from this memory's snapshot
+        :return:
+        """
+        size, pages = snapshot
+        if snapshot is self._snapshot_base and size == self._size:
+            for index in self._dirty_pages:
+                for listener in self._write_listeners:
+                    listener(index << PAGE_SHIFT, PAGE_SIZE)
+                page = pages.get(index)
+                if page is None:
+                    del self.pages[index]
+                else:
+                    self.pages[index] = page
+                    self._shared.add(index)
+        else:
+            for listener in self._write_listeners:
+                listener(0, max(self._size, size))
+            self.pages = dict(pages)
+            self._shared = set(pages)
+
+        self._size = size
+        self._snapshot_base = snapshot
+        self._dirty_pages = set()
+
+    def read_bytes(self, location: int, length: int) -> bytearray:
+        """
+        gets up to length bytes starting at the given location, without checking alignment
+        reads going past the end of memory are cut short, like slicing
+        this is used for fetching instructions
+        """
+        end = min(location + length, self._size)
+        result = bytearray()
+        while location < end:
+            offset = location & PAGE_MASK
+            count = min(end - location, PAGE_SIZE - offset)
+            page = self.pages.get(location >> PAGE_SHIFT)
+            if page is None:
+                result += bytes(count)
+            else:
+                result += page[offset:offset + count]
+            location += count
+        return result
+
+    def write_bytes(self, location: int, data: bytes):
+        """
+        sets a run of bytes starting at the given location, without checking alignment
+        the whole range is checked once and copied a page at a time, so this is used for loading programs
+        """
+        end = location + len(data)
+        if(location < 0 or end > self._size):
+            raise OutOfBoundsMemoryError
+        if not data:
+            return
+        for listener in self._write_listeners:
+            listener(location, len(data))
+        self._write(location, data)
+
+    def read_string(self, location: int) -> bytearray:
+        """
+        gets the bytes from the given location up to, but not including, the next NUL (zero) byte
+        raises OutOfBoundsMemoryError if memory ends before a NUL is found
+        """
+        if(location < 0 or location >= self._size):
+            raise OutOfBoundsMemoryError
+        result = bytearray()
+        while location < self._size:
+            page = self.pages.get(location >> PAGE_SHIFT)
+            if page is None:
+                # untouched pages are all zeros
+                return result
+            offset = location & PAGE_MASK
+            limit = min(PAGE_SIZE, self._size - (location - offset))
+            end = page.find(b'\x00', offset, limit)
+            if end != -1:
+                result += page[offset:end]
+                return result
+            result += page[offset:limit]
+            location += limit - offset
+        raise OutOfBoundsMemoryError
+
+    def get(self, size: int, location: int) -> bytearray:
+        """
+        gets the memory at the given location index of size
+        """
+        self._validate_location(size, location)
+        offset = location & PAGE_MASK
+        if offset + size > PAGE_SIZE:
+            # only sizes which don't divide the page size can cross pages
+            return self.read_bytes(location, size)
+        page = self.pages.get(location >> PAGE_SHIFT)
+        if page is None:
+            return bytearray(size)
+        return page[offset:offset + size]
+
+    def set(self, size: int, location: int, value: bytearray):
+        """
+        sets the memory at the given location index of size
+        """
+        self._validate_location(size, location)
+        if(len(value) != size):
+            raise AssignWrongMemorySizeError
+        for listener in self._write_listeners:
+            listener(location, size)
+        self._write(location, value)
+
+    def _write(self, location: int, data: bytes):
+        """
+        Copies data into the pages starting at location, which has already been checked
+        :param location:
+        :param data:
+        :return:
+        """
+        size = len(data)
+        written = 0
+        while written < size:
+            index = location >> PAGE_SHIFT
+            offset = location & PAGE_MASK
+            count = min(size - written, PAGE_SIZE - offset)
+            page = self.pages.get(index)
+            if page is None or index in self._shared:
+                page = self._own_page(index, page)
+            page[offset:offset + count] = data[written:written + count]
+            written += count
+            location += count
+
+    def _unpack(self, fmt: struct.Struct, location: int) -> int:
+        """
+        Reads a value straight out of its page, the location has already been checked
+        aligned values never go across pages
+        """
+        page = self.pages.get(location >> PAGE_SHIFT)
+        if page is None:
+            return 0
+        return fmt.unpack_from(page, location & PAGE_MASK)[0]
+
+    def _pack(self, fmt: struct.Struct, location: int, value: int):
+        """
+        Writes a value straight into its page, the location has already been checked
+        raises OverflowError if the value doesn't fit
+        """
+        for listener in self._write_listeners:
+            listener(location, fmt.size)
+        index = location >> PAGE_SHIFT
+        page = self.pages.get(index)
+        if page is None or index in self._shared:
+            page = self._own_page(index, page)
+        try:
+            fmt.pack_into(page, location & PAGE_MASK, value)
+        except struct.error as error:
+            raise OverflowError(str(error)) from error
+
+    def _own_page(self, index: int, page: bytearray) -> bytearray:
+        """
+        Gets a page that can be written to without changing a snapshot,
+        allocating it if it has never been written to or copying it if it is shared
+        :param index: the page number
+        :param page: the current page, or None
+        :return: the page to write to
+        """
+        if page is None:
+            page = bytearray(PAGE_SIZE)
+        else:
+            page = bytearray(page)
+            self._shared.discard(index)
+        self.pages[index] = page
+        if self._dirty_pages is not None:
+            self._dirty_pages.add(index)
+        return page
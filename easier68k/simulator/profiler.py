@@ -0,0 +1,169 @@
+"""
+Profiler
+
+Counts how many times the instruction at each location is executed and the clock cycles
+spent there, along with the same for each opcode class, to find where a program spends its time.
+
+The counts for each location are kept in arrays, one for each page of memory that has
+instructions executed in it, rather than a dictionary entry for every location.
+"""
+
+from .memory import PAGE_SHIFT, PAGE_SIZE, PAGE_MASK
+from array import array
+import bisect
+import typing
+
+
+class HotSpot:
+    def __init__(self, location: int, label: str, count: int, cycles: int):
+        """
+        Constructor
+        :param location: the location of the instruction
+        :param label: the location relative to the nearest symbol before it, such as 'loop+4'
+        :param count: the number of times that the instruction was executed
+        :param cycles: the clock cycles spent executing the instruction
+        """
+        self.location = location
+        self.label = label
+        self.count = count
+        self.cycles = cycles
+
+    def __repr__(self):
+        return 'HotSpot({}, {!r}, {}, {})'.format(self.location, self.label, self.count, self.cycles)
+
+
+def resolve_symbol(location: int, symbols: typing.Dict[str, int]) -> str:
+    """
+    Names a location by the nearest symbol at or before it
+
+    >>> resolve_symbol(0x1006, {'start': 0x1000, 'loop': 0x1004})
+    'loop+2'
+    >>> resolve_symbol(0x1000, {'start': 0x1000})
+    'start'
+    >>> resolve_symbol(0x0FFE, {'start': 0x1000})
+    '$FFE'
+
+    :param location:
+    :param symbols: the symbols of a list file, the location of each by its name
+    :return:
+    """
+    by_location = sorted((int(value), name) for name, value in symbols.items())
+    index = bisect.bisect_right([value for value, _ in by_location], location) - 1
+    if index < 0:
+        return '${:X}'.format(location)
+    symbol_location, name = by_location[index]
+    if symbol_location == location:
+        return name
+    return '{}+{}'.format(name, location - symbol_location)
+
+
+class Profiler:
+    def __init__(self):
+        """
+        Constructor
+        """
+        # the execution count and cycles for each location, by page number
+        self._counts = {}
+        self._cycles = {}
+
+        # [execution count, cycles] by the name of the opcode class
+        self.opcodes = {}
+
+    def record(self, location: int, op, cycles: int):
+        """
+        Records an executed instruction
+        :param location: the location of the instruction
+        :param op: the opcode that was executed
+        :param cycles: the clock cycles that it took
+        :return:
+        """
+        page = location >> PAGE_SHIFT
+        counts = self._counts.get(page)
+        if counts is None:
+            counts = self._counts[page] = array('Q', bytes(PAGE_SIZE * 8))
+            self._cycles[page] = array('Q', bytes(PAGE_SIZE * 8))
+        offset = location & PAGE_MASK
+        counts[offset] += 1
+        self._cycles[page][offset] += cycles
+
+        totals = self.opcodes.get(type(op).__name__)
+        if totals is None:
+            totals = self.opcodes[type(op).__name__] = [0, 0]
+        totals[0] += 1
+        totals[1] += cycles
+
+    def get_count(self, location: int) -> int:
+        """
+        Gets how many times the instruction at a location was executed
+        :param location:
+        :return:
+        """
+        counts = self._counts.get(location >> PAGE_SHIFT)
+        return 0 if counts is None else counts[location & PAGE_MASK]
+
+    def get_cycles(self, location: int) -> int:
+        """
+        Gets the clock cycles spent executing the instruction at a location
+        :param location:
+        :return:
+        """
+        cycles = self._cycles.get(location >> PAGE_SHIFT)
+        return 0 if cycles is None else cycles[location & PAGE_MASK]
+
+    def locations(self) -> typing.Iterator[typing.Tuple[int, int, int]]:
+        """
+        Goes through every location that has been executed, in order
+        :return: the location, execution count and cycles of each
+        """
+        for page in sorted(self._counts):
+            counts = self._counts[page]
+            cycles = self._cycles[page]
+            base = page << PAGE_SHIFT
+            for offset, count in enumerate(counts):
+                if count:
+                    yield base + offset, count, cycles[offset]
+
+    def hot_spots(self, symbols: typing.Dict[str, int] = None, limit: int = None) -> typing.List[HotSpot]:
+        """
+        Gets the locations that the most cycles were spent at
+        :param symbols: the symbols of the list file, to name the locations with
+        :param limit: the most hot spots to get, defaults to all of them
+        :return: the hot spots, most cycles first
+        """
+        ordered = sorted(self.locations(), key=lambda spot: (-spot[2], -spot[1], spot[0]))
+        if limit is not None:
+            ordered = ordered[:limit]
+        symbols = symbols or {}
+        return [HotSpot(location, resolve_symbol(location, symbols), count, cycles)
+                for location, count, cycles in ordered]
+
+    def report(self, symbols: typing.Dict[str, int] = None, limit: int = 20) -> str:
+        """
+        Formats the hot spots and the opcode totals as a table
+        :param symbols: the symbols of the list file, to name the locations with
+        :param limit: the most hot spots to include
+        :return:
+        """
+        spots = self.hot_spots(symbols, limit)
+        total = sum(cycles for _, cycles in self.opcodes.values()) or 1
+
+        lines = ['{:>8}  {:<24} {:>12} {:>14} {:>7}'.format('location', 'symbol', 'count', 'cycles', '%')]
+        for spot in spots:
+            lines.append('{:>8X}  {:<24} {:>12} {:>14} {:>6.1f}%'.format(
+                spot.location, spot.label, spot.count, spot.cycles, 100 * spot.cycles / total))
+
+        lines.append('')
+        lines.append('{:<34} {:>12} {:>14} {:>7}'.format('opcode', 'count', 'cycles', '%'))
+        for name, (count, cycles) in sorted(self.opcodes.items(), key=lambda item: -item[1][1]):
+            lines.append('{:<34} {:>12} {:>14} {:>6.1f}%'.format(name, count, cycles, 100 * cycles / total))
+
+        return '\n'.join(lines)
+
+    def clear(self):
+        """
+        Forgets everything that has been counted
+        :return:
+        """
+        self._counts.clear()
+        self._cycles.clear()
+        self.opcodes.clear()
@@ -0,0 +1,25 @@
+"""
+Snapshot
+
+The saved state of an M68K, from M68K.snapshot,
+which it can be put back to with M68K.restore
+"""
+
+from array import array
+
+
+class Snapshot:
+    def __init__(self, registers: array, clock_cycles: int, halted: bool, clock_auto_cycle: bool, memory):
+        """
+        Constructor
+        :param registers: a copy of the register values
+        :param clock_cycles: the number of clock cycles that had been performed
+        :param halted: whether the simulation had been halted
+        :param clock_auto_cycle: whether the clock was automatically cycling, halting turns this off
+        :param memory: the snapshot of the memory, from Memory.snapshot
+        """
+        self.registers = registers
+        self.clock_cycles = clock_cycles
+        self.halted = halted
+        self.clock_auto_cycle = clock_auto_cycle
+        self.memory = memory
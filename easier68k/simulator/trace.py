@@ -0,0 +1,245 @@
+"""
+Trace
+
+Records every instruction that is executed, in a compact binary form, so that long
+runs can be looked through afterwards to find where they went wrong.
+
+Every record is the same size, big endian:
+    1 byte      the kind of record
+    1 byte      instruction: unused, register: the register index, write: the number of bytes
+    2 bytes     instruction: the first word of the instruction, otherwise unused
+    4 bytes     instruction: the program counter, register: the old value, write: the location
+    4 bytes     instruction: the clock cycles, register: the new value, write: the bytes written
+
+An instruction record is followed by a record for each register that it changed
+and each write that it made to memory, writes longer than 4 bytes take several records.
+
+Records are put in a ring buffer. When tracing to a file, the buffer is written out to
+the file whenever it fills up. Otherwise, only the latest records are kept, which
+can be saved with Tracer.save.
+
+A trace file starts with a header of b'E68T', the version and the size of each record.
+"""
+
+from array import array
+import struct
+import typing
+
+MAGIC = b'E68T'
+VERSION = 1
+
+# the default number of records in the ring buffer
+DEFAULT_CAPACITY = 65536
+
+# the kinds of records
+RECORD_INSTRUCTION = 0
+RECORD_REGISTER = 1
+RECORD_WRITE = 2
+
+_HEADER = struct.Struct('>4sBB')
+_RECORD = struct.Struct('>BBHII')
+
+# the number of records that are read from a file at a time
+_READ_RECORDS = 4096
+
+
+class InvalidTraceError(Exception):
+    pass
+
+
+class TraceEntry:
+    def __init__(self, pc: int, opcode_word: int, cycles: int):
+        """
+        Constructor
+        :param pc: the location of the instruction
+        :param opcode_word: the first word of the instruction
+        :param cycles: the clock cycles that the instruction took
+        """
+        self.pc = pc
+        self.opcode_word = opcode_word
+        self.cycles = cycles
+
+        # (register index, old value, new value) for each register that was changed
+        self.registers = []
+
+        # (location, bytes written) for each write to memory
+        self.writes = []
+
+    def __repr__(self):
+        return 'TraceEntry(pc={}, opcode_word={:#06x}, cycles={}, registers={}, writes={})'.format(
+            self.pc, self.opcode_word, self.cycles, self.registers, self.writes)
+
+
+class Tracer:
+    def __init__(self, simulator, capacity: int = DEFAULT_CAPACITY, file: typing.BinaryIO = None):
+        """
+        Constructor
+        :param simulator: the M68K to trace
+        :param capacity: the number of records that the ring buffer holds
+        :param file: the file to write the trace to as the buffer fills up,
+        if there isn't one only the latest records are kept
+        NOTE: file must be opened as binary or this won't work
+        """
+        self.capacity = capacity
+        self.file = file
+
+        self._buffer = bytearray(capacity * _RECORD.size)
+        # the index of the next record to write, and whether the buffer has gone all the way around
+        self._next = 0
+        self._wrapped = False
+
+        # the state from before the instruction that is being executed, None when not recording
+        self._pc = 0
+        self._opcode_word = 0
+        self._registers = None
+        self._writes = None
+
+        if file is not None:
+            file.write(_HEADER.pack(MAGIC, VERSION, _RECORD.size))
+
+        self._memory = simulator.memory
+        self._memory.add_write_listener(self._record_write)
+
+    def begin(self, simulator, location: int):
+        """
+        Starts recording an instruction, call before it is executed
+        :param simulator: the simulator that is about to execute
+        :param location: the location of the instruction
+        :return:
+        """
+        simulator.resolve_condition_codes()
+        self._pc = location
+        self._opcode_word = int.from_bytes(simulator.memory.read_bytes(location, 2), 'big')
+        self._registers = array('I', simulator.registers)
+        self._writes = []
+
+    def end(self, simulator, cycles: int):
+        """
+        Finishes recording an instruction, call after it is executed
+        :param simulator: the simulator that executed the instruction
+        :param cycles: the clock cycles that the instruction took
+        :return:
+        """
+        simulator.resolve_condition_codes()
+
+        self._add(RECORD_INSTRUCTION, 0, self._opcode_word, self._pc, cycles)
+        for index, (old, new) in enumerate(zip(self._registers, simulator.registers)):
+            if old != new:
+                self._add(RECORD_REGISTER, index, 0, old, new)
+
+        for location, size in self._writes:
+            data = simulator.memory.read_bytes(location, size)
+            for offset in range(0, len(data), 4):
+                chunk = data[offset:offset + 4]
+                self._add(RECORD_WRITE, len(chunk), 0, location + offset, int.from_bytes(chunk, 'big'))
+
+        self._registers = None
+        self._writes = None
+
+    def cancel(self):
+        """
+        Stops recording an instruction that was not executed
+        :return:
+        """
+        self._registers = None
+        self._writes = None
+
+    def flush(self):
+        """
+        Writes the records in the buffer to the file, if tracing to one
+        :return:
+        """
+        if self.file is not None:
+            self.file.write(self._buffer[:self._next * _RECORD.size])
+            self.file.flush()
+            self._next = 0
+
+    def save(self, file: typing.BinaryIO):
+        """
+        Writes the records in the buffer to a new trace file, oldest first
+        NOTE: file must be opened as binary or this won't work
+        :param file:
+        :return:
+        """
+        file.write(_HEADER.pack(MAGIC, VERSION, _RECORD.size))
+        end = self._next * _RECORD.size
+        if self._wrapped:
+            file.write(self._buffer[end:])
+        file.write(self._buffer[:end])
+
+    def detach(self):
+        """
+        Stops listening to the memory's writes, and flushes to the file
+        :return:
+        """
+        self._memory.remove_write_listener(self._record_write)
+        self.flush()
+
+    def _add(self, kind: int, small: int, word: int, first: int, second: int):
+        """
+        Adds a record to the buffer, making room for it if the buffer is full
+        :return:
+        """
+        if self._next == self.capacity:
+            if self.file is not None:
+                self.flush()
+            else:
+                self._next = 0
+                self._wrapped = True
+        _RECORD.pack_into(self._buffer, self._next * _RECORD.size, kind, small, word, first, second)
+        self._next += 1
+
+    def _record_write(self, location: int, size: int):
+        """
+        Write listener which remembers where the instruction wrote,
+        the bytes are read once the instruction has finished
+        :param location:
+        :param size:
+        :return:
+        """
+        if self._writes is not None:
+            self._writes.append((location, size))
+
+
+def read_trace(file: typing.BinaryIO) -> typing.Iterator[TraceEntry]:
+    """
+    Reads the instructions from a trace file, without loading all of it at once
+    NOTE: file must be opened as binary or this won't work
+    :param file:
+    :return: each instruction, in the order they were executed
+    """
+    header = file.read(_HEADER.size)
+    if len(header) != _HEADER.size:
+        raise InvalidTraceError('The trace is too short')
+    magic, version, record_size = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise InvalidTraceError('The file is not a trace')
+    if version != VERSION or record_size != _RECORD.size:
+        raise InvalidTraceError('Unsupported trace version {}'.format(version))
+
+    entry = None
+    while True:
+        data = file.read(_READ_RECORDS * _RECORD.size)
+        if not data:
+            break
+        if len(data) % _RECORD.size:
+            # the last record was only partly written
+            data = data[:len(data) - len(data) % _RECORD.size]
+
+        for kind, small, word, first, second in _RECORD.iter_unpack(data):
+            if kind == RECORD_INSTRUCTION:
+                if entry is not None:
+                    yield entry
+                entry = TraceEntry(first, word, second)
+            elif entry is None:
+                # the start of the ring buffer can be part way through an instruction
+                continue
+            elif kind == RECORD_REGISTER:
+                entry.registers.append((small, first, second))
+            elif kind == RECORD_WRITE:
+                entry.writes.append((first, second.to_bytes(4, 'big')[4 - small:]))
+            else:
+                raise InvalidTraceError('Unknown record kind {}'.format(kind))
+
+    if entry is not None:
+        yield entry
@@ -7,9 +7,13 @@ setup(
     author='Adam Krpan, Chris Johnston, Levi Stoddard',
     author_email='githubchrisjohnston@gmail.com',
     license='MIT',
-    packages=find_packages(exclude=['tests']),
+    packages=find_packages(exclude=['tests', 'benchmarks']),
     setup_requires=['pytest-runner'],
-    python_requires='>=3'
+    extras_require={
+        # for simulating many machines at once with easier68k.simulator.lockstep
+        'lockstep': ['numpy']
+    },
+    python_requires='>=3.7'
 )
 
 print('done')
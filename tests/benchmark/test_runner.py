@@ -0,0 +1,44 @@
+from benchmarks import workloads
+from benchmarks.runner import benchmark_simulator, benchmark_assembler, benchmark_construction, compare
+
+
+def test_workloads():
+    for workload in [workloads.alu_workload(50), workloads.trap_output_workload(5), workloads.lea_workload(50)]:
+        result = benchmark_simulator(workload, min_seconds=0)
+        assert result['instructions'] == workload.instructions
+        assert result['instructions_per_second'] > 0
+
+    # the same programs are generated every time
+    assert workloads.alu_workload(50).source == workloads.alu_workload(50).source
+
+    result = benchmark_assembler(100)
+    assert result['lines'] >= 100
+    assert result['lines_per_second'] > 0
+    assert benchmark_assembler(100, single_pass=True)['lines'] == result['lines']
+
+    assert benchmark_construction(2) > 0
+
+
+def test_compare():
+    baseline = {
+        'simulator': {'alu': {'instructions_per_second': 1000}, 'lea': {'instructions_per_second': 1000}},
+        'assembler': {'1000': {'lines_per_second': 100}},
+        'construction_seconds': 0.01,
+        'peak_rss_kib': None,
+    }
+    results = {
+        'simulator': {'alu': {'instructions_per_second': 950}, 'lea': {'instructions_per_second': 500}},
+        'assembler': {'1000': {'lines_per_second': 200}, '10000': {'lines_per_second': 100}},
+        'construction_seconds': 0.02,
+        'peak_rss_kib': 1000,
+    }
+
+    comparisons = {comparison['name']: comparison for comparison in compare(results, baseline, tolerance=0.1)}
+    assert set(comparisons) == {'simulator.alu.instructions_per_second', 'simulator.lea.instructions_per_second',
+                                'assembler.1000.lines_per_second', 'construction_seconds'}
+
+    assert not comparisons['simulator.alu.instructions_per_second']['regression']
+    assert comparisons['simulator.lea.instructions_per_second']['regression']
+    assert comparisons['assembler.1000.lines_per_second']['change'] == 1.0
+    # taking longer to construct is worse
+    assert comparisons['construction_seconds']['regression']
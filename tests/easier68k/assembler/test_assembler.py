@@ -1,7 +1,7 @@
 import pytest
 import json
 from easier68k.core.models.list_file import ListFile
-from easier68k.assembler.assembler import parse
+from easier68k.assembler.assembler import parse, parse_single_pass
 
 
 def test_basic_test_input():
@@ -28,3 +28,68 @@ def test_basic_test_input():
         assert assembled.data['1042'] == 'ffffffff'
         assert assembled.data['1046'] == 'abcd'
         assert not issues
+
+
+def test_single_pass():
+    with open('easier68k/assembler/basic_test_input.x68') as x68:
+        text = x68.read(-1)
+
+    assembled, issues = parse_single_pass(text)
+    assert not issues
+    assert assembled == parse(text)[0]
+
+
+def test_single_pass_forward_labels():
+    # labels used before they're defined are filled in at the end
+    text = """start   EQU $1000
+        ORG start
+        LEA last, A0
+        MOVE.W later, D1
+        SIMHALT
+later   DC.W $ABCD
+last    DC.W $1234
+        END start
+"""
+    assembled, issues = parse_single_pass(text)
+    assert not issues
+    assert assembled == parse(text)[0]
+    assert assembled.data['4096'] == '41f900001012'
+    assert assembled.symbols == {'later': 0x1010, 'last': 0x1012}
+
+
+def test_single_pass_label_prefix():
+    # a label that starts with the name of another label
+    text = """        ORG $1000
+        LEA str10, A0
+        SIMHALT
+str1    DC.W $1111
+str10   DC.W $2222
+        END $1000
+"""
+    assembled, issues = parse_single_pass(text)
+    assert not issues
+    assert assembled.data['4096'] == '41f90000100c'
+
+
+def test_single_pass_forward_equates():
+    # equates have to come first
+    assembled, issues = parse_single_pass('        ORG $1000\n        LEA value, A0\nvalue   EQU $2000\n')
+    assert issues == [('Equate value is used before it is defined', 'ERROR')]
+    assert not assembled.data
+
+
+def test_single_pass_forward_immediate():
+    # the size of an immediate can't be known until the equate is defined
+    assembled, issues = parse_single_pass('        ORG $1000\n        MOVE.B #value, D0\nvalue   EQU 5\n')
+    assert issues == [('Symbol value is used before it is defined', 'ERROR')]
+    assert not assembled.data
+
+
+def test_single_pass_forward_org():
+    # the location has to be known when the ORG is reached
+    text = """        ORG later
+        SIMHALT
+later   DC.W $1234
+"""
+    assembled, issues = parse_single_pass(text)
+    assert issues == [('Symbol later is used before it is defined', 'ERROR')]
@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+import pytest
+
+from easier68k.core.opcodes import registry
+from easier68k.core.opcodes.registry import opcode_classes, register_opcode, find_opcode_cls, \
+    get_opcode_dispatch_table, load_opcodes
+from easier68k.core.opcodes.opcode import Opcode
+from easier68k.core.opcodes.move import Move
+from easier68k.core.opcodes.opcode_or import Or
+from easier68k.core.opcodes.dc import DC
+from easier68k.core.opcodes.trap import Trap
+from easier68k.core.util import find_module
+
+
+def test_find_opcode_cls():
+    assert find_opcode_cls('MOVE.B') is Move
+    assert find_opcode_cls('MOVE') is Move
+    assert find_opcode_cls('OR.L') is Or
+    assert find_opcode_cls('DC.B') is DC
+    assert find_opcode_cls('TRAP') is Trap
+
+    # the opcode still has to accept the whole command
+    assert find_opcode_cls('TRAP.W') is None
+    assert find_opcode_cls('MOV') is None
+    assert find_opcode_cls('ORI.B') is None
+
+    assert find_module.find_opcode_cls is find_opcode_cls
+    assert 'easier68k.core.opcodes.move.Move' in find_module.valid_opcode_classes
+    assert 'MOVE' in find_module.valid_opcodes
+
+
+def test_register_opcode():
+    @register_opcode('nop')
+    class Nop(Opcode):
+        @classmethod
+        def command_matches(cls, command: str) -> bool:
+            return command.strip().upper() == 'NOP'
+
+    try:
+        assert opcode_classes['NOP'] is Nop
+        assert find_opcode_cls('NOP') is Nop
+
+        # a mnemonic can only belong to one class
+        with pytest.raises(ValueError):
+            @register_opcode('NOP')
+            class Other(Opcode):
+                pass
+    finally:
+        del opcode_classes['NOP']
+
+
+def test_load_opcodes_finds_modules(tmpdir, monkeypatch):
+    # a new module in the package is loaded without being listed anywhere
+    tmpdir.join('nop.py').write(
+        'from easier68k.core.opcodes.registry import register_opcode\n'
+        'from easier68k.core.opcodes.opcode import Opcode\n'
+        '@register_opcode(\'NOP\')\n'
+        'class Nop(Opcode):\n'
+        '    pass\n')
+    package = sys.modules['easier68k.core.opcodes']
+    monkeypatch.setattr(package, '__path__', package.__path__ + [tmpdir.strpath])
+    monkeypatch.setattr(registry, '_loaded', False)
+
+    try:
+        load_opcodes()
+        assert opcode_classes['NOP'].__module__ == 'easier68k.core.opcodes.nop'
+    finally:
+        opcode_classes.pop('NOP', None)
+        sys.modules.pop('easier68k.core.opcodes.nop', None)
+        package.__dict__.pop('nop', None)
+
+
+def test_get_opcode_dispatch_table():
+    table = get_opcode_dispatch_table()
+    assert table is get_opcode_dispatch_table()
+    assert table is find_module.opcode_dispatch_table
+    # MOVE.B D0, D1
+    assert table[0x1200] is Move
+
+
+def test_opcodes_load_lazily():
+    # has to be a new interpreter, the tests have already loaded every opcode
+    script = """
+import sys
+from easier68k.simulator.m68k import M68K
+from easier68k.assembler import assembler
+loaded = [name for name in sys.modules if name.startswith('easier68k.core.opcodes.')]
+assert loaded == ['easier68k.core.opcodes.registry'], loaded
+assert 'asyncio' not in sys.modules
+
+from easier68k.core.opcodes.registry import find_opcode_cls
+assert find_opcode_cls('LEA').__name__ == 'Lea'
+assert 'easier68k.core.opcodes.move' in sys.modules
+"""
+    root = os.path.join(os.path.dirname(__file__), '..', '..', '..', '..')
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(root))
+    result = subprocess.run([sys.executable, '-c', script], env=env, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 0, result.stderr
@@ -5,6 +5,9 @@ from easier68k.core.enum.register import Register
 from easier68k.core.enum.trap_task import TrapTask
 import easier68k.core.util.input as inp
 from easier68k.core.enum.trap_vector import TrapVectors
+from easier68k.simulator.input_provider import QueueInputProvider, EndOfInputError
+from easier68k.simulator.output_sink import CaptureSink
+import pytest
 
 def test_disassemble_instruction():
     val = 0b0100111001001111.to_bytes(2, byteorder='big', signed=False)
@@ -36,7 +39,8 @@ def test_display_null_term_string(capsys):
 
     exec.execute(sim)
 
-    # check that the previous command returned this
+    # check that the previous command returned this, the output is buffered until it is flushed
+    sim.output.flush()
     captured = capsys.readouterr()
     assert captured.out == 'ABC'
 
@@ -61,7 +65,8 @@ def test_display_test_increment_pc(capsys):
 
     assert sim.get_program_counter_value() == 0x1000 + 2
 
-    # check that the previous command returned this
+    # check that the previous command returned this, the output is buffered until it is flushed
+    sim.output.flush()
     captured = capsys.readouterr()
     assert captured.out == 'ABC'
 
@@ -82,7 +87,8 @@ def test_display_null_term_string_crlf(capsys):
 
     exec.execute(sim)
 
-    # check that the previous command returned this
+    # check that the previous command returned this, the output is buffered until it is flushed
+    sim.output.flush()
     captured = capsys.readouterr()
     assert captured.out == 'ABC\n'
 
@@ -96,7 +102,8 @@ def test_display_signed_number(capsys):
 
     exec.execute(sim)
 
-    # check that the previous command returned this
+    # check that the previous command returned this, the output is buffered until it is flushed
+    sim.output.flush()
     captured = capsys.readouterr()
     assert captured.out == '123'
 
@@ -116,7 +123,8 @@ def test_display_signed_number_negative(capsys):
 
     exec.execute(sim)
 
-    # check that the previous command returned this
+    # check that the previous command returned this, the output is buffered until it is flushed
+    sim.output.flush()
     captured = capsys.readouterr()
     assert captured.out == '-123'
 
@@ -131,7 +139,8 @@ def test_display_single_character(capsys):
 
     exec.execute(sim)
 
-    # check that the previous command returned this
+    # check that the previous command returned this, the output is buffered until it is flushed
+    sim.output.flush()
     captured = capsys.readouterr()
     assert captured.out == 'a'
 
@@ -145,3 +154,63 @@ def test_read_null_term_string(capsys):
     exec = Trap(TrapVectors.IO)
     exec.use_debug_input = True
     exec.debug_input = 'test123!'
+
+    exec.execute(sim)
+
+    assert sim.memory.read_string(0x1000) == b'test123!'
+    assert sim.get_register_word(Register.D1) == 8
+
+
+def test_read_number_from_keyboard():
+    sim = M68K(input=QueueInputProvider(['123', '-2', 'abc']))
+    sim.set_register_value(Register.D0, TrapTask.ReadNumberFromKeyboard)
+
+    exec = Trap(TrapVectors.IO)
+
+    exec.execute(sim)
+    assert sim.get_register_value(Register.D1) == 123
+
+    exec.execute(sim)
+    assert sim.get_register_value(Register.D1) == 0xFFFFFFFE
+
+    # not a number
+    exec.execute(sim)
+    assert sim.get_register_value(Register.D1) == 0
+
+
+def test_display_string_and_read_number(capsys):
+    output = CaptureSink()
+    sim = M68K(output=output, input=QueueInputProvider(['42']))
+
+    sim.memory.set(4, 0x1000, bytearray([
+        0x4E, 0x3F, 0x20, 0x00
+    ]))
+
+    sim.set_register_value(Register.A1, 0x1000)
+    sim.set_register_value(Register.D0, TrapTask.DisplayNullTermStringAndReadNumberFromKeyboard)
+
+    exec = Trap(TrapVectors.IO)
+
+    exec.execute(sim)
+
+    assert output.getvalue() == 'N? '
+    assert sim.get_register_value(Register.D1) == 42
+    assert capsys.readouterr().out == ''
+
+
+def test_read_single_character():
+    sim = M68K(input=QueueInputProvider(['xyz', '']))
+    sim.set_register_value(Register.D1, 0x12345678)
+    sim.set_register_value(Register.D0, TrapTask.ReadSingleCharacterFromKeyboard)
+
+    exec = Trap(TrapVectors.IO)
+
+    exec.execute(sim)
+    assert sim.get_register_value(Register.D1) == 0x12345678 & 0xFFFFFF00 | ord('x')
+
+    # pressing enter
+    exec.execute(sim)
+    assert sim.get_register_byte(Register.D1) == ord('\r')
+
+    with pytest.raises(EndOfInputError):
+        exec.execute(sim)
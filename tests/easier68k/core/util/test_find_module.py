@@ -0,0 +1,66 @@
+"""
+Tests for the opcode lookup helpers
+"""
+
+from easier68k.core.util.find_module import opcode_dispatch_table, build_opcode_dispatch_table
+from easier68k.core.opcodes.move import Move
+from easier68k.core.opcodes.add import Add
+from easier68k.core.opcodes.opcode_or import Or
+from easier68k.core.opcodes.lea import Lea
+from easier68k.core.opcodes.trap import Trap
+from easier68k.core.opcodes.simhalt import Simhalt
+
+
+def test_dispatch_table_size():
+    """
+    The table must have an entry for every possible first word
+    :return:
+    """
+    assert len(opcode_dispatch_table) == 0x10000
+
+
+def test_dispatch_table_entries():
+    """
+    Test that the table finds the right opcode for some known instructions
+    :return:
+    """
+    # MOVE.W #$ABCD, ($00AAAAAA).L
+    assert opcode_dispatch_table[0x33FC] is Move
+    # MOVE.B D1, D7
+    assert opcode_dispatch_table[0x1E01] is Move
+    # MOVE.L (A4), (A7)
+    assert opcode_dispatch_table[0x2E94] is Move
+    # ADD.B D1, D7
+    assert opcode_dispatch_table[0xD307] is Add
+    # OR.B #0, D1
+    assert opcode_dispatch_table[0x823C] is Or
+    # LEA ($0416).L, A0
+    assert opcode_dispatch_table[0x41F9] is Lea
+    # TRAP #15
+    assert opcode_dispatch_table[0x4E4F] is Trap
+    # SIMHALT
+    assert opcode_dispatch_table[0xFFFF] is Simhalt
+
+    # not implemented opcodes
+    assert opcode_dispatch_table[0x5E01] is None
+    assert opcode_dispatch_table[0x0280] is None
+
+
+def test_dispatch_table_matches_disassembly():
+    """
+    Every opcode in the table should be able to disassemble the words mapped to it,
+    and no other opcode should
+    :return:
+    """
+    classes = [Move, Add, Or, Lea, Trap]
+    table = build_opcode_dispatch_table()
+
+    # D0 -> D1 style operands don't need any extension words
+    for word in [0x1200, 0x3200, 0xD200, 0xD240, 0x8200, 0x8240, 0x43D0, 0x4E4F]:
+        data = word.to_bytes(2, 'big') + bytes(8)
+        for cls in classes:
+            op = cls.disassemble_instruction(data)
+            if cls is table[word]:
+                assert op is not None
+            else:
+                assert op is None
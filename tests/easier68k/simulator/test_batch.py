@@ -0,0 +1,130 @@
+import json
+import types
+
+from easier68k.simulator import batch
+from easier68k.simulator.batch import run_program, run_batch, HALT_REASON_HALTED, \
+    HALT_REASON_INSTRUCTION_BUDGET, HALT_REASON_TIMEOUT, HALT_REASON_UNKNOWN_INSTRUCTION, HALT_REASON_ERROR
+
+'''
+start       EQU $400
+            ORG start
+            LEA msg, A1
+            MOVE.B #14, D0
+            TRAP #15
+            MOVE.L #$1234, D2
+            SIMHALT
+msg         DC.B $48, $69, $00
+            END start
+'''
+PROGRAM = {
+    "data": {
+        "1024": "43f900000416",
+        "1030": "103c000e",
+        "1034": "4e4f",
+        "1036": "243c00001234",
+        "1042": "ffffffff",
+        "1046": "486900"
+    },
+    "startingExecutionAddress": 1024,
+    "symbols": {"msg": 1046}
+}
+
+
+def _write(tmpdir, name, program) -> str:
+    path = tmpdir.join(name)
+    path.write(json.dumps(program))
+    return path.strpath
+
+
+def test_run_program(tmpdir):
+    path = _write(tmpdir, 'program.json', PROGRAM)
+
+    result = run_program(path)
+    assert result['halt_reason'] == HALT_REASON_HALTED
+    assert result['output'] == 'Hi'
+    assert result['registers']['D2'] == 0x1234
+    assert result['registers']['PC'] == 1046
+    assert result['instructions'] == 5
+
+    # the result has to be able to be written as json
+    assert json.loads(json.dumps(result)) == result
+
+
+def test_run_program_limits(tmpdir):
+    path = _write(tmpdir, 'program.json', PROGRAM)
+
+    assert run_program(path, instruction_budget=0)['halt_reason'] == HALT_REASON_INSTRUCTION_BUDGET
+    assert run_program(path, timeout=-1)['halt_reason'] == HALT_REASON_TIMEOUT
+
+    unknown = _write(tmpdir, 'unknown.json', {"data": {"1024": "5e01"}, "startingExecutionAddress": 1024, "symbols": {}})
+    assert run_program(unknown)['halt_reason'] == HALT_REASON_UNKNOWN_INSTRUCTION
+
+    result = run_program(tmpdir.join('missing.json').strpath)
+    assert result['halt_reason'] == HALT_REASON_ERROR
+    assert 'FileNotFoundError' in result['error']
+
+
+def test_run_batch(tmpdir):
+    paths = [_write(tmpdir, 'program{}.json'.format(i), PROGRAM) for i in range(4)]
+
+    results = list(run_batch(paths, workers=2))
+    assert [result['file'] for result in results] == paths
+    assert all(result['halt_reason'] == HALT_REASON_HALTED for result in results)
+    assert all(result['output'] == 'Hi' for result in results)
+
+
+def test_run_program_input(tmpdir):
+    '''
+    start       EQU $400
+                ORG start
+                MOVE.B #4, D0
+                TRAP #15
+                SIMHALT
+                END start
+    '''
+    path = _write(tmpdir, 'read.json', {"data": {"1024": "103c00044e4fffffffff"},
+                                        "startingExecutionAddress": 1024, "symbols": {}})
+
+    result = run_program(path, input_lines=['1234'])
+    assert result['halt_reason'] == HALT_REASON_HALTED
+    assert result['registers']['D1'] == 1234
+
+    # running out of input doesn't wait on the terminal
+    result = run_program(path)
+    assert result['halt_reason'] == HALT_REASON_ERROR
+    assert 'EndOfInputError' in result['error']
+
+
+def _s_record(record_type: str, address: int, data: bytes) -> str:
+    record = bytes([len(data) + 3]) + address.to_bytes(2, 'big') + data
+    return '{}{}{:02X}'.format(record_type, record.hex().upper(), ~sum(record) & 0xFF)
+
+
+def test_run_program_s_records(tmpdir):
+    lines = [_s_record('S1', int(location), bytes.fromhex(data)) for location, data in PROGRAM['data'].items()]
+    lines.append(_s_record('S9', PROGRAM['startingExecutionAddress'], b''))
+    path = tmpdir.join('program.s68')
+    path.write('\n'.join(lines) + '\n')
+
+    result = run_program(path.strpath)
+    assert result['halt_reason'] == HALT_REASON_HALTED
+    assert result['output'] == 'Hi'
+    assert result['instructions'] == 5
+
+
+def test_run_program_limits_inside_blocks(tmpdir, monkeypatch):
+    path = _write(tmpdir, 'program.json', PROGRAM)
+
+    # the budget is exact, even in the middle of a block
+    result = run_program(path, instruction_budget=2)
+    assert result['halt_reason'] == HALT_REASON_INSTRUCTION_BUDGET
+    assert result['instructions'] == 2
+    assert result['registers']['PC'] == 1034
+
+    # a clock that moves on a second every time it is looked at
+    seconds = iter(range(100))
+    monkeypatch.setattr(batch, 'time', types.SimpleNamespace(monotonic=lambda: next(seconds)))
+    monkeypatch.setattr(batch, 'TIMEOUT_CHECK_INSTRUCTIONS', 2)
+    result = run_program(path, timeout=1.5)
+    assert result['halt_reason'] == HALT_REASON_TIMEOUT
+    assert result['instructions'] == 2
@@ -0,0 +1,173 @@
+from easier68k.simulator.m68k import M68K
+from easier68k.simulator.memory import Memory
+from easier68k.core.enum.register import Register
+from easier68k.core.models.list_file import ListFile
+from easier68k.assembler.assembler import parse
+
+'''
+    ORG    1024
+START:
+    MOVE.W #$0001, D0
+    ADD.W  D0, D1
+    MOVE.W D1, ($00AAAAAA).L
+    SIMHALT
+    END    START
+'''
+PROGRAM = """
+{
+    "data": {
+        "1024": "303c0001d24033c100aaaaaa",
+        "1036": "ffffffff"
+    },
+    "startingExecutionAddress": 1024,
+    "symbols": {}
+}
+"""
+
+
+def _load() -> M68K:
+    m68k = M68K()
+    list_file = ListFile()
+    list_file.load_from_json(PROGRAM)
+    m68k.load_list_file(list_file)
+    return m68k
+
+
+def _restart(m68k: M68K):
+    m68k.set_program_counter_value(1024)
+    m68k.halted = False
+    m68k.clock_auto_cycle = True
+
+
+def test_run_blocks():
+    m68k = _load()
+
+    m68k.run()
+
+    assert m68k.halted
+    assert m68k.get_program_counter_value() == 1040
+    assert m68k.get_register_value(Register.D1) == 1
+    assert m68k.memory.get(Memory.Word, 0x00aaaaaa) == bytearray.fromhex('0001')
+
+    # the whole program is a single block
+    assert list(m68k.block_translator.blocks.entries.keys()) == [1024]
+
+    # running it again uses the translated block
+    _restart(m68k)
+    m68k.run()
+
+    assert m68k.block_translator.blocks.hits == 1
+    assert m68k.get_program_counter_value() == 1040
+    assert m68k.get_register_value(Register.D1) == 2
+    assert m68k.memory.get(Memory.Word, 0x00aaaaaa) == bytearray.fromhex('0002')
+
+
+def test_run_blocks_matches_stepping():
+    stepped = _load()
+    stepped.translate_blocks = False
+    stepped.run()
+
+    translated = _load()
+    translated.run()
+
+    for reg in Register:
+        assert stepped.get_register_value(reg) == translated.get_register_value(reg)
+
+
+def test_block_invalidated_by_write():
+    m68k = _load()
+    m68k.run()
+
+    # change the immediate value of the first MOVE
+    m68k.memory.set(Memory.Word, 1026, bytearray.fromhex('0005'))
+    assert not m68k.block_translator.blocks.entries
+
+    _restart(m68k)
+    m68k.run()
+
+    assert m68k.get_register_value(Register.D1) == 6
+
+
+def test_block_patches_itself():
+    # the first MOVE writes D3 over the immediate value of the second one
+    list_file, issues = parse('        ORG $1000\n'
+                              '        MOVE.W D3, ($00001008).L\n'
+                              '        MOVE.B #1, D2\n'
+                              '        SIMHALT\n'
+                              '        END $1000\n')
+    assert not issues
+    m68k = M68K()
+    m68k.load_list_file(list_file)
+    m68k.set_register_value(Register.D3, 1)
+    m68k.run()
+    assert m68k.get_register_value(Register.D2) == 1
+    assert list(m68k.block_translator.blocks.entries.keys()) == [0x1000]
+
+    # the translated block has to stop once it has written over itself
+    m68k.set_register_value(Register.D3, 5)
+    m68k.set_program_counter_value(0x1000)
+    m68k.halted = False
+    m68k.clock_auto_cycle = True
+    m68k.run()
+    assert m68k.get_register_value(Register.D2) == 5
+    assert m68k.get_program_counter_value() == 0x100e
+
+
+'''
+    ORG    $1000
+START:
+    MOVE.L #$FFFFFFF0, D0
+    MOVE.W D0, D1
+    ADD.B  #$20, D1
+    OR.W   D1, D2
+    ADD.L  D0, D2
+    LEA    DATA, A0
+    ADD.B  D0, D3
+    MOVE.W D3, (A0)
+    ADD.B  #$10, D3
+    SIMHALT
+
+    ORG    $1100
+DATA:
+    DC.W   0
+    END    START
+'''
+FOLDED_PROGRAM = """
+{
+    "data": {
+        "4096": "203cfffffff03200d23c00208441d48041f900001100d6003083d63c0010ffffffff",
+        "4352": "0000"
+    },
+    "startingExecutionAddress": 4096,
+    "symbols": {}
+}
+"""
+
+
+def test_folded_block_matches_stepping():
+    list_file = ListFile()
+    list_file.load_from_json(FOLDED_PROGRAM)
+
+    stepped = M68K()
+    stepped.load_list_file(list_file)
+    stepped.translate_blocks = False
+    stepped.run()
+
+    # the first run builds the block by executing each instruction, the second runs the compiled block
+    translated = M68K()
+    translated.load_list_file(list_file)
+    translated.run()
+    for reg in [Register.D0, Register.D1, Register.D2, Register.D3, Register.A0, Register.CCR]:
+        translated.set_register_value(reg, 0)
+    translated.memory.set(Memory.Word, 0x1100, bytearray(2))
+    translated.set_program_counter_value(0x1000)
+    translated.halted = False
+    translated.clock_auto_cycle = True
+    translated.run()
+    assert translated.block_translator.blocks.hits == 1
+
+    for reg in Register:
+        assert stepped.get_register_value(reg) == translated.get_register_value(reg), reg
+    assert translated.get_register_value(Register.CCR) == 0x15
+    assert translated.get_cycles() == 2 * stepped.get_cycles()
+    assert translated.memory.get(Memory.Word, 0x1100) == stepped.memory.get(Memory.Word, 0x1100)
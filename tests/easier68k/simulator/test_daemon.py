@@ -0,0 +1,196 @@
+import asyncio
+import json
+import pytest
+
+from easier68k.simulator.daemon import SimulationServer, DaemonClient, DaemonError, METHOD_NOT_FOUND, \
+    INVALID_PARAMS, PARSE_ERROR, TOO_MANY_SNAPSHOTS, MAX_SNAPSHOTS
+from easier68k.simulator.m68k import DEFAULT_SLICE
+
+'''
+start       EQU $400
+            ORG start
+            MOVE.B #4, D0
+            TRAP #15
+            MOVE.B #3, D0
+            TRAP #15
+            SIMHALT
+            END start
+'''
+PROGRAM = {
+    "data": {
+        "1024": "103c00044e4f103c00034e4fffffffff"
+    },
+    "startingExecutionAddress": 1024,
+    "symbols": {}
+}
+
+
+def _request(method: str, request_id: int = 1, **params) -> dict:
+    return {'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}
+
+
+def test_sessions():
+    server = SimulationServer()
+
+    async def call(method: str, **params):
+        response = await server.handle_request(_request(method, **params))
+        assert 'error' not in response, response
+        return response['result']
+
+    async def run():
+        first = await call('create_session')
+        second = await call('create_session')
+        assert await call('list_sessions') == [first, second]
+
+        await call('load_list_file', session=first, list_file=PROGRAM)
+        await call('load_list_file', session=second, list_file=json.dumps(PROGRAM))
+        assert await call('read_memory', session=first, location=1024, length=4) == '103c0004'
+
+        # stepping, then restoring to before it
+        snapshot = await call('snapshot', session=first)
+        status = await call('step', session=first)
+        assert status['pc'] == 1028 and not status['halted']
+        assert (await call('get_registers', session=first))['D0'] == 4
+        status = await call('restore', session=first, snapshot=snapshot)
+        assert status['pc'] == 1024
+
+        # running waits for input, which can be sent while it waits
+        running = asyncio.ensure_future(call('run', session=first))
+        await asyncio.sleep(0)
+        assert not running.done()
+        await call('send_input', session=first, line='-5')
+        status = await running
+        assert status['halted']
+        assert await call('read_output', session=first) == '-5'
+        assert await call('read_output', session=first) == ''
+
+        # the other session is untouched
+        assert (await call('get_registers', session=second))['PC'] == 1024
+
+        await call('set_register', session=second, register='D1', value=3)
+        await call('write_memory', session=second, location=1024, data='4e71')
+        assert await call('read_memory', session=second, location=1024, length=2) == '4e71'
+
+        assert await call('close_session', session=second)
+        assert await call('list_sessions') == [first]
+
+    asyncio.run(run())
+
+
+def test_snapshots():
+    server = SimulationServer()
+
+    async def call(method: str, **params):
+        return await server.handle_request(_request(method, **params))
+
+    async def run():
+        session = (await call('create_session'))['result']
+        snapshots = [(await call('snapshot', session=session))['result'] for _ in range(MAX_SNAPSHOTS)]
+        assert (await call('snapshot', session=session))['error']['code'] == TOO_MANY_SNAPSHOTS
+
+        # dropping one makes room for another
+        assert (await call('drop_snapshot', session=session, snapshot=snapshots[0]))['result']
+        assert (await call('restore', session=session, snapshot=snapshots[0]))['error']['code'] == INVALID_PARAMS
+        assert (await call('drop_snapshot', session=session, snapshot=snapshots[0]))['error']['code'] == INVALID_PARAMS
+        assert 'result' in await call('snapshot', session=session)
+
+    asyncio.run(run())
+
+
+def test_step_lets_other_tasks_run():
+    server = SimulationServer()
+
+    async def call(method: str, **params):
+        return (await server.handle_request(_request(method, **params)))['result']
+
+    async def run():
+        session = await call('create_session')
+        # MOVE.B #4, D0 over and over
+        count = 3 * DEFAULT_SLICE
+        await call('write_memory', session=session, location=1024, data='103c0004' * count)
+        await call('set_register', session=session, register='PC', value=1024)
+
+        stepping = asyncio.ensure_future(call('step', session=session, count=count))
+        others = 0
+        while not stepping.done():
+            others += 1
+            await asyncio.sleep(0)
+        assert (await stepping)['pc'] == 1024 + 4 * count
+        assert others >= 3
+
+    asyncio.run(run())
+
+
+def test_errors():
+    server = SimulationServer()
+
+    async def error(request: dict) -> int:
+        response = await server.handle_request(request)
+        return response['error']['code']
+
+    async def run():
+        assert await error(_request('missing')) == METHOD_NOT_FOUND
+        assert await error(_request('step', session='1')) == INVALID_PARAMS
+        assert await error(_request('create_session', bad=1)) == INVALID_PARAMS
+
+        session = (await server.handle_request(_request('create_session')))['result']
+        assert await error(_request('set_register', session=session, register='X9', value=0)) == INVALID_PARAMS
+        assert await error(_request('read_memory', session=session, location=0xFFFFFF, length=2)) == INVALID_PARAMS
+
+        # notifications don't get a response
+        assert await server.handle_request({'jsonrpc': '2.0', 'method': 'list_sessions'}) is None
+
+    asyncio.run(run())
+
+
+def test_socket(tmpdir):
+    path = tmpdir.join('daemon.sock').strpath
+    server = SimulationServer()
+
+    def use_client():
+        client = DaemonClient(path)
+        try:
+            session = client.call('create_session')
+            client.call('load_list_file', session=session, list_file=PROGRAM)
+            client.call('send_input', session=session, line='12')
+            status = client.call('run', session=session)
+            output = client.call('read_output', session=session)
+            try:
+                client.call('missing')
+            except DaemonError as error:
+                code = error.code
+            return status, output, code
+        finally:
+            client.close()
+
+    async def run():
+        await server.start(path)
+        try:
+            status, output, code = await asyncio.get_event_loop().run_in_executor(None, use_client)
+            assert status['halted']
+            assert output == '12'
+            assert code == METHOD_NOT_FOUND
+
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b'not json\n')
+            response = json.loads(await reader.readline())
+            assert response['error']['code'] == PARSE_ERROR
+            writer.close()
+        finally:
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_socket_path_not_a_socket(tmpdir):
+    path = tmpdir.join('notes.txt').strpath
+    with open(path, 'w') as out:
+        out.write('keep me')
+
+    async def run():
+        with pytest.raises(FileExistsError):
+            await SimulationServer().start(path)
+
+    asyncio.run(run())
+    with open(path) as in_file:
+        assert in_file.read() == 'keep me'
@@ -0,0 +1,81 @@
+import io
+import pytest
+
+from easier68k.simulator.m68k import M68K
+from easier68k.simulator.memory import Memory
+from easier68k.simulator.paged_memory import PagedMemory
+from easier68k.simulator.dump_format import InvalidDumpError
+from easier68k.core.enum.register import Register
+from easier68k.core.models.list_file import ListFile
+
+
+def _load() -> M68K:
+    m68k = M68K()
+    list_file = ListFile()
+    list_file.load_from_json("""
+    {
+        "data": {
+            "1024": "33fcabcd00aaaaaa",
+            "1032": "ffffffff",
+            "1036": "abcd"
+        },
+        "startingExecutionAddress": 1024,
+        "symbols": {}
+    }
+        """)
+    m68k.load_list_file(list_file)
+    return m68k
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_dump_round_trip(compress):
+    m68k = _load()
+    m68k.run()
+    m68k.set_register_value(Register.D3, 0xDEADBEEF)
+
+    dump = io.BytesIO()
+    m68k.save_dump(dump, compress)
+
+    # a few runs of memory instead of 16 MiB
+    assert len(dump.getvalue()) < 200
+
+    for memory in [Memory(), PagedMemory()]:
+        loaded = M68K(memory=memory)
+        loaded.memory.set(Memory.Long, 0x2000, b'\x01\x02\x03\x04')
+        loaded.load_dump(io.BytesIO(dump.getvalue()))
+
+        for register in Register:
+            assert loaded.get_register_value(register) == m68k.get_register_value(register)
+        assert loaded.get_program_counter_value() == 1036
+
+        saved = io.BytesIO()
+        loaded.save_memory(saved)
+        original = io.BytesIO()
+        m68k.save_memory(original)
+        assert saved.getvalue() == original.getvalue()
+
+
+def test_invalid_dump():
+    m68k = M68K()
+    with pytest.raises(InvalidDumpError):
+        m68k.load_dump(io.BytesIO(b'not a dump at all'))
+    with pytest.raises(InvalidDumpError):
+        m68k.load_dump(io.BytesIO(b'E68D'))
+
+    dump = io.BytesIO()
+    _load().save_dump(dump, compress=False)
+    with pytest.raises(InvalidDumpError):
+        m68k.load_dump(io.BytesIO(dump.getvalue()[:-2]))
+
+
+def test_invalid_dump_leaves_memory():
+    m68k = M68K()
+    m68k.memory.set(Memory.Long, 0x2000, b'\x01\x02\x03\x04')
+
+    # a dump of a 4 KiB memory with a run past the end of it
+    body = bytes([0]) + (0xf00).to_bytes(4, 'big') + (0x200).to_bytes(4, 'big') + bytes(0x200)
+    dump = b'E68D' + bytes([1, 0]) + (0x1000).to_bytes(4, 'big') + body
+    with pytest.raises(InvalidDumpError):
+        m68k.load_dump(io.BytesIO(dump))
+
+    assert m68k.memory.get(Memory.Long, 0x2000) == b'\x01\x02\x03\x04'
@@ -0,0 +1,68 @@
+import io
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from easier68k.simulator.input_provider import InputProvider, ConsoleInputProvider, QueueInputProvider, \
+    AsyncQueueInputProvider, FileInputProvider, EndOfInputError
+
+
+def test_queue_input_provider():
+    provider = QueueInputProvider(['first'])
+    provider.add('second')
+    provider.add('')
+
+    assert provider.read_line() == 'first'
+    assert provider.read_char() == 's'
+    assert provider.read_char() == '\r'
+    with pytest.raises(EndOfInputError):
+        provider.read_line()
+
+
+def test_async_queue_input_provider():
+    # made and added to outside of the event loop that waits on it
+    provider = AsyncQueueInputProvider()
+    provider.add('first')
+    assert provider.read_line() == 'first'
+
+    async def wait():
+        waiting = asyncio.ensure_future(provider.wait_for_input())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+
+        provider.add('second')
+        await asyncio.wait_for(waiting, 1)
+
+    asyncio.run(wait())
+    assert provider.read_line() == 'second'
+
+
+def test_file_input_provider(tmpdir):
+    path = tmpdir.join('input.txt')
+    path.write('12\r\nhello\n')
+
+    provider = FileInputProvider(path.strpath)
+    assert provider.read_line() == '12'
+    assert provider.read_line() == 'hello'
+    with pytest.raises(EndOfInputError):
+        provider.read_line()
+    provider.close()
+
+    # pipes and other open files are read from but not closed
+    stream = io.StringIO('piped\n')
+    provider = FileInputProvider(stream)
+    assert provider.read_line() == 'piped'
+    provider.close()
+    assert not stream.closed
+
+
+def test_console_input_provider():
+    with patch('easier68k.simulator.input_provider.get_input', return_value='typed'):
+        assert ConsoleInputProvider().read_line() == 'typed'
+
+    with patch('easier68k.simulator.input_provider.get_input', side_effect=EOFError):
+        with pytest.raises(EndOfInputError):
+            ConsoleInputProvider().read_line()
+
+    with pytest.raises(EndOfInputError):
+        InputProvider().read_line()
@@ -0,0 +1,38 @@
+from easier68k.simulator.instruction_cache import InstructionCache
+
+
+def test_get_put():
+    cache = InstructionCache()
+
+    assert cache.get(0x1000) is None
+    assert cache.misses == 1
+
+    cache.put(0x1000, 'op')
+    assert cache.get(0x1000) == 'op'
+    assert cache.hits == 1
+
+
+def test_invalidate():
+    cache = InstructionCache()
+
+    cache.put(0x1000, 'a', 8)
+    cache.put(0x1008, 'b', 2)
+    cache.put(0x2000, 'c', 10)
+
+    # writes that don't overlap don't change anything
+    cache.invalidate(0x0FFE, 2)
+    cache.invalidate(0x100A, 4)
+    assert len(cache.entries) == 3
+
+    # write into the end of the first entry
+    cache.invalidate(0x1007, 1)
+    assert 0x1000 not in cache.entries
+    assert 0x1008 in cache.entries
+
+    # a large write drops everything inside of it
+    cache.invalidate(0, 0x1000000)
+    assert not cache.entries
+
+    cache.put(0x1000, 'a')
+    cache.clear()
+    assert cache.get(0x1000) is None
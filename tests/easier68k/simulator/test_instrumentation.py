@@ -0,0 +1,149 @@
+import pytest
+
+from easier68k.simulator.m68k import M68K
+from easier68k.simulator.output_sink import CaptureSink
+from easier68k.simulator.instrumentation import Instrumentation
+from easier68k.core.models.list_file import ListFile
+from easier68k.core.opcodes.move import Move
+from easier68k.core.opcodes.trap import Trap
+
+'''
+start       EQU $400
+            ORG start
+            LEA msg, A1
+            MOVE.B #14, D0
+            TRAP #15
+            MOVE.L #$1234, D2
+            SIMHALT
+msg         DC.B $48, $69, $00
+            END start
+'''
+PROGRAM = """
+{
+    "data": {
+        "1024": "43f90000041a103c000e4e4f243c00001234ffffffff",
+        "1050": "486900"
+    },
+    "startingExecutionAddress": 1024,
+    "symbols": {}
+}
+"""
+
+
+def _load() -> M68K:
+    m68k = M68K(output=CaptureSink())
+    list_file = ListFile()
+    list_file.load_from_json(PROGRAM)
+    m68k.load_list_file(list_file)
+    return m68k
+
+
+def test_instrumentation():
+    execute = Move.__dict__['execute']
+    fold_execute = Move.__dict__['fold_execute']
+    disassemble_instruction = Trap.__dict__['disassemble_instruction']
+
+    m68k = _load()
+    assert m68k.get_instrumentation_report() == {}
+
+    # compile the blocks first, they have to be dropped for the timing to be seen
+    start = m68k.snapshot()
+    m68k.run()
+    m68k.restore(start)
+
+    instrumentation = m68k.enable_instrumentation()
+    assert Move.__dict__['execute'] is not execute
+    try:
+        m68k.run()
+        report = m68k.get_instrumentation_report()
+    finally:
+        assert m68k.disable_instrumentation() is instrumentation
+
+    assert report['Move']['execute_count'] == 2
+    assert report['Lea']['execute_count'] == 1
+    assert report['Simhalt']['execute_count'] == 1
+    assert report['Move']['execute_ns'] > 0
+    assert report['Add']['execute_count'] == 0
+    # the instructions were already decoded and cached
+    assert report['Trap']['decode_count'] == 0
+
+    # the original methods are back
+    assert Move.__dict__['execute'] is execute
+    assert Move.__dict__['fold_execute'] is fold_execute
+    assert Trap.__dict__['disassemble_instruction'] is disassemble_instruction
+    assert m68k.instrumentation is None
+
+
+def test_instrumentation_compiled_blocks():
+    m68k = _load()
+    m68k.enable_instrumentation()
+    try:
+        m68k.run()
+
+        # the second run uses the blocks compiled while timing, which don't fold the LEA and MOVEs
+        m68k.set_program_counter_value(1024)
+        m68k.halted = False
+        m68k.clock_auto_cycle = True
+        m68k.run()
+        assert m68k.block_translator.blocks.hits == 2
+
+        report = m68k.get_instrumentation_report()
+    finally:
+        m68k.disable_instrumentation()
+
+    assert report['Lea']['execute_count'] == 2
+    assert report['Move']['execute_count'] == 4
+
+
+def test_instrumentation_decode():
+    instrumentation = Instrumentation()
+    instrumentation.enable()
+    try:
+        # only one can be enabled at a time
+        with pytest.raises(RuntimeError):
+            Instrumentation().enable()
+
+        m68k = _load()
+        m68k.run()
+    finally:
+        instrumentation.disable()
+
+    report = instrumentation.report()
+    assert report['Move']['decode_count'] == 2
+    assert report['Trap']['decode_count'] == 1
+    assert report['Trap']['execute_count'] == 1
+
+    instrumentation.clear()
+    assert instrumentation.report()['Move'] == {'execute_count': 0, 'execute_ns': 0,
+                                                'decode_count': 0, 'decode_ns': 0}
+
+
+def test_instrumentation_shared():
+    execute = Move.__dict__['execute']
+
+    first = _load()
+    second = _load()
+    start = first.snapshot()
+
+    # both have compiled blocks before the timing is enabled
+    first.run()
+    second.run()
+    first.restore(start)
+    second.restore(start)
+
+    instrumentation = first.enable_instrumentation()
+    try:
+        assert second.enable_instrumentation() is instrumentation
+
+        # the blocks of the other simulator were dropped too, so its instructions are timed
+        second.run()
+        assert first.get_instrumentation_report()['Move']['execute_count'] == 2
+
+        # still enabled while the other simulator is using it
+        first.disable_instrumentation()
+        assert Move.__dict__['execute'] is not execute
+    finally:
+        first.disable_instrumentation()
+        second.disable_instrumentation()
+
+    assert Move.__dict__['execute'] is execute
@@ -0,0 +1,140 @@
+import pytest
+
+from easier68k.simulator.m68k import M68K
+from easier68k.simulator.memory import Memory
+from easier68k.core.enum.register import Register
+from easier68k.core.enum.condition_status_code import ConditionStatusCode
+from easier68k.core.models.list_file import ListFile
+from easier68k.simulator.input_provider import QueueInputProvider, AsyncQueueInputProvider, InputNotReadyError
+from easier68k.assembler.assembler import parse
+
+'''
+    ORG    1024
+START:
+    MOVE.W #$0001, D0
+    ADD.W  D0, D1
+    MOVE.W D1, ($00AAAAAA).L
+    SIMHALT
+    END    START
+'''
+PROGRAM = """
+{
+    "data": {
+        "1024": "303c0001d24033c100aaaaaa",
+        "1036": "ffffffff"
+    },
+    "startingExecutionAddress": 1024,
+    "symbols": {}
+}
+"""
+
+
+def _load() -> M68K:
+    m68k = M68K()
+    list_file = ListFile()
+    list_file.load_from_json(PROGRAM)
+    m68k.load_list_file(list_file)
+    return m68k
+
+
+def test_step_back():
+    m68k = _load()
+    m68k.set_register_value(Register.D1, 0xFFFF)
+    m68k.memory.set(Memory.Word, 0x00AAAAAA, b'\x12\x34')
+    m68k.enable_journal()
+
+    m68k.run()
+    assert m68k.halted
+    assert len(m68k.journal) == 4
+    assert m68k.get_register_value(Register.D1) == 0
+    assert m68k.get_condition_status_code(ConditionStatusCode.Z)
+    assert m68k.memory.get(Memory.Word, 0x00AAAAAA) == b'\x00\x00'
+
+    # undo SIMHALT and the MOVE to memory
+    assert m68k.step_back(2) == 2
+    assert not m68k.halted
+    assert m68k.get_program_counter_value() == 1030
+    assert m68k.memory.get(Memory.Word, 0x00AAAAAA) == b'\x12\x34'
+    assert m68k.get_register_value(Register.D1) == 0
+
+    # undo the ADD
+    assert m68k.step_back() == 1
+    assert m68k.get_program_counter_value() == 1028
+    assert m68k.get_register_value(Register.D1) == 0xFFFF
+    assert not m68k.get_condition_status_code(ConditionStatusCode.Z)
+
+    # can't go back further than the start
+    assert m68k.step_back(10) == 1
+    assert m68k.get_program_counter_value() == 1024
+    assert m68k.get_register_value(Register.D0) == 0
+
+    # running again ends up in the same place, even though the memory was cached
+    m68k.run()
+    assert m68k.halted
+    assert m68k.get_register_value(Register.D1) == 0
+    assert m68k.memory.get(Memory.Word, 0x00AAAAAA) == b'\x00\x00'
+
+
+def test_journal_limit():
+    m68k = _load()
+    m68k.enable_journal(max_bytes=1)
+
+    m68k.run()
+
+    # only the latest instruction is kept
+    assert len(m68k.journal) == 1
+    assert m68k.step_back(4) == 1
+    assert m68k.get_program_counter_value() == 1036
+
+    m68k.disable_journal()
+    assert m68k.journal is None
+    assert m68k.step_back() == 0
+
+
+def test_step_back_unaligned_write():
+    # TRAP #15 task 2 reads a string into memory at A1, which can be any address and length
+    list_file, issues = parse('        ORG $1000\n        MOVE.B #2, D0\n        TRAP #15\n        SIMHALT\n'
+                              '        END $1000\n')
+    assert not issues
+    m68k = M68K(input=QueueInputProvider(['hello']))
+    m68k.load_list_file(list_file)
+    m68k.set_register_value(Register.A1, 0x3001)
+    m68k.enable_journal()
+
+    m68k.step_instruction()
+    m68k.step_instruction()
+    assert m68k.memory.read_bytes(0x3001, 5) == b'hello'
+
+    assert m68k.step_back() == 1
+    assert m68k.memory.read_bytes(0x3000, 8) == bytes(8)
+
+
+def test_step_back_long_write():
+    m68k = _load()
+    m68k.memory.write_bytes(0x3000, bytes(range(256)) * 2)
+    m68k.enable_journal()
+
+    m68k.journal.begin(m68k)
+    m68k.memory.write_bytes(0x3001, b'\xff' * 301)
+    m68k.journal.end(m68k)
+
+    assert m68k.step_back() == 1
+    assert m68k.memory.read_bytes(0x3000, 512) == bytes(range(256)) * 2
+
+
+def test_step_back_waiting_for_input():
+    list_file, issues = parse('        ORG $1000\n        MOVE.B #4, D0\n        TRAP #15\n        SIMHALT\n'
+                              '        END $1000\n')
+    assert not issues
+    m68k = M68K(input=AsyncQueueInputProvider())
+    m68k.load_list_file(list_file)
+    m68k.enable_journal()
+
+    m68k.step_instruction()
+    # the TRAP doesn't run without its input, so there is nothing to step back over
+    with pytest.raises(InputNotReadyError):
+        m68k.step_instruction()
+    assert len(m68k.journal) == 1
+
+    assert m68k.step_back() == 1
+    assert m68k.get_program_counter_value() == 0x1000
@@ -0,0 +1,136 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from easier68k.simulator.lockstep import LockstepM68K
+from easier68k.simulator.m68k import M68K
+from easier68k.simulator.memory import Memory
+from easier68k.simulator.input_provider import QueueInputProvider
+from easier68k.simulator.output_sink import CaptureSink
+from easier68k.core.enum.register import Register
+from easier68k.core.models.list_file import ListFile
+
+'''
+start       EQU $400
+            ORG start
+            MOVE.W D1, D2
+            ADD.W  D0, D2
+            OR.B   #$10, D2
+            LEA    data, A0
+            MOVE.W D2, (A0)+
+            ADD.W  D1, (A0)
+            LEA    msg, A1
+            MOVE.B #14, D0
+            TRAP   #15
+            SIMHALT
+data        DC.W   $1234, $5678
+msg         DC.B   $48, $69, $00
+            END start
+'''
+PROGRAM = """
+{
+    "data": {
+        "1024": "3401d440843c001041f90000042230c2d35043f900000426103c000e4e4fffffffff",
+        "1058": "12345678",
+        "1062": "486900"
+    },
+    "startingExecutionAddress": 1024,
+    "symbols": {}
+}
+"""
+
+
+def _list_file() -> ListFile:
+    list_file = ListFile()
+    list_file.load_from_json(PROGRAM)
+    return list_file
+
+
+def test_lockstep_matches_m68k():
+    inputs = [(0, 0), (1, 2), (0xFFFF, 1), (0x1234, 0x8000), (0x7FFF, 0x7FFF), (0xFFFFFF00, 0x00FF)]
+
+    lockstep = LockstepM68K(len(inputs))
+    lockstep.load_list_file(_list_file())
+    lockstep.set_register_values(Register.D0, [d0 for d0, d1 in inputs])
+    lockstep.set_register_values(Register.D1, [d1 for d0, d1 in inputs])
+    lockstep.run()
+
+    assert lockstep.halted.all()
+    assert not lockstep.faults
+
+    for lane, (d0, d1) in enumerate(inputs):
+        m68k = M68K()
+        m68k.load_list_file(_list_file())
+        m68k.set_register_value(Register.D0, d0)
+        m68k.set_register_value(Register.D1, d1)
+        m68k.run()
+
+        for register in Register:
+            assert lockstep.registers[lane, register] == m68k.get_register_value(register), register
+        for location in [1058, 1060]:
+            assert lockstep.get_memory_values(Memory.Word, location)[lane] == \
+                int.from_bytes(m68k.memory.get(Memory.Word, location), 'big')
+        assert lockstep.get_output(lane) == 'Hi'
+
+
+def test_lockstep_faults():
+    lockstep = LockstepM68K(3)
+    lockstep.load_list_file(_list_file())
+
+    # makes the first lane's MOVE.W D2, (A0)+ write out of bounds
+    lockstep.memory[0, 1034:1038] = [0x00, 0xFF, 0xFF, 0xFE]
+
+    # and the second lane reach an unknown instruction instead of the TRAP
+    lockstep.memory[1, 1052:1054] = [0x5E, 0x01]
+
+    lockstep.run()
+
+    assert lockstep.halted.all()
+    assert lockstep.faults[0] == 'OutOfBoundsMemoryError'
+    assert lockstep.faults[1] == 'Unknown instruction'
+    assert 2 not in lockstep.faults
+    assert lockstep.get_register_values(Register.PC)[2] == 1058
+    assert lockstep.get_output(2) == 'Hi'
+
+
+'''
+start       EQU $400
+            ORG start
+            MOVE.B #4, D0
+            TRAP   #15
+            ADD.W  D1, D1
+            MOVE.B #3, D0
+            TRAP   #15
+            SIMHALT
+            END start
+'''
+READ_PROGRAM = """
+{
+    "data": {
+        "1024": "103c00044e4fd241103c00034e4fffffffff"
+    },
+    "startingExecutionAddress": 1024,
+    "symbols": {}
+}
+"""
+
+
+def test_lockstep_input():
+    list_file = ListFile()
+    list_file.load_from_json(READ_PROGRAM)
+
+    m68k = M68K(input=QueueInputProvider(['21']), output=CaptureSink())
+    m68k.load_list_file(list_file)
+    m68k.run()
+    assert m68k.output.getvalue() == '42'
+
+    # lanes have no input, so instead of going on without it they fault at the read
+    lockstep = LockstepM68K(2)
+    lockstep.load_list_file(list_file)
+    lockstep.run()
+
+    assert lockstep.halted.all()
+    assert lockstep.faults == {0: 'Unsupported TRAP task ReadNumberFromKeyboard',
+                               1: 'Unsupported TRAP task ReadNumberFromKeyboard'}
+    assert list(lockstep.get_register_values(Register.PC)) == [1028, 1028]
+    assert lockstep.get_output(0) == ''
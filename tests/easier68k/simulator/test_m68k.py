@@ -1,9 +1,14 @@
+import asyncio
 import pytest
 
 from easier68k.simulator.m68k import M68K
 from easier68k.core.enum.register import Register, MEMORY_LIMITED_ADDRESS_REGISTERS, DATA_REGISTERS
 from easier68k.core.models.list_file import ListFile
 from easier68k.simulator.memory import Memory
+from easier68k.simulator.paged_memory import PagedMemory
+from easier68k.simulator.output_sink import CaptureSink
+from easier68k.simulator.input_provider import AsyncQueueInputProvider, EndOfInputError
+from easier68k.assembler.assembler import parse
 
 def test_address_registers():
     """
@@ -234,3 +239,235 @@ def test_auto_execute():
     assert m68k.halted
 
 
+def test_instruction_cache():
+    m68k = M68K()
+
+    list_file = ListFile()
+
+    list_file.load_from_json("""
+    {
+        "data": {
+            "1024": "33fcabcd00aaaaaa",
+            "1032": "ffffffff"
+        },
+        "startingExecutionAddress": 1024,
+        "symbols": {}
+    }
+        """)
+
+    m68k.load_list_file(list_file)
+
+    m68k.step_instruction()
+    assert m68k.get_instruction_cache_misses() == 1
+    assert m68k.get_instruction_cache_hits() == 0
+
+    # running the same instruction again uses the cached opcode
+    m68k.set_program_counter_value(1024)
+    m68k.step_instruction()
+    assert m68k.get_instruction_cache_hits() == 1
+    assert m68k.memory.get(Memory.Word, 0x00aaaaaa) == bytearray.fromhex('abcd')
+
+    # change the immediate value, the cached opcode must not be used
+    m68k.memory.set(Memory.Word, 1026, bytearray.fromhex('1234'))
+    m68k.set_program_counter_value(1024)
+    m68k.step_instruction()
+    assert m68k.get_instruction_cache_misses() == 2
+    assert m68k.memory.get(Memory.Word, 0x00aaaaaa) == bytearray.fromhex('1234')
+
+
+def test_register_accessors():
+    a = M68K()
+
+    a.set_register_value(Register.D3, 0x12345678)
+
+    # sized accessors
+    assert a.get_register_long(Register.D3) == 0x12345678
+    assert a.get_register_word(Register.D3) == 0x5678
+    assert a.get_register_byte(Register.D3) == 0x78
+
+    # plain indices work the same as the enum
+    assert a.get_register_long(3) == 0x12345678
+
+    # get_register still gives the big endian bytes
+    assert a.get_register(Register.D3) == bytearray.fromhex('12345678')
+    a.set_register_value(Register.CCR, 0x1F)
+    assert a.get_register(Register.CCR) == bytearray.fromhex('1f')
+
+
+def test_lazy_condition_codes():
+    from easier68k.core.opcodes.add import Add
+    from easier68k.core.opcodes.opcode_or import Or
+    from easier68k.core.models.assembly_parameter import AssemblyParameter
+    from easier68k.core.enum.ea_mode import EAMode
+    from easier68k.core.enum.op_size import OpSize
+    from easier68k.core.enum.condition_status_code import ConditionStatusCode
+
+    ops = [
+        Add([AssemblyParameter(EAMode.IMM, 0xFF), AssemblyParameter(EAMode.DRD, 0)], OpSize.BYTE),
+        Add([AssemblyParameter(EAMode.IMM, 0x01), AssemblyParameter(EAMode.DRD, 0)], OpSize.BYTE),
+        Or([AssemblyParameter(EAMode.IMM, 0x00), AssemblyParameter(EAMode.DRD, 1)], OpSize.WORD),
+        Add([AssemblyParameter(EAMode.IMM, 0x7FFF), AssemblyParameter(EAMode.DRD, 2)], OpSize.WORD),
+    ]
+
+    eager = M68K()
+    lazy = M68K()
+    lazy.lazy_condition_codes = True
+
+    for op in ops:
+        op.execute(eager)
+        op.execute(lazy)
+
+        # nothing has been worked out yet
+        assert lazy._pending_condition_codes is not None
+
+        for code in [ConditionStatusCode.X, ConditionStatusCode.N, ConditionStatusCode.Z,
+                     ConditionStatusCode.V, ConditionStatusCode.C]:
+            assert eager.get_condition_status_code(code) == lazy.get_condition_status_code(code)
+        assert eager.get_register_value(Register.CCR) == lazy.get_register_value(Register.CCR)
+
+    # writing the CCR replaces the recorded result
+    ops[0].execute(lazy)
+    lazy.set_register_value(Register.CCR, 0)
+    assert lazy.get_register_value(Register.CCR) == 0
+
+
+@pytest.mark.parametrize('memory_cls', [Memory, PagedMemory])
+def test_snapshot_restore(memory_cls):
+    m68k = M68K(memory=memory_cls())
+
+    list_file = ListFile()
+    list_file.load_from_json("""
+    {
+        "data": {
+            "1024": "33fcabcd00aaaaaa",
+            "1032": "ffffffff",
+            "1036": "abcd"
+        },
+        "startingExecutionAddress": 1024,
+        "symbols": {
+            "magic": 1036
+        }
+    }
+        """)
+
+    m68k.load_list_file(list_file)
+    m68k.set_register_value(Register.D3, 123)
+    snapshot = m68k.snapshot()
+
+    # reset to the snapshot a few times, running the program each time
+    for _ in range(3):
+        m68k.run()
+        assert m68k.halted
+        assert m68k.get_program_counter_value() == 1036
+        assert m68k.memory.get(Memory.Word, 0x00aaaaaa) == bytearray.fromhex('abcd')
+        m68k.set_register_value(Register.D3, 0)
+
+        m68k.restore(snapshot)
+        assert not m68k.halted
+        assert m68k.get_program_counter_value() == 1024
+        assert m68k.get_register_value(Register.D3) == 123
+        assert m68k.memory.get(Memory.Word, 0x00aaaaaa) == bytearray.fromhex('0000')
+
+    # changing the program after the snapshot is undone too
+    m68k.memory.set(Memory.Word, 1024, bytearray.fromhex('ffff'))
+    m68k.restore(snapshot)
+    m68k.run()
+    assert m68k.memory.get(Memory.Word, 0x00aaaaaa) == bytearray.fromhex('abcd')
+
+
+def test_run_async():
+    """
+    Runs simulators on one event loop, with one of them waiting for input
+    """
+    '''
+    start       EQU $400
+                ORG start
+                MOVE.B #4, D0
+                TRAP #15
+                MOVE.B #3, D0
+                TRAP #15
+                SIMHALT
+                END start
+    '''
+    program = """
+    {
+        "data": {
+            "1024": "103c00044e4f103c00034e4fffffffff"
+        },
+        "startingExecutionAddress": 1024,
+        "symbols": {}
+    }
+    """
+
+    def load(input) -> M68K:
+        sim = M68K(output=CaptureSink(), input=input)
+        list_file = ListFile()
+        list_file.load_from_json(program)
+        sim.load_list_file(list_file)
+        return sim
+
+    async def run():
+        waiting = load(AsyncQueueInputProvider())
+        ready = load(AsyncQueueInputProvider(['7']))
+
+        waiting_task = asyncio.ensure_future(waiting.run_async(slice=1))
+        ready_task = asyncio.ensure_future(ready.run_async(slice=1))
+
+        # the first slice of each only runs the MOVE
+        await asyncio.sleep(0)
+        assert waiting.get_program_counter_value() == 1028
+        assert ready.get_program_counter_value() == 1028
+
+        # one of them finishes while the other waits for its input
+        await ready_task
+        assert ready.halted
+        assert ready.output.getvalue() == '7'
+        assert not waiting.halted
+        assert waiting.get_program_counter_value() == 1028
+
+        waiting.input.add('-12')
+        await waiting_task
+        assert waiting.halted
+        assert waiting.output.getvalue() == '-12'
+
+        # running out of input once it is closed
+        closed = load(AsyncQueueInputProvider())
+        closed.input.close()
+        with pytest.raises(EndOfInputError):
+            await closed.run_async()
+
+    asyncio.run(run())
+
+
+def test_run_async_counts_blocks():
+    """
+    Counts the instructions in a block that ran before its TRAP had to wait for input
+    """
+    list_file, issues = parse('        ORG $400\n'
+                              '        MOVE.B #1, D1\n'
+                              '        MOVE.B #2, D2\n'
+                              '        MOVE.B #4, D0\n'
+                              '        TRAP #15\n'
+                              '        SIMHALT\n'
+                              '        END $400\n')
+    assert not issues
+
+    async def run():
+        sim = M68K(output=CaptureSink(), input=AsyncQueueInputProvider())
+        sim.load_list_file(list_file)
+        start = sim.snapshot()
+
+        # with the input already there, the whole program is translated while it runs
+        sim.input.add('3')
+        assert await sim.run_async(slice=100) == 5
+
+        sim.restore(start)
+        task = asyncio.ensure_future(sim.run_async(slice=100))
+        await asyncio.sleep(0)
+        assert sim.get_program_counter_value() == 0x40c
+        sim.input.add('4')
+        assert await task == 5
+        assert sim.block_translator.blocks.hits >= 1
+        assert sim.get_register_value(Register.D1) == 4
+
+    asyncio.run(run())
@@ -0,0 +1,87 @@
+import mmap
+from easier68k.simulator.m68k import M68K
+from easier68k.simulator.memory import Memory
+from easier68k.simulator.mapped_memory import MappedMemory
+
+
+def test_mapped_memory_save(tmpdir):
+    path = tmpdir.join('image.raw').strpath
+
+    memory = MappedMemory(path)
+    assert len(memory) == 16777216
+    assert memory.get(Memory.Long, 0x1000) == b'\x00\x00\x00\x00'
+
+    memory.set(Memory.Long, 0x1000, b'\x01\x23\x45\x67')
+    memory.set(Memory.Word, 0x100000, b'\x89\xAB')
+    assert memory.unsaved_pages == {0x1, 0x100}
+
+    memory.save()
+    assert not memory.unsaved_pages
+    memory.close()
+
+    # the image is a raw memory dump, the same as save_memory writes
+    flat = Memory()
+    flat.load_memory(open(path, 'rb'))
+    assert flat.get(Memory.Long, 0x1000) == b'\x01\x23\x45\x67'
+    assert flat.get(Memory.Word, 0x100000) == b'\x89\xAB'
+
+    reopened = MappedMemory(path)
+    assert reopened.get(Memory.Long, 0x1000) == b'\x01\x23\x45\x67'
+    reopened.close()
+
+
+def test_mapped_memory_m68k(tmpdir):
+    path = tmpdir.join('image.raw').strpath
+
+    # an image saved by a normal Memory can be opened directly
+    flat = Memory()
+    flat.set(Memory.Long, 1024, bytearray.fromhex('33fcabcd'))
+    flat.set(Memory.Long, 1028, bytearray.fromhex('00aaaaaa'))
+    flat.set(Memory.Long, 1032, bytearray.fromhex('ffffffff'))
+    flat.save_memory(open(path, 'wb'))
+
+    m68k = M68K(memory=MappedMemory(path))
+    m68k.set_program_counter_value(1024)
+    snapshot = m68k.snapshot()
+    m68k.run()
+    assert m68k.halted
+    assert m68k.memory.get(Memory.Word, 0x00aaaaaa) == b'\xAB\xCD'
+
+    m68k.restore(snapshot)
+    assert m68k.memory.get(Memory.Word, 0x00aaaaaa) == b'\x00\x00'
+    m68k.memory.close()
+
+
+def test_mapped_memory_empty_file(tmpdir):
+    path = tmpdir.join('image.raw').strpath
+    open(path, 'wb').close()
+
+    memory = MappedMemory(path)
+    assert len(memory) == 16777216
+    memory.close()
+
+
+def test_mapped_memory_resize(tmpdir):
+    path = tmpdir.join('image.raw').strpath
+
+    memory = MappedMemory(path, size=0x2000)
+    snapshot = memory.snapshot()
+
+    # pages added by loading a larger image are saved too
+    flat = Memory()
+    flat.set(Memory.Long, 0x100000, b'\x01\x23\x45\x67')
+    flat.save_memory(open(tmpdir.join('flat.raw').strpath, 'wb'))
+    memory.load_memory(open(tmpdir.join('flat.raw').strpath, 'rb'))
+    assert 0x100 in memory.unsaved_pages
+
+    # restoring a snapshot of a different size keeps the memory mapped to the image
+    memory.restore(snapshot)
+    assert len(memory) == 0x2000
+    assert isinstance(memory.memory, mmap.mmap)
+    memory.set(Memory.Long, 0x1000, b'\x89\xAB\xCD\xEF')
+    memory.close()
+
+    reopened = MappedMemory(path)
+    assert len(reopened) == 0x2000
+    assert reopened.get(Memory.Long, 0x1000) == b'\x89\xAB\xCD\xEF'
+    reopened.close()
@@ -67,3 +67,101 @@ def test_memory_save_load(tmpdir):
     assert load_test.get(Memory.Long, 0x00) == b'\xFF\x00\xBE\xEF'
     assert load_test.get(Memory.Long, 0x001000) == b'\x01\x23\x00\x00'
     assert load_test.get(Memory.Long, 0x100000) == b'\x45\x67\x89\xAB'
+
+
+def test_memory_write_listener():
+    memory = Memory()
+    writes = []
+
+    def listener(location, size):
+        # called before the write happens, so the old value is still there
+        writes.append((location, size, bytes(memory.get(size, location))))
+
+    memory.add_write_listener(listener)
+    memory.set(Memory.Word, 0x1000, b'\xAB\xCD')
+    memory.set(Memory.Word, 0x1000, b'\x12\x34')
+
+    assert writes == [(0x1000, 2, b'\x00\x00'), (0x1000, 2, b'\xAB\xCD')]
+
+    memory.remove_write_listener(listener)
+    memory.set(Memory.Byte, 0x1000, b'\xFF')
+    assert len(writes) == 2
+
+
+def test_memory_write_bytes():
+    memory = Memory()
+    writes = []
+    memory.add_write_listener(lambda location, size: writes.append((location, size)))
+
+    # doesn't need to be aligned, and is one write
+    memory.write_bytes(0x1001, b'\x01\x02\x03\x04\x05')
+    assert writes == [(0x1001, 5)]
+    assert memory.get(Memory.Long, 0x1000) == b'\x00\x01\x02\x03'
+    assert memory.get(Memory.Long, 0x1004) == b'\x04\x05\x00\x00'
+
+    with pytest.raises(OutOfBoundsMemoryError):
+        memory.write_bytes(0xFFFFFE, b'\x00\x00\x00')
+    with pytest.raises(OutOfBoundsMemoryError):
+        memory.write_bytes(-1, b'\x00')
+    assert len(writes) == 1
+
+
+def test_memory_load_s_records():
+    memory = Memory()
+    with open('easier68k/core/models/test.S68') as in_file:
+        assert memory.load_s_records(in_file) == 0x1000
+
+    assert memory.get(Memory.Long, 0x1000) == b'\x78\x00\x7A\x00'
+    assert memory.get(Memory.Long, 0x3000) == b'\x00\x00\x00\x01'
+    assert memory.get(Memory.Word, 0x1070) == b'\xFF\xFF'
+
+
+def test_memory_typed_accessors():
+    memory = Memory()
+
+    memory.write_u32(0x1000, 0x89ABCDEF)
+    assert memory.get(Memory.Long, 0x1000) == b'\x89\xAB\xCD\xEF'
+    assert memory.read_u32(0x1000) == 0x89ABCDEF
+    assert memory.read_s32(0x1000) == 0x89ABCDEF - (1 << 32)
+    assert memory.read_u16(0x1002) == 0xCDEF
+    assert memory.read_s16(0x1002) == 0xCDEF - (1 << 16)
+    assert memory.read_u8(0x1001) == 0xAB
+    assert memory.read_s8(0x1001) == 0xAB - (1 << 8)
+    assert memory.read_uint(Memory.Word, 0x1000) == 0x89AB
+
+    memory.write_s16(0x1000, -2)
+    memory.write_s8(0x1002, -1)
+    memory.write_u8(0x1003, 0x12)
+    assert memory.read_u32(0x1000) == 0xFFFEFF12
+    memory.write_s32(0x1000, -1)
+    assert memory.read_u32(0x1000) == 0xFFFFFFFF
+    memory.write_u16(0x1000, 0x1234)
+    memory.write_uint(Memory.Word, 0x1002, 0x5678)
+    assert memory.read_u32(0x1000) == 0x12345678
+
+    with pytest.raises(UnalignedMemoryAccessError):
+        memory.read_u16(0x1001)
+    with pytest.raises(OutOfBoundsMemoryError):
+        memory.write_u32(0x1000000, 0)
+    with pytest.raises(OverflowError):
+        memory.write_u8(0x1000, 0x100)
+
+    # the location is not checked when trusted
+    memory.trusted = True
+    memory.write_u16(0x1001, 0xABCD)
+    assert memory.read_u16(0x1001) == 0xABCD
+
+
+def test_memory_read_string():
+    memory = Memory()
+    memory.write_bytes(0x1000, b'Hello\x00World')
+
+    assert memory.read_string(0x1000) == b'Hello'
+    assert memory.read_string(0x1006) == b'World'
+    assert memory.read_string(0x1005) == b''
+
+    memory.write_bytes(0xFFFFFE, b'AB')
+    with pytest.raises(OutOfBoundsMemoryError):
+        memory.read_string(0xFFFFFE)
+    with pytest.raises(OutOfBoundsMemoryError):
+        memory.read_string(0x1000000)
@@ -0,0 +1,110 @@
+import io
+
+from easier68k.simulator.m68k import M68K
+from easier68k.simulator.output_sink import StdoutSink, CaptureSink, FileSink
+from easier68k.core.enum.register import Register
+from easier68k.core.enum.trap_task import TrapTask
+from easier68k.core.enum.trap_vector import TrapVectors
+from easier68k.core.opcodes.trap import Trap
+from easier68k.core.models.list_file import ListFile
+
+'''
+start       EQU $400
+            ORG start
+            LEA msg, A1
+            MOVE.B #13, D0
+            TRAP #15
+            SIMHALT
+msg         DC.B $48, $69, $00
+            END start
+'''
+PROGRAM = """
+{
+    "data": {
+        "1024": "43f900000412103c000d4e4fffffffff",
+        "1042": "486900"
+    },
+    "startingExecutionAddress": 1024,
+    "symbols": {}
+}
+"""
+
+
+def _load(output) -> M68K:
+    m68k = M68K(output=output)
+    list_file = ListFile()
+    list_file.load_from_json(PROGRAM)
+    m68k.load_list_file(list_file)
+    return m68k
+
+
+def test_capture_sink(capsys):
+    output = CaptureSink()
+    m68k = _load(output)
+    m68k.run()
+
+    assert m68k.halted
+    assert output.getvalue() == 'Hi\n'
+    assert capsys.readouterr().out == ''
+
+    output.clear()
+    assert output.getvalue() == ''
+
+
+def test_buffered_stdout_sink():
+    stream = io.StringIO()
+    output = StdoutSink(stream, buffer_size=1024)
+    m68k = _load(output)
+
+    # nothing is written until the simulator stops
+    m68k.clock_auto_cycle = False
+    for _ in range(3):
+        m68k.step_instruction()
+    assert stream.getvalue() == ''
+
+    m68k.run()
+    assert stream.getvalue() == 'Hi\n'
+
+
+def test_stdout_sink_default_buffer():
+    stream = io.StringIO()
+    output = StdoutSink(stream)
+
+    output.write('H')
+    output.write('i')
+    assert stream.getvalue() == ''
+
+    output.flush()
+    assert stream.getvalue() == 'Hi'
+
+
+def test_stdout_sink_flushed_on_halt():
+    stream = io.StringIO()
+    m68k = _load(StdoutSink(stream))
+
+    # stepping up to the SIMHALT, without run flushing at the end
+    m68k.clock_auto_cycle = False
+    for _ in range(3):
+        m68k.step_instruction()
+    assert stream.getvalue() == ''
+
+    m68k.step_instruction()
+    assert m68k.halted
+    assert stream.getvalue() == 'Hi\n'
+
+
+def test_file_sink(tmpdir):
+    path = tmpdir.join('output.txt').strpath
+    output = FileSink(path)
+    sim = M68K(output=output)
+
+    sim.set_register_value(Register.D1, 0xFFFFFFFE)
+    sim.set_register_value(Register.D0, TrapTask.DisplaySignedNumber)
+    Trap(TrapVectors.IO).execute(sim)
+    sim.set_register_value(Register.D1, ord('!'))
+    sim.set_register_value(Register.D0, TrapTask.DisplaySingleCharacter)
+    Trap(TrapVectors.IO).execute(sim)
+    output.close()
+
+    with open(path) as in_file:
+        assert in_file.read() == '-2!'
@@ -0,0 +1,174 @@
+import pytest
+
+from easier68k.simulator.m68k import M68K
+from easier68k.simulator.memory import Memory, UnalignedMemoryAccessError, OutOfBoundsMemoryError
+from easier68k.simulator.paged_memory import PagedMemory, PAGE_SIZE
+from easier68k.core.models.list_file import ListFile
+
+def test_paged_memory_set_get():
+    memory = PagedMemory()
+
+    # should start all zeroed out without allocating anything
+    assert memory.get(Memory.Long, 0x00) == b'\x00\x00\x00\x00'
+    assert memory.get(Memory.Word, 0x100000) == b'\x00\x00'
+    assert memory.get(Memory.Byte, 0xFFFFFF) == b'\x00'
+    assert memory.get_allocated_page_count() == 0
+    assert len(memory) == 16777216
+
+    memory.set(Memory.Byte, 0x00, b'\xFF')
+    memory.set(Memory.Byte, 0x000002, b'\xBE')
+    memory.set(Memory.Byte, 0x000003, b'\xEF')
+    assert memory.get(Memory.Long, 0x00) == b'\xFF\x00\xBE\xEF'
+
+    memory.set(Memory.Long, 0x100000, b'\x45\x67\x89\xAB')
+    assert memory.get(Memory.Long, 0x100000) == b'\x45\x67\x89\xAB'
+    assert memory.get_allocated_page_count() == 2
+
+    # fetching can go across pages
+    memory.set(Memory.Word, PAGE_SIZE - 2, b'\x12\x34')
+    memory.set(Memory.Word, PAGE_SIZE, b'\x56\x78')
+    assert memory.read_bytes(PAGE_SIZE - 2, 4) == b'\x12\x34\x56\x78'
+    assert memory.read_bytes(0xFFFFFE, 10) == b'\x00\x00'
+
+    with pytest.raises(UnalignedMemoryAccessError):
+        memory.get(Memory.Word, 0x000001)
+    with pytest.raises(OutOfBoundsMemoryError):
+        memory.get(Memory.Long, 0xFFFFFF4)
+    with pytest.raises(OutOfBoundsMemoryError):
+        memory.set(Memory.Byte, -1, b'\x00')
+
+
+def test_paged_memory_save_load(tmpdir):
+    memory = PagedMemory()
+    path = tmpdir.join('memoryDump.raw').strpath
+
+    memory.set(Memory.Long, 0x00, b'\xFF\x00\xBE\xEF')
+    memory.set(Memory.Long, 0x100000, b'\x45\x67\x89\xAB')
+    memory.save_memory(open(path, 'wb'))
+
+    # the file is the same as one saved from a Memory
+    flat = Memory()
+    flat.load_memory(open(path, 'rb'))
+    assert flat.get(Memory.Long, 0x00) == b'\xFF\x00\xBE\xEF'
+    assert flat.get(Memory.Long, 0x100000) == b'\x45\x67\x89\xAB'
+    assert len(flat) == len(memory)
+
+    load_test = PagedMemory()
+    load_test.load_memory(open(path, 'rb'))
+    assert load_test.get(Memory.Long, 0x00) == b'\xFF\x00\xBE\xEF'
+    assert load_test.get(Memory.Long, 0x100000) == b'\x45\x67\x89\xAB'
+    assert load_test.get_allocated_page_count() == 2
+
+
+def test_paged_memory_write_listener():
+    memory = PagedMemory()
+    writes = []
+
+    def listener(location, size):
+        writes.append((location, size, bytes(memory.get(size, location))))
+
+    memory.add_write_listener(listener)
+    memory.set(Memory.Word, 0x1000, b'\xAB\xCD')
+    memory.set(Memory.Word, 0x1000, b'\x12\x34')
+
+    assert writes == [(0x1000, 2, b'\x00\x00'), (0x1000, 2, b'\xAB\xCD')]
+
+
+def test_m68k_paged_memory():
+    m68k = M68K(memory=PagedMemory())
+
+    list_file = ListFile()
+    list_file.load_from_json("""
+    {
+        "data": {
+            "1024": "33fcabcd00aaaaaa",
+            "1032": "ffffffff",
+            "1036": "abcd"
+        },
+        "startingExecutionAddress": 1024,
+        "symbols": {
+            "magic": 1036
+        }
+    }
+        """)
+
+    m68k.load_list_file(list_file)
+    m68k.clock_auto_cycle = True
+    m68k.run()
+
+    assert m68k.get_program_counter_value() == 1036
+    assert m68k.halted
+    assert m68k.memory.get(Memory.Word, 0x00aaaaaa) == bytearray.fromhex('abcd')
+    assert m68k.memory.get_allocated_page_count() == 2
+
+
+def test_paged_memory_copy_on_write():
+    memory = PagedMemory()
+    memory.set(Memory.Long, 0x1000, b'\x01\x02\x03\x04')
+    memory.set(Memory.Long, 0x2000, b'\x05\x06\x07\x08')
+
+    snapshot = memory.snapshot()
+    shared_page = memory.pages[1]
+
+    memory.set(Memory.Long, 0x1000, b'\xFF\xFF\xFF\xFF')
+    memory.set(Memory.Long, 0x5000, b'\xAA\xAA\xAA\xAA')
+
+    # the page was copied rather than changed, and the other page is still shared
+    assert shared_page == bytearray(b'\x01\x02\x03\x04') + bytearray(PAGE_SIZE - 4)
+    assert memory.pages[1] is not shared_page
+    assert memory.pages[2] is snapshot[1][2]
+
+    memory.restore(snapshot)
+    assert memory.get(Memory.Long, 0x1000) == b'\x01\x02\x03\x04'
+    assert memory.get(Memory.Long, 0x5000) == b'\x00\x00\x00\x00'
+    assert memory.get_allocated_page_count() == 2
+
+    # writing after restoring must not change the snapshot either
+    memory.set(Memory.Long, 0x1000, b'\xEE\xEE\xEE\xEE')
+    memory.restore(snapshot)
+    assert memory.get(Memory.Long, 0x1000) == b'\x01\x02\x03\x04'
+
+
+def test_paged_memory_write_bytes():
+    memory = PagedMemory()
+
+    # crosses into the next page
+    memory.write_bytes(PAGE_SIZE - 2, b'\x01\x02\x03\x04')
+    assert memory.read_bytes(PAGE_SIZE - 2, 4) == b'\x01\x02\x03\x04'
+    assert memory.get_allocated_page_count() == 2
+
+    with pytest.raises(OutOfBoundsMemoryError):
+        memory.write_bytes(0xFFFFFE, b'\x00\x00\x00')
+
+
+def test_paged_memory_typed_accessors():
+    memory = PagedMemory()
+
+    assert memory.read_u32(0x1000) == 0
+    assert memory.get_allocated_page_count() == 0
+
+    memory.write_u32(0x1000, 0x89ABCDEF)
+    assert memory.get(Memory.Long, 0x1000) == b'\x89\xAB\xCD\xEF'
+    assert memory.read_s16(0x1000) == 0x89AB - (1 << 16)
+    assert memory.read_uint(Memory.Byte, 0x1003) == 0xEF
+
+    # typed writes copy shared pages too
+    snapshot = memory.snapshot()
+    memory.write_u16(0x1000, 0)
+    memory.restore(snapshot)
+    assert memory.read_u32(0x1000) == 0x89ABCDEF
+
+
+def test_paged_memory_read_string():
+    memory = PagedMemory()
+
+    # strings can go across pages, and end at untouched pages
+    memory.write_bytes(PAGE_SIZE - 3, b'abcdef\x00')
+    memory.write_bytes(3 * PAGE_SIZE - 2, b'gh')
+    assert memory.read_string(PAGE_SIZE - 3) == b'abcdef'
+    assert memory.read_string(3 * PAGE_SIZE - 2) == b'gh'
+    assert memory.read_string(0x5000) == b''
+
+    memory.write_bytes(0xFFFFFE, b'AB')
+    with pytest.raises(OutOfBoundsMemoryError):
+        memory.read_string(0xFFFFFE)
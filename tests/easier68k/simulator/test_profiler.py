@@ -0,0 +1,80 @@
+import pytest
+
+from easier68k.simulator.m68k import M68K
+from easier68k.simulator.output_sink import CaptureSink
+from easier68k.core.models.list_file import ListFile
+
+'''
+start       EQU $400
+            ORG start
+            LEA msg, A1
+            MOVE.B #14, D0
+print       TRAP #15
+            MOVE.L #$1234, D2
+            SIMHALT
+msg         DC.B $48, $69, $00
+            END start
+'''
+PROGRAM = """
+{
+    "data": {
+        "1024": "43f90000041a103c000e4e4f243c00001234ffffffff",
+        "1050": "486900"
+    },
+    "startingExecutionAddress": 1024,
+    "symbols": {"start": 1024, "print": 1034, "msg": 1050}
+}
+"""
+
+# LEA abs.L, MOVE.B #imm,Dn, TRAP, MOVE.L #imm,Dn and SIMHALT
+CYCLES = [12, 8, 34, 12, 4]
+
+
+def _load() -> (M68K, ListFile):
+    m68k = M68K(output=CaptureSink())
+    list_file = ListFile()
+    list_file.load_from_json(PROGRAM)
+    m68k.load_list_file(list_file)
+    return m68k, list_file
+
+
+@pytest.mark.parametrize('translate_blocks', [True, False])
+def test_cycles(translate_blocks):
+    m68k, _ = _load()
+    m68k.translate_blocks = translate_blocks
+    m68k.run()
+
+    assert m68k.halted
+    assert m68k.get_cycles() == sum(CYCLES)
+
+
+def test_profiler():
+    m68k, list_file = _load()
+    start = m68k.snapshot()
+    profiler = m68k.enable_profiler()
+    m68k.run()
+
+    assert m68k.get_cycles() == sum(CYCLES)
+    assert profiler.get_count(1024) == 1
+    assert profiler.get_cycles(1034) == 34
+    assert profiler.get_count(1026) == 0
+    assert [location for location, _, _ in profiler.locations()] == [1024, 1030, 1034, 1036, 1042]
+    assert profiler.opcodes['Move'] == [2, 20]
+
+    spots = profiler.hot_spots(list_file.symbols, limit=2)
+    assert [(spot.location, spot.label, spot.cycles) for spot in spots] == [(1034, 'print', 34), (1024, 'start', 12)]
+    assert profiler.hot_spots(list_file.symbols)[-1].label == 'print+8'
+
+    report = profiler.report(list_file.symbols)
+    assert 'print' in report
+    assert 'Trap' in report
+
+    # running again adds to the counts
+    m68k.restore(start)
+    m68k.run()
+    assert profiler.get_count(1024) == 2
+
+    assert m68k.disable_profiler() is profiler
+    assert m68k.profiler is None
+    profiler.clear()
+    assert list(profiler.locations()) == []
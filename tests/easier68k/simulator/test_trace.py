@@ -0,0 +1,95 @@
+import io
+import pytest
+
+from easier68k.simulator.m68k import M68K
+from easier68k.simulator.output_sink import CaptureSink
+from easier68k.simulator.trace import read_trace, InvalidTraceError
+from easier68k.core.enum.register import Register
+from easier68k.core.models.list_file import ListFile
+
+'''
+start       EQU $400
+            ORG start
+            MOVE.W D1, D2
+            ADD.W  D0, D2
+            OR.B   #$10, D2
+            LEA    data, A0
+            MOVE.W D2, (A0)+
+            ADD.W  D1, (A0)
+            LEA    msg, A1
+            MOVE.B #14, D0
+            TRAP   #15
+            SIMHALT
+data        DC.W   $1234, $5678
+msg         DC.B   $48, $69, $00
+            END start
+'''
+PROGRAM = """
+{
+    "data": {
+        "1024": "3401d440843c001041f90000042230c2d35043f900000426103c000e4e4fffffffff",
+        "1058": "12345678",
+        "1062": "486900"
+    },
+    "startingExecutionAddress": 1024,
+    "symbols": {}
+}
+"""
+
+
+def _load() -> M68K:
+    m68k = M68K(output=CaptureSink())
+    list_file = ListFile()
+    list_file.load_from_json(PROGRAM)
+    m68k.load_list_file(list_file)
+    m68k.set_register_value(Register.D0, 1)
+    m68k.set_register_value(Register.D1, 2)
+    return m68k
+
+
+def test_trace_file():
+    file = io.BytesIO()
+    m68k = _load()
+    # a small buffer, so that it is written to the file several times
+    m68k.enable_trace(capacity=4, file=file)
+    m68k.run()
+    m68k.disable_trace()
+    assert m68k.tracer is None
+
+    file.seek(0)
+    entries = list(read_trace(file))
+    assert [entry.pc for entry in entries] == [1024, 1026, 1028, 1032, 1038, 1040, 1042, 1048, 1052, 1054]
+    assert entries[0].opcode_word == 0x3401
+    assert sum(entry.cycles for entry in entries) == m68k.get_cycles()
+
+    # MOVE.W D1, D2
+    assert entries[0].registers[0] == (Register.D2, 0, 2)
+    assert entries[0].registers[1][0] == Register.PC
+
+    # MOVE.W D2, (A0)+ and ADD.W D1, (A0)
+    assert entries[4].writes == [(1058, b'\x00\x13')]
+    assert (Register.A0, 1058, 1060) in entries[4].registers
+    assert entries[5].writes == [(1060, b'\x56\x7a')]
+
+
+def test_trace_ring_buffer():
+    m68k = _load()
+    tracer = m68k.enable_trace(capacity=8)
+    m68k.run()
+
+    file = io.BytesIO()
+    tracer.save(file)
+    file.seek(0)
+    entries = list(read_trace(file))
+
+    # only the latest instructions are kept, starting at the first whole one
+    assert 0 < len(entries) < 10
+    assert entries[-1].pc == 1054
+    assert entries[-1].opcode_word == 0xFFFF
+
+
+def test_read_invalid_trace():
+    with pytest.raises(InvalidTraceError):
+        list(read_trace(io.BytesIO(b'E68')))
+    with pytest.raises(InvalidTraceError):
+        list(read_trace(io.BytesIO(b'NOPE\x01\x0c')))
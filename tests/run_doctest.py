@@ -13,8 +13,10 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # build a list of all modules that contain doctests
 test_modules = [
     'easier68k.core.util.conversions',
+    'easier68k.core.util.condition_codes',
     'easier68k.core.util.parsing',
     'easier68k.core.util.split_bits',
+    'easier68k.core.util.timing',
     'easier68k.assembler.assembler',
     'easier68k.core.opcodes.move',
     'easier68k.core.opcodes.opcode_or',
@@ -23,12 +25,15 @@ test_modules = [
     'easier68k.core.opcodes.lea',
     'easier68k.core.opcodes.simhalt',
     'easier68k.core.opcodes.trap',
+    'easier68k.core.opcodes.registry',
     'easier68k.core.models.list_file',
     'easier68k.core.util.parsing',
     'easier68k.core.enum.ea_mode_bin',
     'easier68k.core.models.list_file',
     'easier68k.core.util.opcode_util',
-    'easier68k.core.enum.op_size'
+    'easier68k.core.enum.op_size',
+    'easier68k.simulator.dump_format',
+    'easier68k.simulator.profiler'
 ]
 
 def load_tests(tests):